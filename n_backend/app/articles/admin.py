@@ -1,5 +1,9 @@
 from django.contrib import admin
 from .models import Articles
 
-admin.site.register(Articles)
 
+@admin.register(Articles)
+class ArticlesAdmin(admin.ModelAdmin):
+    list_display = ('title', 'author', 'category', 'status', 'published', 'created_at')
+    list_filter = ('status', 'published')
+    readonly_fields = Articles.DERIVED_FIELDS + ('likes_count', 'comments_count', 'saves_count')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ArticlesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'n_backend.app.articles'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,253 @@
+"""
+Write-behind buffer for like and save toggles.
+
+When settings.INTERACTION_WRITE_BEHIND is on, add_like and toggle_save_article
+record toggles here instead of writing article_interactions directly. Repeated
+toggles of the same (article, user) pair are merged in memory, and the merged
+state is written in bulk every INTERACTION_FLUSH_INTERVAL_MS milliseconds or
+once INTERACTION_FLUSH_MAX_EVENTS toggles are pending, whichever comes first.
+
+InteractionBuffer keeps its state in-process, which is right for a single
+worker. A deployment with several workers can point INTERACTION_BUFFER_CLASS
+at a subclass that keeps the pending state in a shared store.
+"""
+import atexit
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import cache as response_cache
+from .models import Articles, ArticleInteraction
+
+COUNTER_FIELDS = ArticleInteraction.COUNTER_FIELDS
+SET_AT_FIELDS = ArticleInteraction.SET_AT_FIELDS
+
+
+class InteractionBuffer:
+    def __init__(self, flush_interval_ms=250, max_events=500):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        # (article_id, user_id) -> {field: buffered value}
+        self._pending = {}
+        # article_id -> {field: net counter change not yet written}
+        self._deltas = self._new_deltas()
+        # Deltas of the batch currently being written; still counted until it commits
+        self._inflight = {}
+        self._flushing = {}
+        self._events = 0
+        # Counts finished flushes, so toggle() can tell its stored read went stale
+        self._generation = 0
+
+    @staticmethod
+    def _new_deltas():
+        return defaultdict(lambda: defaultdict(int))
+
+    def toggle(self, article_id, user_id, field, value=None):
+        """
+        Flip `field` for (article, user), or set it to `value` when given,
+        and return the new buffered value.
+        """
+        key = (article_id, user_id)
+        while True:
+            with self._lock:
+                known = field in self._pending.get(key, {}) or field in self._flushing.get(key, {})
+                generation = self._generation
+            # Read the stored state outside the lock so a slow query holds up no other toggle
+            stored = None if known else self._stored_value(article_id, user_id, field)
+
+            with self._lock:
+                state = self._pending.get(key, {})
+                flushing = self._flushing.get(key, {})
+                if field not in state and field not in flushing and (stored is None or generation != self._generation):
+                    # A flush wrote this pair since the first look; read the stored state again
+                    continue
+                state = self._pending.setdefault(key, state)
+                if field not in state:
+                    state[field] = flushing[field] if field in flushing else stored
+                new_value = not state[field] if value is None else bool(value)
+                if new_value != state[field]:
+                    state[field] = new_value
+                    self._deltas[article_id][field] += 1 if new_value else -1
+                self._events += 1
+                value = state[field]
+                flush_now = self._events >= self.max_events
+                if not flush_now:
+                    self._schedule()
+                break
+
+        if flush_now:
+            try:
+                self.flush()
+            except Exception as e:
+                # The batch is back in the buffer and the timer retries it; the toggle itself succeeded
+                print("Interaction buffer flush error:", str(e))
+        return value
+
+    def pending_delta(self, article_id, field):
+        """Net change to an article's counter that has not been flushed yet."""
+        with self._lock:
+            return (self._deltas.get(article_id, {}).get(field, 0)
+                    + self._inflight.get(article_id, {}).get(field, 0))
+
+    def pending_states(self, user_id, article_ids):
+        """
+        One user's unflushed {field: value} per article, for reads that must
+        see toggles the database does not hold yet. Newer toggles win over the
+        batch being written.
+        """
+        with self._lock:
+            states = {}
+            for article_id in article_ids:
+                key = (article_id, user_id)
+                state = {**self._flushing.get(key, {}), **self._pending.get(key, {})}
+                if state:
+                    states[article_id] = state
+            return states
+
+    def flush(self):
+        """Write every pending toggle to the database."""
+        with self._flush_lock:
+            with self._lock:
+                pending = self._flushing = self._pending
+                self._inflight = self._deltas
+                self._pending = {}
+                self._deltas = self._new_deltas()
+                self._events = 0
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return
+
+            try:
+                self._write(pending)
+            except Exception:
+                # Put the batch back so the next flush retries it; newer toggles win
+                with self._lock:
+                    for key, state in pending.items():
+                        merged = dict(state)
+                        merged.update(self._pending.get(key, {}))
+                        self._pending[key] = merged
+                    for article_id, fields in self._inflight.items():
+                        for field, delta in fields.items():
+                            self._deltas[article_id][field] += delta
+                    self._events += len(pending)
+                    self._schedule()
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+                    self._inflight = {}
+                    self._generation += 1
+
+    def _stored_value(self, article_id, user_id, field):
+        value = ArticleInteraction.objects.filter(
+            article_id=article_id, user_id=user_id
+        ).values_list(field, flat=True).first()
+        return bool(value)
+
+    def _write(self, pending):
+        article_ids = {article_id for article_id, _ in pending}
+        user_ids = {user_id for _, user_id in pending}
+        now = timezone.now()
+
+        with transaction.atomic():
+            existing = {
+                (i.article_id, i.user_id): i
+                for i in ArticleInteraction.objects.select_for_update().filter(
+                    article_id__in=article_ids, user_id__in=user_ids
+                ).only("id", "article_id", "user_id", "liked", "saved", "liked_at", "saved_at")
+                if (i.article_id, i.user_id) in pending
+            }
+
+            to_create = []
+            to_update = []
+            counter_changes = defaultdict(lambda: defaultdict(int))
+            for (article_id, user_id), state in pending.items():
+                interaction = existing.get((article_id, user_id))
+                if interaction is None:
+                    interaction = ArticleInteraction(article_id=article_id, user_id=user_id, **state)
+                    to_create.append(interaction)
+                    for field, value in state.items():
+                        if value:
+                            setattr(interaction, SET_AT_FIELDS[field], now)
+                            counter_changes[article_id][COUNTER_FIELDS[field]] += 1
+                    continue
+
+                changed = False
+                for field, value in state.items():
+                    if getattr(interaction, field) != value:
+                        setattr(interaction, field, value)
+                        if value:
+                            setattr(interaction, SET_AT_FIELDS[field], now)
+                        counter_changes[article_id][COUNTER_FIELDS[field]] += 1 if value else -1
+                        changed = True
+                if changed:
+                    interaction.updated_at = now
+                    to_update.append(interaction)
+
+            if to_create:
+                ArticleInteraction.objects.bulk_create(to_create)
+            if to_update:
+                ArticleInteraction.objects.bulk_update(
+                    to_update, ["liked", "saved", *SET_AT_FIELDS.values(), "updated_at"]
+                )
+            for article_id, changes in counter_changes.items():
+                changes = {name: F(name) + delta for name, delta in changes.items() if delta}
+                if changes:
+                    Articles.objects.filter(pk=article_id).update(**changes)
+
+        for article_id, author_id, category in Articles.objects.filter(
+            pk__in=list(counter_changes)
+        ).values_list("id", "author_id", "category"):
+            response_cache.bump_article(article_id, author_id, category)
+
+    def _schedule(self):
+        # Caller holds self._lock
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print("Interaction buffer flush error:", str(e))
+        finally:
+            # The timer thread opened its own database connection
+            connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Return the process-wide buffer, creating it from settings on first use."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            buffer_class = import_string(getattr(
+                settings, "INTERACTION_BUFFER_CLASS", "n_backend.app.articles.buffer.InteractionBuffer"
+            ))
+            _buffer = buffer_class(
+                flush_interval_ms=getattr(settings, "INTERACTION_FLUSH_INTERVAL_MS", 250),
+                max_events=getattr(settings, "INTERACTION_FLUSH_MAX_EVENTS", 500),
+            )
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def write_behind_enabled():
+    return getattr(settings, "INTERACTION_WRITE_BEHIND", False)
@@ -0,0 +1,145 @@
+"""
+Versioned response cache for the public article read endpoints.
+
+Every cached response is keyed by the view name, its query parameters and the
+current generation number of each scope it depends on. Writes bump the
+generations of the scopes they touch, which orphans the stale entries without
+having to find and delete them.
+"""
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+ALL_ARTICLES = "all"
+TRENDING = "trending"
+# Per-category counts of published articles; only bumped by writes that can change them
+FACETS = "facets"
+
+KEY_PREFIX = "articles"
+
+
+def _normalize_id(value):
+    # Ids arrive both as UUID objects and as request strings in any UUID spelling
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
+def article_scope(article_id):
+    return f"article:{_normalize_id(article_id)}"
+
+
+def author_scope(author_id):
+    return f"author:{_normalize_id(author_id)}"
+
+
+def category_scope(category):
+    # Categories are free text; hash them so the key is safe for any backend
+    return "category:" + hashlib.md5((category or "").encode("utf-8")).hexdigest()
+
+
+def _generation_key(scope):
+    return f"{KEY_PREFIX}:gen:{scope}"
+
+
+def get_generations(scopes):
+    """
+    Return the current generation for each scope.
+    Missing generations are seeded from the clock so an evicted counter can
+    never come back at a value an old entry was stored under.
+    """
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        generation = found.get(key)
+        if generation is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            generation = cache.get(key)
+        generations.append(generation)
+    return generations
+
+
+def bump(*scopes):
+    """Invalidate every cached response that depends on any of the scopes."""
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_article(article_id, author_id=None, category=None, facets=False):
+    """
+    Invalidate everything an article can appear in: its own detail entry,
+    the global listing, and its author and category listings. Pass
+    facets=True when the write can change which articles are published.
+    """
+    scopes = [ALL_ARTICLES, article_scope(article_id)]
+    if facets:
+        scopes.append(FACETS)
+    if author_id is not None:
+        scopes.append(author_scope(author_id))
+    if category is not None:
+        scopes.append(category_scope(category))
+    bump(*scopes)
+
+
+def bump_articles(rows, facets=False):
+    """
+    bump_article for many articles at once; rows are (article_id, author_id,
+    category) and each distinct scope is bumped only once.
+    """
+    scopes = {ALL_ARTICLES}
+    if facets:
+        scopes.add(FACETS)
+    for article_id, author_id, category in rows:
+        scopes.add(article_scope(article_id))
+        if author_id is not None:
+            scopes.add(author_scope(author_id))
+        if category is not None:
+            scopes.add(category_scope(category))
+    bump(*scopes)
+
+
+def response_key(view_name, request, scopes):
+    """Build the cache key for a view response under the current generations."""
+    raw = json.dumps([
+        view_name,
+        sorted(request.GET.lists()),
+        list(scopes),
+        get_generations(scopes),
+    ])
+    return f"{KEY_PREFIX}:resp:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def get_response(key):
+    """
+    The payload stored under key, or None. Entries stored with authors are
+    also dropped once any of those authors' generations has moved on.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    payload, authors = entry
+    if authors and get_generations(list(authors)) != list(authors.values()):
+        return None
+    return payload
+
+
+def set_response(key, payload, timeout=None, authors=()):
+    """
+    Store payload under key. `authors` are the ids of the authors embedded
+    in it; their generations are saved with the entry, so a profile change
+    only has to bump its own author scope to retire the entry.
+    """
+    if timeout is None:
+        timeout = getattr(settings, "ARTICLE_CACHE_TIMEOUT", 300)
+    scopes = sorted({author_scope(author_id) for author_id in authors if author_id is not None})
+    cache.set(key, (payload, dict(zip(scopes, get_generations(scopes)))), timeout=timeout)
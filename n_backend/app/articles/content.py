@@ -0,0 +1,67 @@
+"""
+Helpers for reading the block-based article content JSON
+([{"type": "paragraph", "value": "..."}, {"type": "image", "value": "<url>", ...}]).
+"""
+import json
+import math
+
+SUMMARY_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+
+def parse_blocks(raw_content):
+    """
+    Parse stored content into a list of blocks.
+    Returns None if the content is not a JSON array of blocks.
+    """
+    if not raw_content:
+        return []
+    try:
+        blocks = json.loads(raw_content)
+    except (TypeError, ValueError):
+        return None
+    return blocks if isinstance(blocks, list) else None
+
+
+def paragraph_texts(blocks):
+    """Yield the text of every paragraph block."""
+    for block in blocks:
+        if isinstance(block, dict) and block.get("type") == "paragraph":
+            value = block.get("value", "")
+            if isinstance(value, str) and value:
+                yield value
+
+
+def derive_fields(raw_content, media=None):
+    """
+    Compute the listing fields stored on Articles: summary (first 200 characters
+    of the first paragraph), word count, reading time in minutes and lead image URL.
+    """
+    blocks = parse_blocks(raw_content)
+    if blocks is None:
+        # Not block JSON; treat the raw text as a single paragraph
+        texts = [str(raw_content)]
+        blocks = []
+    else:
+        texts = list(paragraph_texts(blocks))
+
+    summary = texts[0][:SUMMARY_LENGTH] if texts else ""
+    word_count = sum(len(text.split()) for text in texts)
+    reading_time = math.ceil(word_count / WORDS_PER_MINUTE) if word_count else 0
+
+    lead_image = ""
+    for block in blocks:
+        if isinstance(block, dict) and block.get("type") == "image":
+            value = block.get("value")
+            if isinstance(value, str) and value:
+                lead_image = value
+                break
+    if not lead_image and media:
+        lead_image = next((url for url in media if isinstance(url, str) and url), "")
+
+    return {
+        "summary": summary,
+        "word_count": word_count,
+        "reading_time": reading_time,
+        "lead_image": lead_image,
+    }
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from n_backend.app.articles.models import Articles
+
+
+class Command(BaseCommand):
+    help = "Populate summary, word count, reading time and lead image for existing articles"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Number of articles to update per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        fields = list(Articles.DERIVED_FIELDS)
+        updated = 0
+        last_id = None
+
+        while True:
+            qs = Articles.objects.only('id', 'content', 'media', *fields).order_by('id')
+            if last_id is not None:
+                qs = qs.filter(id__gt=last_id)
+            articles = list(qs[:batch_size])
+            if not articles:
+                break
+            last_id = articles[-1].id
+
+            for article in articles:
+                article.refresh_derived_fields()
+            with transaction.atomic():
+                Articles.objects.bulk_update(articles, fields)
+            updated += len(articles)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated derived fields on {updated} article(s)"))
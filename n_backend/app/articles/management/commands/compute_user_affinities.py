@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from n_backend.app.articles.recommendations import compute_affinities
+from n_backend.app.users.models import Users
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user category and author affinities used by the for-you feed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Number of users to rebuild per transaction')
+        parser.add_argument('--user', help='Only rebuild this user id')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            stored = compute_affinities([options['user']])
+            self.stdout.write(self.style.SUCCESS(f"Stored {stored} affinity row(s) for user {options['user']}"))
+            return
+
+        chunk_size = max(1, options['chunk_size'])
+        users = 0
+        stored = 0
+        last_id = None
+
+        while True:
+            qs = Users.objects.order_by('id')
+            if last_id is not None:
+                qs = qs.filter(id__gt=last_id)
+            user_ids = list(qs.values_list('id', flat=True)[:chunk_size])
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            stored += compute_affinities(user_ids)
+            users += len(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt affinities for {users} user(s), {stored} row(s) stored"))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from n_backend.app.articles import media
+from n_backend.app.storage import get_storage
+
+
+class Command(BaseCommand):
+    help = "Delete queued media that no article uses from storage in bulk, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=media.DELETE_BATCH_SIZE,
+                            help='Assets per bulk delete call (capped by the storage backend)')
+        parser.add_argument('--every', type=int, default=0,
+                            help='Keep running and poll the queue every N seconds instead of draining it once')
+
+    def handle(self, *args, **options):
+        batch_size = min(max(1, options['batch_size']), get_storage().bulk_delete_limit)
+        every = max(0, options['every'])
+        while True:
+            total_deleted = total_skipped = total_deferred = total_failed = 0
+            while True:
+                deleted, skipped, deferred, failed = media.process_deletions(batch_size)
+                total_deleted += deleted
+                total_skipped += skipped
+                total_deferred += deferred
+                total_failed += failed
+                if deleted + skipped + deferred + failed < batch_size:
+                    break
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {total_deleted} asset(s), skipped {total_skipped} still in use, "
+                f"unregistered {total_deferred} to delete after the grace period, "
+                f"{total_failed} failed and will be retried"
+            ))
+            if not every:
+                break
+            close_old_connections()
+            time.sleep(every)
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from n_backend.app.articles import cache as response_cache
+from n_backend.app.articles.models import Articles, ArticleInteraction, ArticleComment
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored likes/comments/saves counters on articles from interactions and comments"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Number of articles to reconcile per transaction')
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        checked = 0
+        repaired = 0
+        last_id = None
+
+        while True:
+            qs = Articles.objects.order_by('id')
+            if last_id is not None:
+                qs = qs.filter(id__gt=last_id)
+            article_ids = list(qs.values_list('id', flat=True)[:chunk_size])
+            if not article_ids:
+                break
+            last_id = article_ids[-1]
+
+            with transaction.atomic():
+                # Writers change an interaction or comment before they move its
+                # article's counter, so with the articles locked first every
+                # write is either counted here or applied after this commits
+                articles = list(Articles.objects.select_for_update().filter(id__in=article_ids).only(
+                    'id', 'author_id', 'category', 'likes_count', 'comments_count', 'saves_count'
+                ))
+                totals = {
+                    row['article_id']: row
+                    for row in ArticleInteraction.objects.filter(
+                        article_id__in=article_ids
+                    ).values('article_id').annotate(
+                        likes=Count('id', filter=Q(liked=True)),
+                        saves=Count('id', filter=Q(saved=True)),
+                    )
+                }
+                comments = dict(
+                    ArticleComment.objects.filter(article_id__in=article_ids).values('article_id').annotate(
+                        total=Count('id')
+                    ).values_list('article_id', 'total')
+                )
+
+                drifted = []
+                for article in articles:
+                    row = totals.get(article.id, {})
+                    expected = (row.get('likes', 0), comments.get(article.id, 0), row.get('saves', 0))
+                    if expected != (article.likes_count, article.comments_count, article.saves_count):
+                        article.likes_count, article.comments_count, article.saves_count = expected
+                        drifted.append(article)
+
+                if drifted:
+                    Articles.objects.bulk_update(drifted, ['likes_count', 'comments_count', 'saves_count'])
+
+            if drifted:
+                # bulk_update sends no signals, and the counters show in every cached listing
+                response_cache.bump_articles([(a.id, a.author_id, a.category) for a in drifted])
+                response_cache.bump(response_cache.TRENDING)
+
+            checked += len(articles)
+            repaired += len(drifted)
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} article(s), repaired {repaired}"))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from n_backend.app.articles import trending
+
+
+class Command(BaseCommand):
+    help = "Fold likes, saves and comments since the last run into the trending article scores"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=int, default=0,
+                            help='Keep running and refresh every N seconds instead of once')
+
+    def handle(self, *args, **options):
+        every = max(0, options['every'])
+        while True:
+            updated = trending.refresh()
+            self.stdout.write(self.style.SUCCESS(f"Refreshed trending scores, {updated} article(s) had new activity"))
+            if not every:
+                break
+            close_old_connections()
+            time.sleep(every)
@@ -0,0 +1,371 @@
+"""
+Media handling for article create/update/delete.
+
+The views collect one callable per image that needs uploading and hand them
+to run_uploads(), which runs them on a bounded thread pool and waits for all
+of them together, so a request costs roughly the slowest upload rather than
+the sum of them.
+
+Before uploading, run_deduplicated_uploads() looks each image up in the
+media_assets registry by the hash of its content (files) or of its
+normalized source URL (URL imports) and reuses the stored asset on a match,
+so images that are sent again are not uploaded again.
+
+Assets that are no longer needed are not deleted inline: queue_deletions()
+records them in the media_deletions table and the process_media_deletions
+command removes them in bulk. Assets still listed in media_references,
+which signal receivers keep in step with articles and users, are kept.
+A registered asset is first dropped from the registry, so no new request
+can reuse it, and only deleted after a grace period that lets requests
+which found it there before save their references.
+"""
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from n_backend.app.storage import get_storage
+
+from .content import parse_blocks
+
+# Ports dropped when normalizing source URLs
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Assets handled per worker batch; also capped by the storage's bulk delete limit
+DELETE_BATCH_SIZE = 100
+
+# Failed deletions are retried after 1, 2, 4, ... minutes, capped, and given up after MAX attempts
+DELETE_RETRY_BASE_SECONDS = 60
+DELETE_RETRY_MAX_SECONDS = 6 * 60 * 60
+DELETE_MAX_ATTEMPTS = 10
+
+# Registered assets are deleted this many seconds after leaving the registry; longer
+# than a request takes from reading the registry to saving its article (MEDIA_UPLOAD_TIMEOUT)
+DELETE_GRACE_SECONDS = 5 * 60
+
+# Claimed assets are hidden from other workers this long; a worker that dies mid-batch frees them when it runs out
+DELETE_LEASE_SECONDS = 10 * 60
+
+# Bulk delete statuses that mean the asset is gone
+DELETE_DONE_STATUSES = {"deleted", "not_found"}
+
+
+class UploadTimeout(Exception):
+    pass
+
+
+def run_uploads(tasks, on_late_result=None, max_workers=None, timeout=None):
+    """
+    Run the upload callables concurrently and return their results in task
+    order. A task that raised yields its exception in place of a result; a
+    task still running after `timeout` seconds yields UploadTimeout, and
+    `on_late_result` is called with its result if it finishes afterwards, so
+    the caller can remove an upload it has already given up on.
+    """
+    if not tasks:
+        return []
+
+    max_workers = max_workers or getattr(settings, "MEDIA_UPLOAD_CONCURRENCY", 4)
+    timeout = timeout or getattr(settings, "MEDIA_UPLOAD_TIMEOUT", 60)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)), thread_name_prefix="media-upload")
+    try:
+        futures = [executor.submit(task) for task in tasks]
+        done, _ = wait(futures, timeout=timeout)
+
+        results = []
+        for future in futures:
+            if future in done:
+                error = future.exception()
+                results.append(error if error is not None else future.result())
+                continue
+            if not future.cancel() and on_late_result is not None:
+                future.add_done_callback(
+                    lambda f: f.exception() is None and on_late_result(f.result())
+                )
+            results.append(UploadTimeout(f"Upload did not finish within {timeout} seconds"))
+        return results
+    finally:
+        # Do not block the response on uploads that overran the timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def content_key(file_obj):
+    """Registry key for an uploaded file: the SHA-256 of its content."""
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+    file_obj.seek(0)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def normalize_source_url(url):
+    """
+    Canonical form of a source URL: lower-case scheme and host, no default
+    port, no fragment, query parameters sorted.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parsed.port}"
+    if parsed.username:
+        netloc = f"{parsed.username}@{netloc}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, query, ""))
+
+
+def source_key(url):
+    """Registry key for a URL import: the SHA-256 of the normalized URL."""
+    return f"url:{hashlib.sha256(normalize_source_url(url).encode()).hexdigest()}"
+
+
+def run_deduplicated_uploads(jobs, on_late_result=None):
+    """
+    Like run_uploads(), for (registry key, upload callable, source URL or "")
+    jobs. Keys already registered are answered from the registry with
+    {"secure_url", "public_id", "reused": True} and not uploaded; repeated
+    keys within `jobs` are uploaded once. New uploads are registered.
+    """
+    from .models import MediaAsset
+
+    if not jobs:
+        return []
+
+    keys = list(dict.fromkeys(key for key, _, _ in jobs))
+    known = {
+        key: {"secure_url": secure_url, "public_id": public_id, "reused": True}
+        for key, secure_url, public_id in MediaAsset.objects.filter(key__in=keys).values_list(
+            "key", "secure_url", "public_id"
+        )
+    }
+
+    missing = {}
+    for key, upload, source_url in jobs:
+        if key not in known and key not in missing:
+            missing[key] = (upload, source_url)
+    uploaded = dict(zip(missing, run_uploads([upload for upload, _ in missing.values()], on_late_result)))
+
+    new_assets = [
+        MediaAsset(key=key, public_id=result["public_id"], secure_url=result["secure_url"],
+                   resource_type=result.get("resource_type") or "image", source_url=missing[key][1])
+        for key, result in uploaded.items()
+        if not isinstance(result, Exception) and result.get("public_id") and result.get("secure_url")
+    ]
+    if new_assets:
+        MediaAsset.objects.bulk_create(new_assets, ignore_conflicts=True)
+
+    # A key repeated within the request shares the first upload
+    results = []
+    first_use = set()
+    for key, _, _ in jobs:
+        if key in known:
+            results.append(known[key])
+            continue
+        result = uploaded[key]
+        if key in first_use and not isinstance(result, Exception):
+            result = dict(result, reused=True)
+        first_use.add(key)
+        results.append(result)
+    return results
+
+
+def queue_deletions(public_ids=(), urls=(), resource_type="image"):
+    """
+    Record assets for the process_media_deletions worker. Accepts bare public
+    ids and/or delivery URLs (URLs that are not the storage's are ignored).
+    Returns the number of assets queued.
+    """
+    from .models import MediaDeletion
+
+    assets = {(public_id, resource_type) for public_id in public_ids if public_id}
+    storage = get_storage()
+    for url in urls:
+        parsed = storage.parse_url(url)
+        if parsed:
+            assets.add(parsed)
+    if assets:
+        MediaDeletion.objects.bulk_create(
+            [MediaDeletion(public_id=public_id, resource_type=kind) for public_id, kind in assets],
+            ignore_conflicts=True,
+        )
+    return len(assets)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(DELETE_RETRY_BASE_SECONDS * 2 ** (attempts - 1), DELETE_RETRY_MAX_SECONDS))
+
+
+def claim_deletions(batch_size, now):
+    """
+    Lease one batch of due assets to this worker: push their next_attempt_at
+    past the lease and commit, so other workers skip them while the storage
+    calls run without any row locks held. Under the same registry row locks
+    that record_references() takes, assets still referenced are dropped from
+    the queue, and registered ones are dropped from the registry and left for
+    a later run, after the grace period, to check again and delete.
+    Returns (claimed rows, skipped count, deferred count, lease expiry).
+    """
+    from .models import MediaAsset, MediaDeletion
+
+    lease_until = now + timedelta(seconds=DELETE_LEASE_SECONDS)
+    with transaction.atomic():
+        rows = list(
+            MediaDeletion.objects.select_for_update(skip_locked=True).filter(
+                next_attempt_at__lte=now, attempts__lt=DELETE_MAX_ATTEMPTS
+            ).order_by("next_attempt_at")[:batch_size]
+        )
+        assets = {(row.public_id, row.resource_type) for row in rows}
+        registry = MediaAsset.objects.select_for_update().filter(public_id__in={public_id for public_id, _ in assets})
+        registered = {
+            (public_id, resource_type): pk
+            for pk, public_id, resource_type in registry.values_list("pk", "public_id", "resource_type")
+        }
+        in_use = referenced_assets(assets)
+
+        skipped, deferred, claimed = [], [], []
+        for row in rows:
+            asset = (row.public_id, row.resource_type)
+            (skipped if asset in in_use else deferred if asset in registered else claimed).append(row)
+        if skipped:
+            MediaDeletion.objects.filter(pk__in=[row.pk for row in skipped]).delete()
+        if deferred:
+            MediaAsset.objects.filter(
+                pk__in=[registered[(row.public_id, row.resource_type)] for row in deferred]
+            ).delete()
+            MediaDeletion.objects.filter(pk__in=[row.pk for row in deferred]).update(
+                next_attempt_at=now + timedelta(seconds=DELETE_GRACE_SECONDS), updated_at=now
+            )
+        if claimed:
+            MediaDeletion.objects.filter(pk__in=[row.pk for row in claimed]).update(
+                next_attempt_at=lease_until, updated_at=now
+            )
+    return claimed, len(skipped), len(deferred), lease_until
+
+
+def process_deletions(batch_size=DELETE_BATCH_SIZE):
+    """
+    Delete one batch of due assets, one bulk call per resource type. The
+    batch is claimed in one short transaction, deleted from storage outside
+    any transaction, and the results recorded in a second one: assets that
+    are gone are removed from the queue, the rest are rescheduled with
+    backoff. Returns (deleted, skipped, deferred, failed).
+    """
+    from .models import MediaDeletion
+
+    storage = get_storage()
+    now = timezone.now()
+    claimed, skipped, deferred, lease_until = claim_deletions(min(batch_size, storage.bulk_delete_limit), now)
+
+    by_type = defaultdict(list)
+    for row in claimed:
+        by_type[row.resource_type].append(row)
+    deleted = []
+    failed = []
+    for resource_type, batch in by_type.items():
+        try:
+            statuses = storage.delete_many(
+                [row.public_id for row in batch], resource_type=resource_type
+            ).get("deleted", {})
+            errors = {row.pk: f"Delete status: {statuses.get(row.public_id)}" for row in batch}
+        except Exception as e:
+            statuses = {}
+            errors = {row.pk: str(e) for row in batch}
+        for row in batch:
+            if statuses.get(row.public_id) in DELETE_DONE_STATUSES:
+                deleted.append(row)
+                continue
+            row.attempts += 1
+            row.next_attempt_at = now + retry_delay(row.attempts)
+            row.last_error = errors[row.pk]
+            row.updated_at = now
+            failed.append(row)
+
+    with transaction.atomic():
+        # Rows whose lease ran out may have been claimed again; the new holder records them
+        held = set(MediaDeletion.objects.select_for_update().filter(
+            pk__in=[row.pk for row in claimed], next_attempt_at=lease_until
+        ).values_list("pk", flat=True))
+        deleted = [row for row in deleted if row.pk in held]
+        failed = [row for row in failed if row.pk in held]
+
+        if deleted:
+            MediaDeletion.objects.filter(pk__in=[row.pk for row in deleted]).delete()
+        if failed:
+            MediaDeletion.objects.bulk_update(failed, ["attempts", "next_attempt_at", "last_error", "updated_at"])
+    return len(deleted), skipped, deferred, len(failed)
+
+
+def referenced_assets(assets):
+    """Return the (public_id, resource_type) pairs that some article or user still uses."""
+    from .models import MediaReference
+
+    if not assets:
+        return set()
+    rows = MediaReference.objects.filter(public_id__in={public_id for public_id, _ in assets})
+    return set(rows.values_list("public_id", "resource_type")) & set(assets)
+
+
+def article_assets(media_urls, raw_content):
+    """
+    (public_id, resource_type) of every storage asset an article uses: the
+    URLs in its media list plus the values and stored public ids of its
+    non-paragraph content blocks.
+    """
+    storage = get_storage()
+    urls = [url for url in media_urls or [] if isinstance(url, str)]
+    assets = set()
+    for block in parse_blocks(raw_content) or []:
+        if not isinstance(block, dict) or block.get("type") == "paragraph":
+            continue
+        if isinstance(block.get("value"), str):
+            urls.append(block["value"])
+        if block.get("type") == "image" and block.get("public_id"):
+            assets.add((block["public_id"], "image"))
+    for url in urls:
+        parsed = storage.parse_url(url)
+        if parsed:
+            assets.add(parsed)
+    return assets
+
+
+def user_assets(user):
+    """(public_id, resource_type) of the storage assets a user's profile image and PDF use."""
+    storage = get_storage()
+    assets = {parsed for parsed in (storage.parse_url(user.profileUrl), storage.parse_url(user.pdfUrl)) if parsed}
+    if user.pdfPublicId:
+        assets.add((user.pdfPublicId, "raw"))
+    return assets
+
+
+def record_references(assets, using=None, **owner):
+    """
+    Make the media_references rows of one owner (article= or user=) match
+    `assets`. The registry rows of those assets are locked first, so this
+    and claim_deletions() dropping them from the registry never interleave.
+    """
+    from .models import MediaAsset, MediaReference
+
+    with transaction.atomic(using=using):
+        if assets:
+            list(MediaAsset.objects.using(using).select_for_update().filter(
+                public_id__in={public_id for public_id, _ in assets}
+            ).values_list("pk", flat=True))
+        references = MediaReference.objects.using(using).filter(**owner)
+        existing = {(public_id, resource_type): pk for pk, public_id, resource_type in references.values_list(
+            "pk", "public_id", "resource_type"
+        )}
+        stale = [pk for asset, pk in existing.items() if asset not in assets]
+        if stale:
+            references.filter(pk__in=stale).delete()
+        added = [
+            MediaReference(public_id=public_id, resource_type=resource_type, **owner)
+            for public_id, resource_type in assets if (public_id, resource_type) not in existing
+        ]
+        if added:
+            MediaReference.objects.using(using).bulk_create(added)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    Articles = apps.get_model('articles', 'Articles')
+    ArticleInteraction = apps.get_model('articles', 'ArticleInteraction')
+    totals = ArticleInteraction.objects.values('article_id').annotate(
+        likes=Count('id', filter=Q(liked=True)),
+        comments=Count('id', filter=Q(comment__isnull=False) & ~Q(comment='')),
+        saves=Count('id', filter=Q(saved=True)),
+    )
+    for row in totals.iterator():
+        Articles.objects.filter(pk=row['article_id']).update(
+            likes_count=row['likes'],
+            comments_count=row['comments'],
+            saves_count=row['saves'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_articleinteraction_delete_commentslikes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articles',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='saves_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_articles_interaction_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articles',
+            name='lead_image',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, help_text='Estimated reading time in minutes'),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='summary',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,93 @@
+from django.db import migrations, router
+
+# The search schema is spelled out here rather than imported from
+# articles/search.py, so later changes to that module cannot alter what this
+# migration does.
+
+SQLITE_FORWARDS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts "
+    "USING fts5(article_id, title, body, tokenize='porter unicode61')",
+    # Body is the paragraph text of block content, or the raw content when it is not a block array
+    """
+    INSERT INTO articles_fts (article_id, title, body)
+    SELECT a.id, coalesce(a.title, ''),
+           CASE
+               WHEN a.content IS NULL OR a.content = '' THEN ''
+               WHEN NOT json_valid(a.content) THEN a.content
+               WHEN json_type(a.content) = 'array' THEN coalesce((
+                   -- Elements are addressed through the parent document, which is valid JSON
+                   SELECT group_concat(json_extract(a.content, printf('$[%d].value', b.key)), char(10))
+                   FROM json_each(CASE WHEN json_valid(a.content) THEN a.content ELSE '[]' END) b
+                   WHERE b.type = 'object'
+                     AND json_extract(a.content, printf('$[%d].type', b.key)) = 'paragraph'
+                     AND json_type(a.content, printf('$[%d].value', b.key)) = 'text'
+                     AND json_extract(a.content, printf('$[%d].value', b.key)) <> ''
+               ), '')
+               ELSE a.content
+           END
+    FROM articles a
+    """,
+]
+SQLITE_BACKWARDS = ["DROP TABLE IF EXISTS articles_fts"]
+
+POSTGRES_FORWARDS = [
+    "CREATE TABLE IF NOT EXISTS article_search ("
+    "article_id uuid PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS article_search_document_gin ON article_search USING GIN (document)",
+    """
+    DO $$
+    DECLARE
+        r record;
+        body text;
+    BEGIN
+        FOR r IN SELECT id, title, content FROM articles LOOP
+            BEGIN
+                SELECT coalesce(string_agg(b->>'value', E'\\n'), '') INTO body
+                FROM jsonb_array_elements(coalesce(nullif(r.content, ''), '[]')::jsonb) b
+                WHERE jsonb_typeof(b) = 'object' AND b->>'type' = 'paragraph'
+                  AND jsonb_typeof(b->'value') = 'string' AND b->>'value' <> '';
+            EXCEPTION WHEN others THEN
+                body := r.content;
+            END;
+            INSERT INTO article_search (article_id, document)
+            VALUES (r.id, setweight(to_tsvector('english', coalesce(r.title, '')), 'A')
+                          || setweight(to_tsvector('english', body), 'B'))
+            ON CONFLICT (article_id) DO NOTHING;
+        END LOOP;
+    END
+    $$
+    """,
+]
+POSTGRES_BACKWARDS = ["DROP TABLE IF EXISTS article_search"]
+
+
+class RunSQLForVendor(migrations.RunSQL):
+    """RunSQL whose statements depend on the database vendor; other vendors get none."""
+
+    def __init__(self, sql, reverse_sql):
+        self.vendor_sql = sql
+        self.vendor_reverse_sql = reverse_sql
+        super().__init__(sql=[], reverse_sql=[])
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if router.allow_migrate(schema_editor.connection.alias, app_label, **self.hints):
+            self._run_sql(schema_editor, self.vendor_sql.get(schema_editor.connection.vendor, []))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if router.allow_migrate(schema_editor.connection.alias, app_label, **self.hints):
+            self._run_sql(schema_editor, self.vendor_reverse_sql.get(schema_editor.connection.vendor, []))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_articles_derived_fields'),
+    ]
+
+    operations = [
+        RunSQLForVendor(
+            sql={'sqlite': SQLITE_FORWARDS, 'postgresql': POSTGRES_FORWARDS},
+            reverse_sql={'sqlite': SQLITE_BACKWARDS, 'postgresql': POSTGRES_BACKWARDS},
+        ),
+    ]
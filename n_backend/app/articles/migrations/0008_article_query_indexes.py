@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_article_search_index'),
+        ('users', '0009_users_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articleinteraction',
+            index=models.Index(condition=models.Q(('liked', True)), fields=['article'], name='interactions_liked_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articleinteraction',
+            index=models.Index(condition=models.Q(('saved', True)), fields=['user', 'created_at', 'id'], name='interactions_saved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articleinteraction',
+            index=models.Index(condition=models.Q(('comment__isnull', False), models.Q(('comment', ''), _negated=True)), fields=['article', 'created_at', 'id'], name='interactions_comment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['created_at', 'id'], name='articles_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='articles_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['author', 'created_at', 'id'], name='articles_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='articles_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(condition=models.Q(models.Q(('status', 'draft'), ('published', False), _connector='OR'), models.Q(('status', 'deleted'), _negated=True)), fields=['created_at', 'id'], name='articles_pending_created_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:48
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def copy_comments(apps, schema_editor):
+    # One INSERT ... SELECT; comments keep their interaction's id, which add_comment used to return as comment_id
+    ArticleComment = apps.get_model('articles', 'ArticleComment')
+    ArticleInteraction = apps.get_model('articles', 'ArticleInteraction')
+    q = schema_editor.quote_name
+    schema_editor.execute(
+        f"INSERT INTO {q(ArticleComment._meta.db_table)} (id, created_at, updated_at, article_id, user_id, body) "
+        f"SELECT id, created_at, updated_at, article_id, user_id, comment FROM {q(ArticleInteraction._meta.db_table)} "
+        "WHERE comment IS NOT NULL AND comment <> ''"
+    )
+
+
+def restore_comments(apps, schema_editor):
+    # Interactions hold a single comment, so the newest one per user and article wins
+    ArticleComment = apps.get_model('articles', 'ArticleComment')
+    ArticleInteraction = apps.get_model('articles', 'ArticleInteraction')
+    for comment in ArticleComment.objects.order_by('created_at').iterator():
+        ArticleInteraction.objects.update_or_create(
+            article_id=comment.article_id, user_id=comment.user_id, defaults={'comment': comment.body}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_article_query_indexes'),
+        ('users', '0009_users_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleComment',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('body', models.TextField()),
+            ],
+            options={
+                'db_table': 'article_comments',
+            },
+        ),
+        migrations.AddField(
+            model_name='articlecomment',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='articles.articles'),
+        ),
+        migrations.AddField(
+            model_name='articlecomment',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_comments', to='users.users'),
+        ),
+        migrations.AddIndex(
+            model_name='articlecomment',
+            index=models.Index(fields=['article', 'created_at', 'id'], name='comments_article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articlecomment',
+            index=models.Index(fields=['user', 'article'], name='comments_user_article_idx'),
+        ),
+        migrations.RunPython(copy_comments, restore_comments),
+        migrations.RemoveIndex(
+            model_name='articleinteraction',
+            name='interactions_comment_idx',
+        ),
+        migrations.RemoveField(
+            model_name='articleinteraction',
+            name='comment',
+        ),
+    ]
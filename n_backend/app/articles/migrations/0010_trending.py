@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_article_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('processed_until', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'trending_refresh',
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingArticle',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='articles.articles')),
+                ('score', models.FloatField(default=0.0)),
+            ],
+            options={
+                'db_table': 'trending_articles',
+                'indexes': [models.Index(fields=['-score'], name='trending_score_idx')],
+            },
+        ),
+    ]
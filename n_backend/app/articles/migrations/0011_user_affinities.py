@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_trending'),
+        ('users', '0009_users_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'Category'), ('author', 'Author')], max_length=16)),
+                ('key', models.CharField(max_length=255)),
+                ('score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affinities', to='users.users')),
+            ],
+            options={
+                'db_table': 'user_affinities',
+                'indexes': [models.Index(fields=['user', '-score'], name='affinities_user_score_idx')],
+                'unique_together': {('user', 'kind', 'key')},
+            },
+        ),
+    ]
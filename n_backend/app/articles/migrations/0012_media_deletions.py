@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:55
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_user_affinities'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaDeletion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('public_id', models.CharField(max_length=255)),
+                ('resource_type', models.CharField(default='image', max_length=16)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'db_table': 'media_deletions',
+                'indexes': [models.Index(fields=['next_attempt_at'], name='media_deletions_due_idx')],
+                'unique_together': {('public_id', 'resource_type')},
+            },
+        ),
+    ]
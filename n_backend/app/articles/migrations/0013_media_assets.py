@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:58
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_media_deletions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaAsset',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('key', models.CharField(max_length=80, unique=True)),
+                ('public_id', models.CharField(db_index=True, max_length=255)),
+                ('secure_url', models.TextField()),
+                ('resource_type', models.CharField(default='image', max_length=16)),
+                ('source_url', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'db_table': 'media_assets',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:17
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_set_at(apps, schema_editor):
+    # The last write is the best record of when a flag that is set now was set
+    ArticleInteraction = apps.get_model('articles', 'ArticleInteraction')
+    ArticleInteraction.objects.filter(liked=True).update(liked_at=F('updated_at'))
+    ArticleInteraction.objects.filter(saved=True).update(saved_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_media_assets'),
+        ('users', '0009_users_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articleinteraction',
+            name='liked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='articleinteraction',
+            name='saved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_set_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='articleinteraction',
+            index=models.Index(condition=models.Q(('liked', True)), fields=['liked_at'], name='interactions_liked_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articleinteraction',
+            index=models.Index(condition=models.Q(('saved', True)), fields=['saved_at'], name='interactions_saved_at_idx'),
+        ),
+    ]
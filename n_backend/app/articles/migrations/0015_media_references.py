@@ -0,0 +1,129 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:21
+
+import json
+import re
+from urllib.parse import unquote, urlparse
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# URL parsing is spelled out here rather than imported from storage.py and
+# articles/media.py, so later changes to those modules cannot alter what this
+# migration does.
+
+VERSION_SEGMENT = re.compile(r"^v\d+$")
+TRANSFORMATION_SEGMENT = re.compile(r"^[a-z]{1,3}_[^/]*$")
+
+
+def parse_cloudinary_url(url):
+    if not isinstance(url, str) or "cloudinary.com" not in url:
+        return None
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    if "upload" not in parts or parts.index("upload") < 1:
+        return None
+    upload_index = parts.index("upload")
+    resource_type = parts[upload_index - 1]
+    rest = parts[upload_index + 1:]
+    versions = [i for i, part in enumerate(rest) if VERSION_SEGMENT.match(part)]
+    if versions:
+        rest = rest[versions[0] + 1:]
+    else:
+        while len(rest) > 1 and TRANSFORMATION_SEGMENT.match(rest[0]):
+            rest = rest[1:]
+    if not rest:
+        return None
+    if resource_type != "raw":
+        rest[-1] = rest[-1].rsplit(".", 1)[0]
+    return "/".join(rest), resource_type
+
+
+def local_url_parser(base_url):
+    def parse(url):
+        if not isinstance(url, str):
+            return None
+        prefix = urlparse(base_url).path
+        path = urlparse(url).path
+        if not path.startswith(prefix) or path == prefix:
+            return None
+        host = urlparse(url).netloc
+        if host and host != urlparse(base_url).netloc:
+            return None
+        return unquote(path[len(prefix):]), "image"
+    return parse
+
+
+def article_assets(parse_url, media_urls, raw_content):
+    urls = [url for url in media_urls or [] if isinstance(url, str)]
+    assets = set()
+    try:
+        blocks = json.loads(raw_content) if raw_content else []
+    except (TypeError, ValueError):
+        blocks = []
+    for block in blocks if isinstance(blocks, list) else []:
+        if not isinstance(block, dict) or block.get('type') == 'paragraph':
+            continue
+        if isinstance(block.get('value'), str):
+            urls.append(block['value'])
+        if block.get('type') == 'image' and block.get('public_id'):
+            assets.add((block['public_id'], 'image'))
+    assets.update(filter(None, map(parse_url, urls)))
+    return assets
+
+
+def user_assets(parse_url, user):
+    assets = set(filter(None, (parse_url(user.profileUrl), parse_url(user.pdfUrl))))
+    if user.pdfPublicId:
+        assets.add((user.pdfPublicId, 'raw'))
+    return assets
+
+
+def backfill_references(apps, schema_editor):
+    # The backend is only read as its configured dotted path, never imported
+    backend = getattr(settings, 'MEDIA_STORAGE_BACKEND', 'n_backend.app.storage.CloudinaryStorage')
+    if backend.rsplit('.', 1)[-1] == 'LocalStorage':
+        parse_url = local_url_parser(settings.MEDIA_STORAGE_URL)
+    else:
+        parse_url = parse_cloudinary_url
+
+    Articles = apps.get_model('articles', 'Articles')
+    MediaReference = apps.get_model('articles', 'MediaReference')
+    Users = apps.get_model('users', 'Users')
+    references = []
+    for article in Articles.objects.only('id', 'media', 'content').iterator():
+        references.extend(
+            MediaReference(public_id=public_id, resource_type=resource_type, article_id=article.id)
+            for public_id, resource_type in article_assets(parse_url, article.media, article.content)
+        )
+    for user in Users.objects.only('id', 'profileUrl', 'pdfUrl', 'pdfPublicId').iterator():
+        references.extend(
+            MediaReference(public_id=public_id, resource_type=resource_type, user_id=user.id)
+            for public_id, resource_type in user_assets(parse_url, user)
+        )
+    MediaReference.objects.bulk_create(references, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0014_interaction_set_at'),
+        ('users', '0009_users_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('public_id', models.CharField(max_length=255)),
+                ('resource_type', models.CharField(default='image', max_length=16)),
+                ('article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_references', to='articles.articles')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_references', to='users.users')),
+            ],
+            options={
+                'db_table': 'media_references',
+                'indexes': [models.Index(fields=['public_id', 'resource_type'], name='media_references_asset_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_references, migrations.RunPython.noop),
+    ]
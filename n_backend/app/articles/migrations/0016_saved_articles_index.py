@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0015_media_references'),
+        ('users', '0009_users_created_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='articleinteraction',
+            name='interactions_saved_idx',
+        ),
+        migrations.AddIndex(
+            model_name='articleinteraction',
+            index=models.Index(condition=models.Q(('saved', True)), fields=['user', 'saved_at', 'id'], name='interactions_saved_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
 from django.db import models
+from django.utils import timezone
 from n_backend.app.users.models import BaseModel
+from .content import derive_fields
+
+# Articles waiting for moderation, as listed by get_pending_articles
+PENDING_ARTICLES = (models.Q(status='draft') | models.Q(published=False)) & ~models.Q(status='deleted')
+
 
 class Articles(BaseModel):
     title = models.CharField(max_length=255)
@@ -17,37 +23,54 @@ class Articles(BaseModel):
         ],
         default='draft'
     )
+    # Denormalized interaction counters, maintained by the interaction views.
+    # Repair drift with `manage.py recount_article_interactions`.
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    saves_count = models.PositiveIntegerField(default=0)
+    # Listing fields derived from content on save, so listings never parse article bodies.
+    # Populate existing rows with `manage.py backfill_article_fields`.
+    summary = models.CharField(max_length=255, blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveIntegerField(default=0, help_text='Estimated reading time in minutes')
+    lead_image = models.TextField(blank=True, default='')
+
+    DERIVED_FIELDS = ('summary', 'word_count', 'reading_time', 'lead_image')
 
     class Meta:
         db_table = 'articles'
+        # Each index matches a listing filter plus the (created_at, id) keyset order
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='articles_created_idx'),
+            models.Index(fields=['category', 'created_at', 'id'], name='articles_category_created_idx'),
+            models.Index(fields=['author', 'created_at', 'id'], name='articles_author_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='articles_status_created_idx'),
+            models.Index(fields=['created_at', 'id'], condition=PENDING_ARTICLES, name='articles_pending_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def likes_count(self):
-        """Returns the number of likes for this article"""
-        return self.interactions.filter(liked=True).count()
+    def refresh_derived_fields(self):
+        """Recompute summary, word count, reading time and lead image from content"""
+        for name, value in derive_fields(self.content, self.media).items():
+            setattr(self, name, value)
 
-    @property
-    def comments_count(self):
-        """Returns the number of comments for this article"""
-        return self.interactions.exclude(comment__isnull=True).exclude(comment='').count()
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'content', 'media'} & set(update_fields):
+            self.refresh_derived_fields()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
 
     def extract_cloudinary_public_ids(self):
-        """Extract Cloudinary public IDs from media URLs for cleanup"""
-        public_ids = []
-        for media_url in self.media:
-            if 'cloudinary.com' in media_url:
-                # Extract public ID from Cloudinary URL
-                parts = media_url.split('/')
-                if 'image/upload' in parts:
-                    upload_index = parts.index('image/upload')
-                    if len(parts) > upload_index + 1:
-                        public_id_with_format = parts[upload_index + 1]
-                        public_id = public_id_with_format.split('.')[0]  # Remove file extension
-                        public_ids.append(public_id)
-        return public_ids
+        """Extract storage public IDs from media URLs for cleanup"""
+        from n_backend.app.storage import get_storage
+
+        storage = get_storage()
+        parsed = (storage.parse_url(media_url) for media_url in self.media or [])
+        return [public_id for public_id, _ in filter(None, parsed)]
 
 
 class ArticleInteraction(BaseModel):
@@ -61,13 +84,176 @@ class ArticleInteraction(BaseModel):
         on_delete=models.CASCADE,
         related_name='article_interactions'
     )
-    comment = models.TextField(null=True, blank=True)
     liked = models.BooleanField(default=False)
     saved = models.BooleanField(default=False)
+    # When each flag last went from unset to set; the trending ranking counts these
+    liked_at = models.DateTimeField(null=True, blank=True)
+    saved_at = models.DateTimeField(null=True, blank=True)
+
+    # Article counter kept in step with each toggleable flag
+    COUNTER_FIELDS = {'liked': 'likes_count', 'saved': 'saves_count'}
+    # Timestamp column stamped when each toggleable flag is set
+    SET_AT_FIELDS = {'liked': 'liked_at', 'saved': 'saved_at'}
 
     class Meta:
         db_table = 'article_interactions'
         unique_together = ['article', 'user']
+        # Partial indexes only cover the rows each access path reads; databases
+        # without partial index support skip them
+        indexes = [
+            models.Index(fields=['article'], condition=models.Q(liked=True), name='interactions_liked_idx'),
+            models.Index(fields=['user', 'saved_at', 'id'], condition=models.Q(saved=True),
+                         name='interactions_saved_idx'),
+            models.Index(fields=['liked_at'], condition=models.Q(liked=True), name='interactions_liked_at_idx'),
+            models.Index(fields=['saved_at'], condition=models.Q(saved=True), name='interactions_saved_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"Interaction by {self.user} on {self.article}"
+
+
+class ArticleComment(BaseModel):
+    """
+    One comment by a user on an article. Rows are only ever appended, so a
+    user can comment more than once and like/save writes never touch them.
+    """
+    article = models.ForeignKey(
+        Articles,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    user = models.ForeignKey(
+        'users.Users',
+        on_delete=models.CASCADE,
+        related_name='article_comments'
+    )
+    body = models.TextField()
+
+    class Meta:
+        db_table = 'article_comments'
+        indexes = [
+            models.Index(fields=['article', 'created_at', 'id'], name='comments_article_created_idx'),
+            models.Index(fields=['user', 'article'], name='comments_user_article_idx'),
+        ]
 
     def __str__(self):
-        return f"Interaction by {self.user} on {self.article}"
\ No newline at end of file
+        return f"Comment by {self.user} on {self.article}"
+
+
+class TrendingArticle(models.Model):
+    """Precomputed trending score per published article; maintained by trending.refresh()."""
+    article = models.OneToOneField(
+        Articles,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    score = models.FloatField(default=0.0)
+
+    class Meta:
+        db_table = 'trending_articles'
+        indexes = [
+            models.Index(fields=['-score'], name='trending_score_idx'),
+        ]
+
+
+class TrendingRefresh(models.Model):
+    """Single row recording how far the trending scores have been brought up to date."""
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'trending_refresh'
+
+
+class UserAffinity(models.Model):
+    """
+    How strongly a user's likes and saves lean towards a category or an author.
+    Rebuilt in batch by the compute_user_affinities command; read by the for-you feed.
+    """
+    CATEGORY = 'category'
+    AUTHOR = 'author'
+
+    user = models.ForeignKey(
+        'users.Users',
+        on_delete=models.CASCADE,
+        related_name='affinities'
+    )
+    kind = models.CharField(max_length=16, choices=[(CATEGORY, 'Category'), (AUTHOR, 'Author')])
+    key = models.CharField(max_length=255)
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_affinities'
+        unique_together = ['user', 'kind', 'key']
+        indexes = [
+            models.Index(fields=['user', '-score'], name='affinities_user_score_idx'),
+        ]
+
+
+class MediaAsset(BaseModel):
+    """
+    An uploaded storage asset, registered under the hash of its content (file
+    uploads) or of its normalized source URL (URL imports) so that uploading
+    the same image again reuses it.
+    """
+    key = models.CharField(max_length=80, unique=True)
+    public_id = models.CharField(max_length=255, db_index=True)
+    secure_url = models.TextField()
+    resource_type = models.CharField(max_length=16, default='image')
+    source_url = models.TextField(blank=True, default='')
+
+    class Meta:
+        db_table = 'media_assets'
+
+
+class MediaReference(models.Model):
+    """
+    A storage asset in use by an article (its media list or content blocks)
+    or by a user (profile image, PDF). Rewritten by signal receivers whenever
+    the owner is saved and deleted along with it; process_media_deletions
+    keeps every asset that still has a row.
+    """
+    public_id = models.CharField(max_length=255)
+    resource_type = models.CharField(max_length=16, default='image')
+    article = models.ForeignKey(
+        Articles,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='media_references'
+    )
+    user = models.ForeignKey(
+        'users.Users',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='media_references'
+    )
+
+    class Meta:
+        db_table = 'media_references'
+        indexes = [
+            models.Index(fields=['public_id', 'resource_type'], name='media_references_asset_idx'),
+        ]
+
+
+class MediaDeletion(BaseModel):
+    """
+    A storage asset waiting to be deleted. Rows are written by the article
+    views and removed by the process_media_deletions command once the
+    asset is gone; failed attempts are retried with backoff.
+    """
+    public_id = models.CharField(max_length=255)
+    resource_type = models.CharField(max_length=16, default='image')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        db_table = 'media_deletions'
+        unique_together = ['public_id', 'resource_type']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='media_deletions_due_idx'),
+        ]
@@ -0,0 +1,99 @@
+"""
+Personalized "for you" feed.
+
+compute_affinities() turns a user's likes and saves into normalized scores
+per category and per author, stored in user_affinities. for_you_article_ids()
+reads the user's top affinities, pulls a short recency list for each of those
+categories and authors, and merges the candidates by affinity and freshness.
+A feed therefore costs one query for the affinities, one per list (at most
+2 * AFFINITIES_PER_KIND) and one to drop articles the user already engaged with.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ArticleInteraction, UserAffinity
+from .trending import decay, half_life, published_articles
+
+# Weight of a like and of a save when building affinities
+LIKE_WEIGHT = 1.0
+SAVE_WEIGHT = 2.0
+
+# Categories and authors kept per user
+AFFINITIES_PER_KIND = 5
+
+
+def compute_affinities(user_ids):
+    """Rebuild the stored affinities of the given users from their likes and saves."""
+    rows = ArticleInteraction.objects.filter(
+        Q(liked=True) | Q(saved=True), user_id__in=user_ids
+    ).values("user_id", "article__category", "article__author_id").annotate(
+        likes=Count("id", filter=Q(liked=True)),
+        saves=Count("id", filter=Q(saved=True)),
+    )
+
+    weights = defaultdict(lambda: {UserAffinity.CATEGORY: defaultdict(float), UserAffinity.AUTHOR: defaultdict(float)})
+    for row in rows:
+        weight = row["likes"] * LIKE_WEIGHT + row["saves"] * SAVE_WEIGHT
+        user = weights[row["user_id"]]
+        if row["article__category"]:
+            user[UserAffinity.CATEGORY][row["article__category"]] += weight
+        user[UserAffinity.AUTHOR][str(row["article__author_id"])] += weight
+
+    affinities = []
+    for user_id, kinds in weights.items():
+        for kind, scores in kinds.items():
+            total = sum(scores.values())
+            top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:AFFINITIES_PER_KIND]
+            affinities.extend(
+                UserAffinity(user_id=user_id, kind=kind, key=key, score=score / total)
+                for key, score in top
+            )
+
+    with transaction.atomic():
+        UserAffinity.objects.filter(user_id__in=user_ids).delete()
+        UserAffinity.objects.bulk_create(affinities)
+    return len(affinities)
+
+
+def for_you_article_ids(user_id, limit):
+    """
+    Return up to `limit` recommended article ids for a user, best first, or
+    None when the user has no affinities yet.
+    """
+    affinities = list(
+        UserAffinity.objects.filter(user_id=user_id).order_by("-score").values_list("kind", "key", "score")
+    )
+    if not affinities:
+        return None
+
+    # Recency lists; each is served by the (category|author, created_at, id) index
+    candidates = {}
+    for kind, key, _ in affinities:
+        lookup = {"category": key} if kind == UserAffinity.CATEGORY else {"author_id": key}
+        rows = published_articles().filter(**lookup).order_by("-created_at", "-id").values_list(
+            "id", "category", "author_id", "created_at"
+        )[:limit]
+        for row in rows:
+            candidates[row[0]] = row
+    if not candidates:
+        return []
+
+    seen = set(ArticleInteraction.objects.filter(
+        Q(liked=True) | Q(saved=True), user_id=user_id, article_id__in=list(candidates)
+    ).values_list("article_id", flat=True))
+
+    by_kind = {(kind, key): score for kind, key, score in affinities}
+    now = timezone.now()
+    half_life_seconds = half_life().total_seconds()
+    scored = []
+    for article_id, category, author_id, created_at in candidates.values():
+        if article_id in seen:
+            continue
+        affinity = (by_kind.get((UserAffinity.CATEGORY, category), 0.0)
+                    + by_kind.get((UserAffinity.AUTHOR, str(author_id)), 0.0))
+        scored.append((affinity * decay(now - created_at, half_life_seconds), created_at, article_id))
+    scored.sort(reverse=True)
+    return [article_id for _, _, article_id in scored[:limit]]
@@ -0,0 +1,152 @@
+"""
+Full-text search over article titles and paragraph text.
+
+SQLite keeps an FTS5 table (articles_fts); PostgreSQL keeps a tsvector table
+(article_search) with a GIN index. Both are created by migration 0007, which
+spells out its own DDL, and kept in sync with Articles by the signal handlers
+in signals.py. Any other database
+falls back to a plain title/summary substring match.
+"""
+import re
+import uuid
+
+from django.db import connection
+
+from .content import parse_blocks, paragraph_texts
+
+SQLITE_TABLE = "articles_fts"
+POSTGRES_TABLE = "article_search"
+
+# bm25 column weights for (article_id, title, body): titles count ten times the body
+SQLITE_WEIGHTS = (0.0, 10.0, 1.0)
+
+
+def searchable_text(article):
+    """Return (title, body) where body is the paragraph text, not the raw block JSON."""
+    blocks = parse_blocks(article.content)
+    if blocks is None:
+        body = article.content or ""
+    else:
+        body = "\n".join(paragraph_texts(blocks))
+    return article.title or "", body
+
+
+def _sqlite_match(query):
+    """
+    Turn free text into an FTS5 expression limited to title/body: every word
+    must match, the last one as a prefix. Quoting each word keeps user input
+    from being parsed as FTS syntax.
+    """
+    words = re.findall(r"\w+", query or "")
+    if not words:
+        return None
+    terms = ['"%s"' % word for word in words]
+    terms[-1] += "*"
+    return "{title body} : (%s)" % " ".join(terms)
+
+
+# Index maintenance
+
+def index_article(article, conn=None):
+    """Insert or refresh the search document for an article."""
+    conn = conn or connection
+    title, body = searchable_text(article)
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            _sqlite_delete(cursor, article.id)
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (article_id, title, body) VALUES (%s, %s, %s)",
+                [uuid.UUID(str(article.id)).hex, title, body],
+            )
+        elif conn.vendor == "postgresql":
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (article_id, document) VALUES (%s, "
+                "setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B')) "
+                "ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document",
+                [str(article.id), title, body],
+            )
+
+
+def remove_article(article_id, conn=None):
+    """Drop an article's search document."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            _sqlite_delete(cursor, article_id)
+        elif conn.vendor == "postgresql":
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE article_id = %s", [str(article_id)])
+
+
+def _sqlite_delete(cursor, article_id):
+    # article_id is an indexed FTS column, so this is an index lookup rather than a table scan
+    cursor.execute(
+        f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN "
+        f"(SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s)",
+        ['article_id : "%s"' % uuid.UUID(str(article_id)).hex],
+    )
+
+
+# Querying
+
+def search_article_ids(query, category=None, status="published", published=True, limit=20, offset=0):
+    """
+    Return article ids matching `query`, best match first.
+    category/status/published filter on the articles table (None skips the
+    filter); the defaults only match published articles. limit/offset page
+    the ranking.
+    """
+    filters = []
+    params = []
+    if published is not None:
+        filters.append("a.published = %s")
+        params.append(published)
+    if category is not None:
+        filters.append("a.category = %s")
+        params.append(category)
+    if status is not None:
+        filters.append("a.status = %s")
+        params.append(status)
+    extra_where = "".join(f" AND {f}" for f in filters)
+
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        match = _sqlite_match(query)
+        if match is None:
+            return []
+        sql = (
+            f"SELECT a.id FROM {SQLITE_TABLE} "
+            f"JOIN articles a ON a.id = {SQLITE_TABLE}.article_id "
+            f"WHERE {SQLITE_TABLE} MATCH %s{extra_where} "
+            f"ORDER BY bm25({SQLITE_TABLE}, %s, %s, %s) LIMIT %s OFFSET %s"
+        )
+        params = [match] + params + list(SQLITE_WEIGHTS) + [limit, offset]
+    elif vendor == "postgresql":
+        if not (query or "").strip():
+            return []
+        sql = (
+            f"SELECT a.id FROM {POSTGRES_TABLE} s "
+            "JOIN articles a ON a.id = s.article_id, websearch_to_tsquery('english', %s) q "
+            f"WHERE s.document @@ q{extra_where} "
+            "ORDER BY ts_rank_cd(s.document, q) DESC LIMIT %s OFFSET %s"
+        )
+        params = [query] + params + [limit, offset]
+    else:
+        return _fallback_search(query, category, status, published, limit, offset)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [uuid.UUID(str(row[0])) for row in cursor.fetchall()]
+
+
+def _fallback_search(query, category, status, published, limit, offset):
+    from django.db.models import Q
+    from .models import Articles
+
+    qs = Articles.objects.filter(Q(title__icontains=query) | Q(summary__icontains=query))
+    if category is not None:
+        qs = qs.filter(category=category)
+    if status is not None:
+        qs = qs.filter(status=status)
+    if published is not None:
+        qs = qs.filter(published=published)
+    return list(qs.order_by("-created_at").values_list("id", flat=True)[offset:offset + limit])
@@ -0,0 +1,102 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from n_backend.app.users.models import Users
+
+from . import cache as response_cache
+from . import media
+from . import search
+from .models import Articles
+
+
+@receiver(post_save, sender=Articles)
+def index_saved_article(sender, instance, update_fields=None, raw=False, using=None, **kwargs):
+    """Keep the full-text index in sync when an article's title or content changes"""
+    if raw:
+        return
+    if update_fields is not None and not {'title', 'content'} & set(update_fields):
+        return
+    search.index_article(instance, conn=connections[using])
+
+
+@receiver(post_delete, sender=Articles)
+def unindex_deleted_article(sender, instance, using=None, **kwargs):
+    search.remove_article(instance.pk, conn=connections[using])
+
+
+@receiver(post_init, sender=Articles)
+def remember_article_scopes(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not loaded just for this
+    instance._cached_category = instance.__dict__.get('category')
+
+
+@receiver(post_save, sender=Articles)
+@receiver(post_delete, sender=Articles)
+def bump_article_cache(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Invalidate the cached responses an article appears in whenever it is
+    saved or deleted, from the API, the admin or a shell alike. Writes done
+    with queryset.update() send no signal and bump explicitly.
+    """
+    if raw:
+        return
+    article_id, author_id, category = instance.pk, instance.author_id, instance.__dict__.get('category')
+    old_category = getattr(instance, '_cached_category', None)
+    instance._cached_category = category
+
+    def bump():
+        response_cache.bump_article(article_id, author_id, category, facets=True)
+        response_cache.bump(response_cache.TRENDING)
+        if old_category is not None and old_category != category:
+            response_cache.bump(response_cache.category_scope(old_category))
+
+    transaction.on_commit(bump, using=using)
+
+
+# Author fields article payloads embed (see views._article_author)
+EMBEDDED_AUTHOR_FIELDS = ('username', 'email')
+
+
+@receiver(post_init, sender=Users)
+def remember_author_fields(sender, instance, **kwargs):
+    instance._cached_author_fields = tuple(instance.__dict__.get(name) for name in EMBEDDED_AUTHOR_FIELDS)
+
+
+@receiver(post_save, sender=Users)
+def bump_author_cache(sender, instance, created=False, update_fields=None, raw=False, using=None, **kwargs):
+    """
+    Articles embed their author's username and email, so changing either
+    retires every cached response showing them. Only the author's own scope
+    is bumped: responses record the author generations they embed.
+    """
+    if raw or created:
+        return
+    if update_fields is not None and not set(EMBEDDED_AUTHOR_FIELDS) & set(update_fields):
+        return
+    embedded = tuple(instance.__dict__.get(name) for name in EMBEDDED_AUTHOR_FIELDS)
+    unchanged = embedded == getattr(instance, '_cached_author_fields', None)
+    instance._cached_author_fields = embedded
+    if unchanged:
+        return
+    transaction.on_commit(lambda: response_cache.bump(response_cache.author_scope(instance.pk)), using=using)
+
+
+@receiver(post_save, sender=Articles)
+def record_article_media(sender, instance, update_fields=None, raw=False, using=None, **kwargs):
+    """Keep media_references in step with the assets in an article's media list and content"""
+    if raw:
+        return
+    if update_fields is not None and not {'media', 'content'} & set(update_fields):
+        return
+    media.record_references(media.article_assets(instance.media, instance.content), using=using, article=instance)
+
+
+@receiver(post_save, sender=Users)
+def record_user_media(sender, instance, update_fields=None, raw=False, using=None, **kwargs):
+    """Keep media_references in step with a user's profile image and PDF"""
+    if raw:
+        return
+    if update_fields is not None and not {'profileUrl', 'pdfUrl', 'pdfPublicId'} & set(update_fields):
+        return
+    media.record_references(media.user_assets(instance), using=using, user=instance)
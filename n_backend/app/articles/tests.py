@@ -1,3 +1,1412 @@
-from django.test import TestCase
+import io
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import Http404
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import F, QuerySet
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from n_backend.app import storage
+from n_backend.app.storage import CloudinaryStorage, LocalStorage
+from n_backend.app.users.models import Users
+from n_backend.app.users.views import generate_simple_token
+from . import cache as response_cache
+from . import media, trending, views
+from .buffer import InteractionBuffer
+from .models import (
+    Articles, ArticleInteraction, ArticleComment, MediaAsset, MediaDeletion, MediaReference, TrendingArticle,
+    UserAffinity,
+)
+
+# A plan step that reads a whole table with no index, e.g. "SCAN articles"
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+# A plan step that walks a whole index, e.g. "SCAN articles USING INDEX articles_created_idx"
+INDEX_SCAN = re.compile(r"^SCAN (\w+) USING (?:COVERING )?INDEX (\w+)")
+# Indexes a filtered query may walk: trending_articles only holds published
+# articles, so the join filter rarely rejects a row and the walk stops at the LIMIT
+RANKED_INDEXES = {"trending_score_idx"}
+
+
+def partial_indexes(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA index_list({table})")
+        return {row[1] for row in cursor.fetchall() if row[4]}
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """Every query issued by the read views must be served from an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create(username="admin", email="admin@example.com", password="x", role="admin")
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x", role="reader")
+        cls.articles = [
+            Articles.objects.create(
+                title=f"Article {i}",
+                content=json.dumps([{"type": "paragraph", "value": f"Body text {i}"}]),
+                author=cls.author,
+                category="news" if i % 2 else "sport",
+                status="published" if i % 3 else "draft",
+                published=bool(i % 3),
+            )
+            for i in range(6)
+        ]
+        ArticleInteraction.objects.create(article=cls.articles[0], user=cls.reader, liked=True, saved=True,
+                                          liked_at=timezone.now(), saved_at=timezone.now())
+        ArticleComment.objects.create(article=cls.articles[0], user=cls.reader, body="Nice")
+        ArticleInteraction.objects.create(article=cls.articles[1], user=cls.reader, saved=True,
+                                          saved_at=timezone.now())
+        TrendingArticle.objects.create(article=cls.articles[1], score=2.0)
+        UserAffinity.objects.create(user=cls.reader, kind=UserAffinity.CATEGORY, key="news", score=0.5)
+        UserAffinity.objects.create(user=cls.reader, kind=UserAffinity.AUTHOR, key=str(cls.author.id), score=0.5)
+
+    def setUp(self):
+        cache.clear()
+        self.admin_headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(self.admin)}"}
+
+    def assertIndexedQueries(self, url, **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertTrue(selects, f"{url} issued no queries")
+        plans = []
+        for sql in selects:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = [row[-1] for row in cursor.fetchall()]
+            plans.append(plan)
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+            self.assertFalse(scans, f"{url} runs a full table scan:\n{sql}\n{plan}")
+
+            # Walking a whole index is only bounded when it is a partial index matching the
+            # filter, or an unfiltered listing that stops at its LIMIT; otherwise it needs a SEARCH
+            filtered = " WHERE " in sql.upper()
+            walks = [
+                step for step in plan
+                if (match := INDEX_SCAN.match(step)) and filtered
+                and match[2] not in RANKED_INDEXES and match[2] not in partial_indexes(match[1])
+            ]
+            self.assertFalse(walks, f"{url} walks a whole index to filter rows:\n{sql}\n{plan}")
+        return plans
+
+    def test_article_listings(self):
+        self.assertIndexedQueries("/api/articles/get/")
+        self.assertIndexedQueries("/api/articles/get-by-category/?category=news")
+        self.assertIndexedQueries(f"/api/articles/get-by-author/?author={self.author.id}")
+        self.assertIndexedQueries("/api/articles/categories/")
+        self.assertIndexedQueries(f"/api/articles/categories/?author={self.author.id}")
+
+    def test_ranked_feeds(self):
+        self.assertIndexedQueries("/api/articles/trending/")
+        self.assertIndexedQueries(f"/api/articles/for-you/?user_id={self.reader.id}")
+
+    def test_trending_walks_the_score_index(self):
+        # With table statistics the planner sees trending_articles is the smaller side
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        plans = self.assertIndexedQueries("/api/articles/trending/")
+        steps = [step for plan in plans for step in plan]
+        self.assertTrue(any(step.startswith("SCAN trending_articles USING INDEX trending_score_idx") for step in steps),
+                        plans)
+
+    def test_article_detail(self):
+        self.assertIndexedQueries(f"/api/articles/get-by-id/?id={self.articles[0].id}")
+
+    def test_interaction_reads(self):
+        article_id = self.articles[0].id
+        self.assertIndexedQueries(f"/api/articles/get-comments/?article_id={article_id}")
+        self.assertIndexedQueries(f"/api/articles/get-saved-articles/?user_id={self.reader.id}")
+        self.assertIndexedQueries(f"/api/articles/user-interaction/?article_id={article_id}&user_id={self.reader.id}")
+
+    def test_admin_listings(self):
+        self.assertIndexedQueries("/api/articles/admin/approved/", **self.admin_headers)
+        self.assertIndexedQueries("/api/articles/admin/pending/", **self.admin_headers)
+        self.assertIndexedQueries("/auth/list/", **self.admin_headers)
+
+
+class CacheInvalidationTests(TestCase):
+    """Cached responses drop on model writes made outside the API views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.article = Articles.objects.create(
+            title="Original", content=json.dumps([{"type": "paragraph", "value": "Body"}]),
+            author=cls.author, category="news", status="published", published=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_article(self):
+        response = self.client.get(f"/api/articles/get-by-id/?id={self.article.id}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]["article"]
+
+    def test_admin_edit_invalidates(self):
+        self.assertEqual(self.get_article()["title"], "Original")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = "Edited in admin"
+            self.article.save()
+        self.assertEqual(self.get_article()["title"], "Edited in admin")
+
+    def test_profile_change_invalidates(self):
+        self.get_article()
+        listing = self.client.get("/api/articles/get-by-category/?category=news").json()
+        self.assertEqual(listing["data"]["articles"][0]["author"]["username"], "author")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.username = "renamed"
+            self.author.save()
+        self.assertEqual(self.get_article()["author"]["username"], "renamed")
+        listing = self.client.get("/api/articles/get-by-category/?category=news").json()
+        self.assertEqual(listing["data"]["articles"][0]["author"]["username"], "renamed")
+
+    def test_profile_change_only_bumps_the_author_scope(self):
+        scopes = [response_cache.ALL_ARTICLES, response_cache.TRENDING, response_cache.author_scope(self.author.id),
+                  response_cache.article_scope(self.article.id), response_cache.category_scope("news")]
+        before = response_cache.get_generations(scopes)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.pdfUrl = "https://example.com/cv.pdf"
+            self.author.save()
+        self.assertEqual(response_cache.get_generations(scopes), before)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.email = "new@example.com"
+            self.author.save()
+        after = response_cache.get_generations(scopes)
+        self.assertEqual(after[:2] + after[3:], before[:2] + before[3:])
+        self.assertNotEqual(after[2], before[2])
+
+    def test_category_change_invalidates_old_category(self):
+        def category_ids(category):
+            data = self.client.get(f"/api/articles/get-by-category/?category={category}").json()["data"]
+            return [a["id"] for a in data["articles"]]
+
+        self.assertEqual(category_ids("news"), [str(self.article.id)])
+        article = Articles.objects.get(pk=self.article.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            article.category = "sport"
+            article.save()
+        self.assertEqual(category_ids("news"), [])
+        self.assertEqual(category_ids("sport"), [str(self.article.id)])
+
+
+class CommentsEtagTests(TestCase):
+    """Conditional comment reads revalidate when a commenter's state changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.commenter = Users.objects.create(username="commenter", email="commenter@example.com", password="x")
+        cls.article = Articles.objects.create(title="Article", content="[]", author=cls.author,
+                                              category="news", status="published", published=True)
+        ArticleComment.objects.create(article=cls.article, user=cls.commenter, body="First")
+        Articles.objects.filter(pk=cls.article.pk).update(comments_count=1)
+
+    def get_comments(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(f"/api/articles/get-comments/?article_id={self.article.id}", **headers)
+
+    def test_unchanged_comments_are_not_modified(self):
+        etag = self.get_comments()["ETag"]
+        self.assertEqual(self.get_comments(etag).status_code, 304)
+
+    def test_commenter_like_changes_etag(self):
+        etag = self.get_comments()["ETag"]
+        views.set_interaction_flag(self.article.id, self.commenter.id, "liked")
+        response = self.get_comments(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["data"]["comments"][0]["liked"])
+
+    def test_commenter_rename_changes_etag(self):
+        etag = self.get_comments()["ETag"]
+        self.commenter.username = "renamed"
+        self.commenter.save()
+        response = self.get_comments(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["comments"][0]["author"]["username"], "renamed")
+
+
+class PaginationTests(TestCase):
+    """Keyset pages never skip or repeat rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x")
+        cls.articles = [
+            Articles.objects.create(title=f"Article {i}", content="[]", author=cls.author, category="news")
+            for i in range(5)
+        ]
+        # Rows written in the same instant only differ by id
+        Articles.objects.update(created_at=timezone.now())
+
+    def setUp(self):
+        cache.clear()
+
+    def collect(self, url, key):
+        ids, cursor = [], None
+        while True:
+            data = self.client.get(url + (f"&cursor={cursor}" if cursor else "")).json()["data"]
+            ids.extend(item["id"] if "id" in item else item["article"]["id"] for item in data[key])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                return ids
+
+    def test_pages_across_equal_timestamps(self):
+        ids = self.collect("/api/articles/get/?view=summary&limit=2", "articles")
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {str(article.id) for article in self.articles})
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ("garbage", "eyJ0IjogIm5vdCBhIHRpbWUifQ"):
+            response = self.client.get(f"/api/articles/get/?cursor={cursor}")
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["message"], "Invalid cursor")
+
+    def test_comments_count_is_the_article_total(self):
+        article = self.articles[0]
+        for i in range(3):
+            ArticleComment.objects.create(article=article, user=self.reader, body=f"Comment {i}")
+        Articles.objects.filter(pk=article.pk).update(comments_count=3)
+        data = self.client.get(f"/api/articles/get-comments/?article_id={article.id}&limit=1").json()["data"]
+        self.assertEqual(len(data["comments"]), 1)
+        self.assertEqual(data["comments_count"], 3)
+
+    def test_saved_articles_page_by_save_time(self):
+        now = timezone.now()
+        # Interactions created oldest first, saved in the opposite order
+        for i, article in enumerate(self.articles):
+            ArticleInteraction.objects.create(article=article, user=self.reader, saved=True,
+                                              saved_at=now - timedelta(minutes=i))
+        ArticleInteraction.objects.update(created_at=now)
+        url = f"/api/articles/get-saved-articles/?user_id={self.reader.id}&view=summary&limit=2"
+        self.assertEqual(self.collect(url, "saved_articles"), [str(article.id) for article in self.articles])
+        data = self.client.get(url).json()["data"]
+        self.assertEqual(data["total"], 5)
+        self.assertEqual(data["saved_articles"][0]["saved_at"], now.isoformat())
+
+
+class FieldSelectionTests(TestCase):
+    """Summary and fields= reads never load the article body."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x")
+        cls.article = Articles.objects.create(
+            title="Article", content=json.dumps([{"type": "paragraph", "value": "Body"}]), author=cls.author,
+            category="news", status="published", published=True,
+        )
+        ArticleInteraction.objects.create(article=cls.article, user=cls.reader, saved=True, saved_at=timezone.now())
+        TrendingArticle.objects.create(article=cls.article, score=1.0)
+
+    def setUp(self):
+        cache.clear()
+
+    def urls(self, query):
+        return [
+            f"/api/articles/get/?{query}",
+            f"/api/articles/get/?{query}&stream=1",
+            f"/api/articles/get-by-category/?category=news&{query}",
+            f"/api/articles/get-by-author/?author={self.author.id}&{query}",
+            f"/api/articles/get-by-id/?id={self.article.id}&{query}",
+            f"/api/articles/trending/?{query}",
+            f"/api/articles/get-saved-articles/?user_id={self.reader.id}&{query}",
+        ]
+
+    def assertBodyNotSelected(self, query):
+        for url in self.urls(query):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+                for query_sql in ctx.captured_queries:
+                    self.assertNotIn('."content"', query_sql["sql"])
+
+    def test_summary_view_skips_content(self):
+        self.assertBodyNotSelected("view=summary")
+        article = self.client.get("/api/articles/get/?view=summary").json()["data"]["articles"][0]
+        self.assertEqual(tuple(article), views.ARTICLE_VIEWS["summary"])
+
+    def test_fields_skip_content(self):
+        self.assertBodyNotSelected("fields=title,likes_count")
+        article = self.client.get("/api/articles/get/?fields=likes_count,title").json()["data"]["articles"][0]
+        self.assertEqual(list(article), ["id", "title", "likes_count"])
+
+    def test_unknown_fields_and_views_are_rejected(self):
+        for query, message in (("fields=title,body", "Unknown fields: body"),
+                               ("view=compact", "view must be one of: full, summary")):
+            for url in self.urls(query):
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.json()["message"], message)
+
+
+class StreamingTests(TestCase):
+    """?stream=1 responses are always complete JSON documents."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        for i in range(7):
+            Articles.objects.create(title=f"Article {i}", content="[]", author=cls.author, category="news")
+
+    def stream(self, url):
+        response = self.client.get(url)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, json.loads(body)
+
+    def test_stream_matches_buffered_page(self):
+        with mock.patch("n_backend.app.articles.views.STREAM_CHUNK_SIZE", 2):
+            for limit in (2, 3, 5, 7, 10):
+                status, streamed = self.stream(f"/api/articles/get/?view=summary&limit={limit}&stream=1")
+                buffered = self.client.get(f"/api/articles/get/?view=summary&limit={limit}").json()
+                self.assertEqual(status, 200)
+                self.assertEqual(streamed["data"]["articles"], buffered["data"]["articles"])
+                self.assertEqual(streamed["data"]["next_cursor"], buffered["data"]["next_cursor"])
+
+    def test_failure_before_streaming_is_an_error_status(self):
+        with mock.patch("n_backend.app.articles.views.article_to_dict", side_effect=RuntimeError("boom")):
+            response = self.client.get("/api/articles/get/?stream=1")
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.json()["success"])
+
+    def test_failure_mid_stream_closes_the_document(self):
+        from n_backend.app.articles import views
+
+        calls = []
+
+        def failing(article, fields=None):
+            calls.append(article.id)
+            if len(calls) == 4:
+                raise RuntimeError("boom")
+            return views.ARTICLE_FIELDS["id"](article)
+
+        with mock.patch.object(views, "STREAM_CHUNK_SIZE", 2), mock.patch.object(views, "article_to_dict", failing):
+            status, body = self.stream("/api/articles/get/?stream=1&limit=7")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["error"], "Stream interrupted")
+        self.assertEqual(body["data"]["articles"], [str(article_id) for article_id in calls[:2]])
+        self.assertEqual(body["data"]["total"], 2)
+
+        resumed = self.client.get(f"/api/articles/get/?limit=7&cursor={body['data']['next_cursor']}").json()
+        self.assertEqual(len(resumed["data"]["articles"]), 5)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create(username="admin", email="admin@example.com", password="x", role="admin")
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        body = json.dumps([{"type": "paragraph", "value": "Election results tonight"}])
+        cls.published = Articles.objects.create(title="Live", content=body, author=cls.author,
+                                                status="published", published=True)
+        cls.draft = Articles.objects.create(title="Draft", content=body, author=cls.author, status="draft",
+                                            published=False)
+        cls.deleted = Articles.objects.create(title="Deleted", content=body, author=cls.author, status="deleted",
+                                              published=False)
+
+    def search(self, url, user=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(user)}"} if user else {}
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return {article["id"] for article in response.json()["data"]["articles"]}
+
+    def test_only_published_articles_are_returned(self):
+        self.assertEqual(self.search("/api/articles/search/?q=election"), {str(self.published.id)})
+        self.assertEqual(self.search("/api/articles/search/?q=election", self.admin), {str(self.published.id)})
+
+    def test_admins_can_search_by_status(self):
+        self.assertEqual(self.search("/api/articles/search/?q=election&status=draft", self.admin),
+                         {str(self.draft.id)})
+        self.assertEqual(self.search("/api/articles/search/?q=election&status=all", self.admin),
+                         {str(a.id) for a in (self.published, self.draft, self.deleted)})
+
+    def test_status_requires_an_admin(self):
+        url = "/api/articles/search/?q=election&status=draft"
+        self.assertEqual(self.client.get(url).status_code, 401)
+        author_headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(self.author)}"}
+        self.assertEqual(self.client.get(url, **author_headers).status_code, 403)
+        admin_headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(self.admin)}"}
+        self.assertEqual(self.client.get("/api/articles/search/?q=election&status=hidden", **admin_headers).status_code,
+                         400)
+
+
+class BatchCountsTests(TestCase):
+    """aggregate-counts/batch answers any number of ids with one query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.articles = [
+            Articles.objects.create(title=f"Article {i}", content="[]", author=cls.author,
+                                    likes_count=i, comments_count=2 * i)
+            for i in range(3)
+        ]
+
+    def post(self, article_ids):
+        return self.client.post("/api/articles/aggregate-counts/batch/", {"article_ids": article_ids},
+                                content_type="application/json")
+
+    def test_counts_in_one_query(self):
+        ids = [str(article.id) for article in self.articles]
+        with self.assertNumQueries(1):
+            response = self.post(ids + ids[:1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["counts"], {
+            str(article.id): {"likes_count": i, "comments_count": 2 * i} for i, article in enumerate(self.articles)
+        })
+
+    def test_invalid_and_unknown_ids_are_left_out(self):
+        with self.assertNumQueries(1):
+            response = self.post([str(self.articles[0].id), "not-a-uuid", 42, str(uuid.uuid4())])
+        self.assertEqual(response.json()["data"]["counts"],
+                         {str(self.articles[0].id): {"likes_count": 0, "comments_count": 0}})
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.post([str(uuid.uuid4()) for _ in range(views.MAX_BATCH_IDS)]).status_code, 200)
+        for article_ids in ([str(uuid.uuid4()) for _ in range(views.MAX_BATCH_IDS + 1)], [], "id"):
+            with self.subTest(article_ids=article_ids[:2]):
+                with self.assertNumQueries(0):
+                    response = self.post(article_ids)
+                self.assertEqual(response.status_code, 400)
+
+
+class BatchInteractionTests(TestCase):
+    """user-interaction/batch answers any number of ids with one query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x")
+        cls.articles = [
+            Articles.objects.create(title=f"Article {i}", content="[]", author=cls.author) for i in range(3)
+        ]
+        ArticleInteraction.objects.create(article=cls.articles[0], user=cls.reader, liked=True)
+        ArticleInteraction.objects.create(article=cls.articles[1], user=cls.reader, saved=True)
+        ArticleComment.objects.create(article=cls.articles[1], user=cls.reader, body="Hi")
+
+    def post(self, article_ids, user_id=None):
+        return self.client.post("/api/articles/user-interaction/batch/",
+                                {"user_id": str(user_id or self.reader.id), "article_ids": article_ids},
+                                content_type="application/json")
+
+    def test_states_in_one_query(self):
+        ids = [str(article.id) for article in self.articles]
+        with self.assertNumQueries(1):
+            response = self.post(ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["interactions"], {
+            ids[0]: {"liked": True, "saved": False, "has_comment": False},
+            ids[1]: {"liked": False, "saved": True, "has_comment": True},
+            ids[2]: {"liked": False, "saved": False, "has_comment": False},
+        })
+
+    def test_invalid_ids_are_skipped_and_unknown_ids_default(self):
+        unknown = str(uuid.uuid4())
+        with self.assertNumQueries(1):
+            response = self.post(["not-a-uuid", unknown])
+        self.assertEqual(response.json()["data"]["interactions"],
+                         {unknown: {"liked": False, "saved": False, "has_comment": False}})
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.post([str(uuid.uuid4()) for _ in range(views.MAX_BATCH_IDS)]).status_code, 200)
+        for article_ids, user_id in (([str(uuid.uuid4()) for _ in range(views.MAX_BATCH_IDS + 1)], None),
+                                     ([], None), ([str(self.articles[0].id)], "not-a-uuid")):
+            with self.subTest(article_ids=article_ids[:2], user_id=user_id):
+                with self.assertNumQueries(0):
+                    response = self.post(article_ids, user_id)
+                self.assertEqual(response.status_code, 400)
+
+
+class InteractionBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x", role="reader")
+        cls.article = Articles.objects.create(title="Article", content="[]", author=cls.author)
+
+    def make_buffer(self, max_events=1000):
+        buf = InteractionBuffer(flush_interval_ms=10 ** 9, max_events=max_events)
+        self.addCleanup(lambda: buf._timer and buf._timer.cancel())
+        return buf
+
+    def stored(self):
+        interaction = ArticleInteraction.objects.filter(article=self.article, user=self.reader).first()
+        self.article.refresh_from_db()
+        return (interaction.liked, interaction.saved) if interaction else None, self.article.likes_count
+
+    def test_repeated_toggles_merge_into_one_write(self):
+        buf = self.make_buffer()
+        values = [buf.toggle(self.article.id, self.reader.id, "liked") for _ in range(3)]
+        self.assertEqual(values, [True, False, True])
+        self.assertEqual(len(buf._pending), 1)
+        self.assertEqual(buf.pending_delta(self.article.id, "liked"), 1)
+        self.assertIsNone(self.stored()[0])
+
+        buf.flush()
+        self.assertEqual(self.stored(), ((True, False), 1))
+        self.assertEqual(buf.pending_delta(self.article.id, "liked"), 0)
+
+    def test_stored_state_is_read_outside_the_lock(self):
+        buf = self.make_buffer()
+        read = buf._stored_value
+
+        def checked(*args):
+            self.assertFalse(buf._lock.locked())
+            return read(*args)
+
+        with mock.patch.object(buf, "_stored_value", side_effect=checked) as stored_value:
+            buf.toggle(self.article.id, self.reader.id, "liked")
+            buf.toggle(self.article.id, self.reader.id, "liked")
+        # The second toggle is answered from the buffer
+        self.assertEqual(stored_value.call_count, 1)
+
+    def test_failed_flush_requeues_the_batch(self):
+        buf = self.make_buffer()
+        buf.toggle(self.article.id, self.reader.id, "liked")
+        with mock.patch.object(buf, "_write", side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                buf.flush()
+        self.assertEqual(buf._pending, {(self.article.id, self.reader.id): {"liked": True}})
+        self.assertEqual(buf.pending_delta(self.article.id, "liked"), 1)
+        self.assertIsNotNone(buf._timer)
+
+        # Toggles made after the failure merge with the requeued state
+        buf.toggle(self.article.id, self.reader.id, "saved")
+        buf.flush()
+        self.assertEqual(self.stored(), ((True, True), 1))
+
+    def test_threshold_triggers_a_flush(self):
+        buf = self.make_buffer(max_events=2)
+        buf.toggle(self.article.id, self.reader.id, "liked")
+        self.assertIsNone(self.stored()[0])
+        buf.toggle(self.article.id, self.reader.id, "saved")
+        self.assertEqual(self.stored(), ((True, True), 1))
+        self.assertEqual(buf._pending, {})
+
+    def test_failed_threshold_flush_does_not_fail_the_toggle(self):
+        buf = self.make_buffer(max_events=1)
+        with mock.patch.object(buf, "_write", side_effect=RuntimeError("database down")):
+            self.assertTrue(buf.toggle(self.article.id, self.reader.id, "liked"))
+        self.assertEqual(buf.pending_delta(self.article.id, "liked"), 1)
+        buf.flush()
+        self.assertEqual(self.stored(), ((True, False), 1))
+
+    @override_settings(INTERACTION_WRITE_BEHIND=True)
+    def test_reads_see_unflushed_toggles(self):
+        ArticleInteraction.objects.create(article=self.article, user=self.reader, saved=True)
+        buf = self.make_buffer()
+        buf.toggle(self.article.id, self.reader.id, "liked")
+        buf.toggle(self.article.id, self.reader.id, "saved")
+        expected = {"liked": True, "saved": False, "has_comment": False}
+        with mock.patch.object(views.interaction_buffer, "get_buffer", return_value=buf):
+            single = self.client.get(
+                f"/api/articles/user-interaction/?article_id={self.article.id}&user_id={self.reader.id}"
+            ).json()["data"]
+            batch = self.client.post(
+                "/api/articles/user-interaction/batch/",
+                {"user_id": str(self.reader.id), "article_ids": [str(self.article.id)]}, content_type="application/json"
+            ).json()["data"]["interactions"]
+        self.assertEqual(single, expected)
+        self.assertEqual(batch, {str(self.article.id): expected})
+
+
+class InteractionToggleTests(TestCase):
+    """Article counters always match the interaction rows behind them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.readers = [
+            Users.objects.create(username=f"reader{i}", email=f"reader{i}@example.com", password="x", role="reader")
+            for i in range(3)
+        ]
+        cls.article = Articles.objects.create(title="Article", content="[]", author=cls.author)
+
+    def assertCountersMatchRows(self):
+        self.article.refresh_from_db()
+        interactions = ArticleInteraction.objects.filter(article=self.article)
+        self.assertEqual(self.article.likes_count, interactions.filter(liked=True).count())
+        self.assertEqual(self.article.saves_count, interactions.filter(saved=True).count())
+
+    def test_interleaved_toggles_and_sets(self):
+        steps = [
+            (0, "liked", None), (1, "liked", None), (0, "saved", True), (0, "liked", None),
+            (2, "liked", False), (1, "liked", True), (2, "saved", None), (0, "saved", True),
+            (1, "liked", None), (2, "saved", False), (0, "liked", True), (0, "saved", None),
+        ]
+        for reader, field, value in steps:
+            views.set_interaction_flag(self.article.id, self.readers[reader].id, field, value)
+            self.assertCountersMatchRows()
+
+    def concurrent_insert(self, reader, **flags):
+        """Insert the interaction, as another request would, right after the first UPDATE finds no row."""
+        update = QuerySet.update
+        raced = []
+
+        def update_then_insert(queryset, **kwargs):
+            if raced or queryset.model is not ArticleInteraction:
+                return update(queryset, **kwargs)
+            raced.append(True)
+            ArticleInteraction.objects.create(article_id=self.article.id, user_id=reader.id, **flags)
+            for field in flags:
+                counter = ArticleInteraction.COUNTER_FIELDS[field]
+                Articles.objects.filter(pk=self.article.id).update(**{counter: F(counter) + 1})
+            return 0
+
+        return mock.patch.object(QuerySet, "update", autospec=True, side_effect=update_then_insert)
+
+    def test_toggle_losing_the_insert_race_flips_the_winner(self):
+        reader = self.readers[0]
+        with self.concurrent_insert(reader, liked=True):
+            self.assertFalse(views.set_interaction_flag(self.article.id, reader.id, "liked"))
+        self.assertCountersMatchRows()
+        self.assertEqual(self.article.likes_count, 0)
+
+    def test_set_losing_the_insert_race_keeps_the_winner(self):
+        reader = self.readers[0]
+        with self.concurrent_insert(reader, saved=True):
+            self.assertTrue(views.set_interaction_flag(self.article.id, reader.id, "saved", True))
+        self.assertCountersMatchRows()
+        self.assertEqual(self.article.saves_count, 1)
+
+
+@unittest.skipIf(connection.vendor == "sqlite", "SQLite serializes writers, so requests cannot interleave")
+class ConcurrentToggleTests(TransactionTestCase):
+    def test_parallel_toggles_keep_counters_consistent(self):
+        author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                      role="journalist")
+        readers = [
+            Users.objects.create(username=f"reader{i}", email=f"reader{i}@example.com", password="x", role="reader")
+            for i in range(4)
+        ]
+        article = Articles.objects.create(title="Article", content="[]", author=author)
+        barrier = threading.Barrier(len(readers) * 2)
+        errors = []
+
+        def toggle(reader, times):
+            try:
+                barrier.wait()
+                for _ in range(times):
+                    views.set_interaction_flag(article.id, reader.id, "liked")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        # Two threads per reader race on the same row, toggling 5 + 5 or 5 + 6 times
+        threads = [
+            threading.Thread(target=toggle, args=(reader, times))
+            for index, reader in enumerate(readers) for times in (5, 5 + index % 2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        article.refresh_from_db()
+        liked = ArticleInteraction.objects.filter(article=article, liked=True)
+        self.assertEqual(article.likes_count, liked.count())
+        # Readers with an odd number of toggles in total end up liking the article
+        self.assertEqual(set(liked.values_list("user_id", flat=True)), {readers[1].id, readers[3].id})
+
+
+class CommentMigrationTests(TransactionTestCase):
+    """0009 moves interaction comments into article_comments and back."""
+    before = [("articles", "0008_article_query_indexes")]
+    after = [("articles", "0009_article_comments")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_comments_move_and_counts_hold(self):
+        apps = self.migrate(self.before)
+        Users = apps.get_model("users", "Users")
+        Articles = apps.get_model("articles", "Articles")
+        ArticleInteraction = apps.get_model("articles", "ArticleInteraction")
+
+        author = Users.objects.create(username="author", email="author@example.com", password="x", role="journalist")
+        readers = [
+            Users.objects.create(username=f"reader{i}", email=f"reader{i}@example.com", password="x", role="reader")
+            for i in range(4)
+        ]
+        # comments_count as 0005 backfilled it: non-empty comments only
+        article = Articles.objects.create(title="Commented", content="[]", author=author, comments_count=2)
+        quiet = Articles.objects.create(title="Quiet", content="[]", author=author)
+        first = ArticleInteraction.objects.create(article=article, user=readers[0], comment="First")
+        second = ArticleInteraction.objects.create(article=article, user=readers[1], comment="Second", liked=True)
+        ArticleInteraction.objects.create(article=article, user=readers[2], comment="", saved=True)
+        ArticleInteraction.objects.create(article=quiet, user=readers[3], liked=True)
+
+        apps = self.migrate(self.after)
+        ArticleComment = apps.get_model("articles", "ArticleComment")
+        self.assertEqual(
+            set(ArticleComment.objects.values_list("id", "article_id", "user_id", "body")),
+            {(first.id, article.id, readers[0].id, "First"), (second.id, article.id, readers[1].id, "Second")},
+        )
+        Articles = apps.get_model("articles", "Articles")
+        for row in Articles.objects.all():
+            self.assertEqual(row.comments_count, ArticleComment.objects.filter(article_id=row.id).count())
+
+        apps = self.migrate(self.before)
+        ArticleInteraction = apps.get_model("articles", "ArticleInteraction")
+        self.assertEqual(
+            dict(ArticleInteraction.objects.exclude(comment=None).exclude(comment="")
+                 .values_list("user_id", "comment")),
+            {readers[0].id: "First", readers[1].id: "Second"},
+        )
+
+
+class MediaReferenceMigrationTests(TransactionTestCase):
+    """0015 backfills media_references the way the live helpers record them."""
+    before = [("articles", "0014_interaction_set_at")]
+    after = [("articles", "0015_media_references")]
+
+    migrate = CommentMigrationTests.migrate
+    tearDown = CommentMigrationTests.tearDown
+
+    def test_backfill_matches_live_parsing(self):
+        apps = self.migrate(self.before)
+        Users = apps.get_model("users", "Users")
+        Articles = apps.get_model("articles", "Articles")
+
+        cloud = "https://res.cloudinary.com/demo"
+        user = Users.objects.create(
+            username="author", email="author@example.com", password="x", role="journalist",
+            profileUrl=f"{cloud}/image/upload/w_200,c_fill/v17/profiles/me.png",
+            pdfUrl=f"{cloud}/raw/upload/v3/cv/me.pdf", pdfPublicId="cv/me.pdf",
+        )
+        content = json.dumps([
+            {"type": "paragraph", "value": f"{cloud}/image/upload/v1/not-media.png"},
+            {"type": "image", "value": f"{cloud}/image/upload/v2/articles/lead.jpg", "public_id": "articles/lead"},
+            {"type": "video", "value": f"{cloud}/video/upload/c_scale/clips/intro.mp4"},
+        ])
+        article = Articles.objects.create(title="Media", content=content, author=user,
+                                          media=[f"{cloud}/image/upload/v5/articles/gallery.webp", 42])
+
+        apps = self.migrate(self.after)
+        MediaReference = apps.get_model("articles", "MediaReference")
+
+        def recorded(**owner):
+            return set(MediaReference.objects.filter(**owner).values_list("public_id", "resource_type"))
+
+        self.assertEqual(recorded(article_id=article.id), media.article_assets(article.media, article.content))
+        self.assertEqual(recorded(user_id=user.id), media.user_assets(user))
+        self.assertIn(("clips/intro", "video"), recorded(article_id=article.id))
+
+
+
+@mock.patch.object(views, "MODERATION_CHUNK_SIZE", 2)
+class ModerationTests(TestCase):
+    """Bulk moderation works through the ids in chunks and reports each one as found or missing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create(username="admin", email="admin@example.com", password="x", role="admin")
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.articles = [
+            Articles.objects.create(title=f"Article {i}", content="[]", author=cls.author) for i in range(5)
+        ]
+
+    def setUp(self):
+        self.admin_headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(self.admin)}"}
+        self.ids = [str(article.id) for article in self.articles]
+        self.missing = str(uuid.uuid4())
+
+    def moderate(self, url, data, method="post"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, json.dumps(data), content_type="application/json",
+                                                    **self.admin_headers)
+        writes = [q["sql"] for q in ctx.captured_queries if re.match(r'\s*(UPDATE|DELETE FROM) "articles"', q["sql"])]
+        return response, writes
+
+    def test_approve_reports_missing_and_malformed_ids(self):
+        requested = [self.ids[3], self.missing, self.ids[0], "not-a-uuid", self.ids[3], self.ids[4]]
+        response, writes = self.moderate("/api/articles/admin/approve/", {"article_ids": requested})
+
+        self.assertEqual(response.status_code, 207, response.content)
+        self.assertEqual(response.json()["data"], {
+            "approved": [self.ids[3], self.ids[0], self.ids[4]],
+            "failed": [self.missing, "not-a-uuid"],
+        })
+        # Four valid ids in chunks of two
+        self.assertEqual(len(writes), 2)
+        published = Articles.objects.filter(status="published", published=True)
+        self.assertEqual({str(pk) for pk in published.values_list("id", flat=True)},
+                         {self.ids[0], self.ids[3], self.ids[4]})
+
+    def test_reject_every_id_found(self):
+        response, writes = self.moderate("/api/articles/admin/reject/", {"article_ids": self.ids})
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["data"], {"rejected_article_ids": self.ids, "missing_ids": [], "count": 5})
+        self.assertEqual(len(writes), 3)
+        self.assertEqual(Articles.objects.filter(status="deleted").count(), 5)
+
+    def test_delete_reports_missing_ids(self):
+        response, writes = self.moderate(
+            "/api/articles/admin/delete/", {"article_ids": [self.ids[1], self.missing, self.ids[2]]}, method="delete"
+        )
+
+        self.assertEqual(response.status_code, 207, response.content)
+        self.assertEqual(response.json()["data"], {
+            "deleted_article_ids": [self.ids[1], self.ids[2]], "missing_ids": [self.missing], "count": 2,
+        })
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(Articles.objects.count(), 3)
+
+    def test_single_missing_id_is_not_found(self):
+        response, _ = self.moderate("/api/articles/admin/reject/", {"article_id": self.missing})
+        self.assertEqual(response.status_code, 404, response.content)
+        response, _ = self.moderate("/api/articles/admin/delete/", {"article_id": self.missing}, method="delete")
+        self.assertEqual(response.status_code, 404, response.content)
+
+
+@override_settings(TRENDING_COMMIT_LAG_SECONDS=60)
+class RecountTests(TestCase):
+    """recount_article_interactions repairs drifted counters and the responses showing them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x")
+        cls.articles = [
+            Articles.objects.create(title=f"Article {i}", content="[]", author=cls.author, category="news")
+            for i in range(3)
+        ]
+        ArticleInteraction.objects.create(article=cls.articles[0], user=cls.reader, liked=True, saved=True)
+        ArticleComment.objects.create(article=cls.articles[1], user=cls.reader, body="Hi")
+        Articles.objects.filter(pk=cls.articles[2].pk).update(likes_count=4)
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        data = self.client.get("/api/articles/get/?fields=likes_count,comments_count").json()["data"]
+        return {a["id"]: (a["likes_count"], a["comments_count"]) for a in data["articles"]}
+
+    def test_repairs_counters_and_cached_listings(self):
+        stale = self.counts()
+        self.assertEqual(stale[str(self.articles[2].id)], (4, 0))
+        out = io.StringIO()
+        call_command("recount_article_interactions", chunk_size=2, stdout=out)
+        self.assertIn("Checked 3 article(s), repaired 3", out.getvalue())
+        self.assertEqual(self.counts(), {
+            str(self.articles[0].id): (1, 0),
+            str(self.articles[1].id): (0, 1),
+            str(self.articles[2].id): (0, 0),
+        })
+        self.assertEqual(Articles.objects.get(pk=self.articles[0].pk).saves_count, 1)
+
+
+class DashboardStatsTests(TestCase):
+    """admin/dashboard-stats counts everything in one query per table and caches the result."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create(username="admin", email="admin@example.com", password="x", role="admin")
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        Users.objects.create(username="reader", email="reader@example.com", password="x", role="reader")
+        cls.draft = Articles.objects.create(title="Draft", content="[]", author=cls.author, likes_count=2)
+        Articles.objects.create(title="Live", content="[]", author=cls.author, status="published", published=True,
+                                likes_count=3, comments_count=4, saves_count=1)
+        Articles.objects.create(title="Gone", content="[]", author=cls.author, status="deleted")
+
+    def setUp(self):
+        cache.clear()
+        self.admin_headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(self.admin)}"}
+
+    def stats(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/articles/admin/dashboard-stats/", **self.admin_headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        aggregates = [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"].upper()]
+        return response.json()["data"], len(aggregates)
+
+    def test_counts(self):
+        data, aggregates = self.stats()
+        self.assertEqual(aggregates, 2)
+        self.assertEqual(data, {
+            "users": {"total": 3, "by_role": {"reader": 1, "journalist": 1, "user": 0, "admin": 1}},
+            "articles": {"total": 3, "pending": 1, "approved": 1,
+                         "by_status": {"draft": 1, "published": 1, "deleted": 1}},
+            "interactions": {"likes": 5, "comments": 4, "saves": 1},
+        })
+
+    def test_cached_until_moderation(self):
+        self.stats()
+        data, aggregates = self.stats()
+        self.assertEqual(aggregates, 0)
+        self.assertEqual(data["articles"]["pending"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status, self.draft.published = "published", True
+            self.draft.save()
+        data, aggregates = self.stats()
+        self.assertEqual(aggregates, 2)
+        self.assertEqual((data["articles"]["pending"], data["articles"]["approved"]), (0, 2))
+
+    @override_settings(ADMIN_STATS_CACHE_TIMEOUT=0)
+    def test_timeout_setting(self):
+        self.stats()
+        self.assertEqual(self.stats()[1], 2)
+
+    def test_requires_admin(self):
+        reader_headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_simple_token(self.author)}"}
+        for headers, status in (({}, 401), (reader_headers, 403)):
+            response = self.client.get("/api/articles/admin/dashboard-stats/", **headers)
+            self.assertEqual(response.status_code, status)
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+        cls.reader = Users.objects.create(username="reader", email="reader@example.com", password="x", role="reader")
+        cls.article = Articles.objects.create(title="Article", content="[]", author=cls.author,
+                                              status="published", published=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def events(self, since):
+        return [weight for _, weight, _ in trending.collect_events(since, timezone.now() + timedelta(minutes=1))]
+
+    def test_likes_count_once_per_transition(self):
+        start = timezone.now()
+        views.set_interaction_flag(self.article.id, self.reader.id, "liked")
+        self.assertEqual(self.events(start), [trending.WEIGHTS["like"]])
+
+        # Saving later, or re-setting the like, writes the row without counting the like again
+        marker = timezone.now()
+        views.set_interaction_flag(self.article.id, self.reader.id, "saved")
+        views.set_interaction_flag(self.article.id, self.reader.id, "liked", True)
+        self.assertEqual(self.events(marker), [trending.WEIGHTS["save"]])
+
+        # Liking again after an unlike is a new transition
+        marker = timezone.now()
+        views.set_interaction_flag(self.article.id, self.reader.id, "liked")
+        views.set_interaction_flag(self.article.id, self.reader.id, "liked")
+        self.assertEqual(self.events(marker), [trending.WEIGHTS["like"]])
+
+    def test_buffered_writes_stamp_transitions_only(self):
+        buf = InteractionBuffer(flush_interval_ms=10 ** 9, max_events=1000)
+        self.addCleanup(lambda: buf._timer and buf._timer.cancel())
+        buf.toggle(self.article.id, self.reader.id, "liked")
+        buf.flush()
+        liked_at = ArticleInteraction.objects.get(article=self.article, user=self.reader).liked_at
+        self.assertIsNotNone(liked_at)
+
+        buf.toggle(self.article.id, self.reader.id, "saved")
+        buf.flush()
+        interaction = ArticleInteraction.objects.get(article=self.article, user=self.reader)
+        self.assertEqual(interaction.liked_at, liked_at)
+        self.assertIsNotNone(interaction.saved_at)
+
+    def test_refresh_waits_for_late_commits(self):
+        views.set_interaction_flag(self.article.id, self.reader.id, "liked")
+        stamped = ArticleInteraction.objects.get(article=self.article, user=self.reader).liked_at
+
+        # Within the lag the like may belong to a transaction that has not committed yet
+        self.assertEqual(trending.refresh(now=stamped + timedelta(seconds=30)), 0)
+        self.assertFalse(TrendingArticle.objects.exists())
+
+        self.assertEqual(trending.refresh(now=stamped + timedelta(seconds=61)), 1)
+        self.assertTrue(TrendingArticle.objects.filter(article=self.article).exists())
+        # Later runs do not count it again
+        score = TrendingArticle.objects.get(article=self.article).score
+        trending.refresh(now=stamped + timedelta(seconds=62))
+        self.assertLess(TrendingArticle.objects.get(article=self.article).score, score)
+
+    def test_moderation_drops_cached_trending_feed(self):
+        TrendingArticle.objects.create(article=self.article, score=1.0)
+        url = "/api/articles/trending/?view=summary"
+        ids = [a["id"] for a in self.client.get(url).json()["data"]["articles"]]
+        self.assertEqual(ids, [str(self.article.id)])
+
+        views.moderate_articles([self.article.id], status="deleted", published=False)
+        data = self.client.get(url).json()["data"]
+        self.assertEqual((data["articles"], data["source"]), ([], "recent"))
+
+
+class RunUploadsTests(SimpleTestCase):
+    """run_uploads keeps task order, caps its workers and lets go of slow uploads."""
+
+    def test_results_keep_task_order(self):
+        def task(value, delay):
+            def run():
+                threading.Event().wait(delay)
+                if isinstance(value, Exception):
+                    raise value
+                return value
+            return run
+
+        error = RuntimeError("upload failed")
+        results = media.run_uploads([task("slow", 0.2), task(error, 0.1), task("fast", 0)], max_workers=3)
+        self.assertEqual(results, ["slow", error, "fast"])
+
+    def test_concurrency_is_capped(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def task():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            threading.Event().wait(0.05)
+            with lock:
+                running.pop()
+            return True
+
+        self.assertEqual(media.run_uploads([task] * 6, max_workers=2), [True] * 6)
+        self.assertEqual(max(peak), 2)
+
+    def test_timeout_discards_late_results(self):
+        release = threading.Event()
+        late = []
+        handled = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return "late"
+
+        def failing_slow():
+            release.wait(5)
+            raise RuntimeError("upload failed")
+
+        def on_late_result(result):
+            late.append(result)
+            handled.set()
+
+        # Both workers are stuck, so the last task never starts
+        results = media.run_uploads([slow, failing_slow, lambda: "queued"],
+                                    on_late_result=on_late_result, max_workers=2, timeout=0.2)
+        for result in results:
+            self.assertIsInstance(result, media.UploadTimeout)
+
+        release.set()
+        self.assertTrue(handled.wait(5))
+        # Only the upload that finished late is handed back; the failed and never-started ones are not
+        threading.Event().wait(0.1)
+        self.assertEqual(late, ["late"])
+
+
+class MediaDeletionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Users.objects.create(username="author", email="author@example.com", password="x",
+                                          role="journalist")
+
+    def setUp(self):
+        self.storage = mock.Mock(bulk_delete_limit=100)
+        self.storage.parse_url.side_effect = CloudinaryStorage().parse_url
+        self.storage.delete_many.side_effect = lambda public_ids, resource_type: {
+            "deleted": {public_id: "deleted" for public_id in public_ids}
+        }
+        patcher = mock.patch.object(media, "get_storage", return_value=self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        media.queue_deletions(public_ids=["news/a", "news/b"])
+
+    def url(self, public_id):
+        return f"https://res.cloudinary.com/demo/image/upload/v1/{public_id}.jpg"
+
+    def deleted_ids(self):
+        return sorted(public_id for call in self.storage.delete_many.call_args_list for public_id in call.args[0])
+
+    def test_storage_is_called_outside_the_claim(self):
+        depth = len(connection.atomic_blocks)
+
+        def delete_many(public_ids, resource_type):
+            self.assertEqual(len(connection.atomic_blocks), depth)
+            # Another worker finds nothing due while the batch is leased
+            self.assertEqual(media.claim_deletions(10, timezone.now())[0], [])
+            return {"deleted": {public_id: "deleted" for public_id in public_ids}}
+
+        self.storage.delete_many.side_effect = delete_many
+        self.assertEqual(media.process_deletions(), (2, 0, 0, 0))
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    def test_failures_are_rescheduled_with_backoff(self):
+        self.storage.delete_many.side_effect = lambda public_ids, resource_type: {
+            "deleted": {"news/a": "deleted", "news/b": "error: busy"}
+        }
+        before = timezone.now()
+        self.assertEqual(media.process_deletions(), (1, 0, 0, 1))
+        row = MediaDeletion.objects.get()
+        self.assertEqual((row.public_id, row.attempts, row.last_error), ("news/b", 1, "Delete status: error: busy"))
+        self.assertGreaterEqual(row.next_attempt_at, before + media.retry_delay(1))
+
+    def test_expired_lease_is_left_to_the_new_holder(self):
+        def delete_many(public_ids, resource_type):
+            # The lease ran out and another worker claimed the batch again
+            MediaDeletion.objects.update(next_attempt_at=timezone.now() + timedelta(hours=1))
+            raise OSError("timed out")
+
+        self.storage.delete_many.side_effect = delete_many
+        self.assertEqual(media.process_deletions(), (0, 0, 0, 0))
+        self.assertEqual(list(MediaDeletion.objects.values_list("attempts", flat=True)), [0, 0])
+
+    def test_registered_assets_leave_the_registry_before_deletion(self):
+        MediaAsset.objects.create(key="url:a", public_id="news/a", secure_url=self.url("news/a"))
+        before = timezone.now()
+        self.assertEqual(media.process_deletions(), (1, 0, 1, 0))
+        self.assertEqual(self.deleted_ids(), ["news/b"])
+        self.assertFalse(MediaAsset.objects.exists())
+        row = MediaDeletion.objects.get()
+        self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=media.DELETE_GRACE_SECONDS))
+
+        # A request that found the asset in the registry before it was dropped saves it within the grace period
+        Articles.objects.create(title="Reused", content="[]", author=self.author, media=[self.url("news/a")])
+        MediaDeletion.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(media.process_deletions(), (0, 1, 0, 0))
+        self.assertEqual(self.deleted_ids(), ["news/b"])
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    def test_content_blocks_and_profiles_keep_assets(self):
+        Articles.objects.create(title="Blocks", author=self.author, content=json.dumps([
+            {"type": "paragraph", "value": "Body"},
+            {"type": "image", "value": self.url("news/a"), "caption": ""},
+        ]))
+        Users.objects.create(username="reader", email="reader@example.com", password="x", role="reader",
+                             profileUrl=self.url("news/b"))
+        self.assertEqual(media.process_deletions(), (0, 2, 0, 0))
+        self.storage.delete_many.assert_not_called()
+
+    def test_references_follow_their_owner(self):
+        article = Articles.objects.create(title="Article", content="[]", author=self.author, media=[self.url("news/a")])
+        references = MediaReference.objects.filter(article=article)
+        self.assertEqual(list(references.values_list("public_id", flat=True)), ["news/a"])
+
+        article.media = [self.url("news/b")]
+        article.save()
+        self.assertEqual(list(references.values_list("public_id", flat=True)), ["news/b"])
+
+        article.delete()
+        self.assertFalse(MediaReference.objects.exists())
+
+
+class LocalStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = LocalStorage(root=self.root, base_url="/media/")
+
+    def upload(self, name, body=b"\x89PNG", content_type="image/png"):
+        return self.storage.upload(SimpleUploadedFile(name, body, content_type=content_type), folder="articles/1")
+
+    def test_upload_stores_under_a_new_public_id(self):
+        result = self.upload("Photo.PNG")
+        self.assertRegex(result["public_id"], r"^articles/1/[0-9a-f]{32}\.png$")
+        self.assertEqual(result["secure_url"], f"/media/{result['public_id']}")
+        self.assertEqual((result["bytes"], result["format"]), (4, "png"))
+        with open(self.storage.path(result["public_id"]), "rb") as stored:
+            self.assertEqual(stored.read(), b"\x89PNG")
+
+    def test_upload_only_accepts_allowed_types(self):
+        self.assertTrue(self.upload("photo", content_type="image/webp")["public_id"].endswith(".webp"))
+        self.assertTrue(self.upload("cv.pdf", b"%PDF", "application/pdf")["public_id"].endswith(".pdf"))
+        for name, content_type in (("page.html", "image/png"), ("icon.svg", "image/svg+xml"), ("page", "text/html")):
+            with self.assertRaises(ValueError):
+                self.upload(name, content_type=content_type)
+
+    def test_delete_statuses(self):
+        public_id = self.upload("a.png")["public_id"]
+        self.assertEqual(self.storage.delete(public_id), {"result": "ok"})
+        self.assertEqual(self.storage.delete(public_id), {"result": "not found"})
+
+        kept = self.upload("b.png")["public_id"]
+        statuses = self.storage.delete_many([kept, "articles/1/missing.png", "../outside.png"])["deleted"]
+        self.assertEqual(statuses[kept], "deleted")
+        self.assertEqual(statuses["articles/1/missing.png"], "not_found")
+        self.assertTrue(statuses["../outside.png"].startswith("error: "))
+        with self.assertRaises(OSError):
+            self.storage.delete("../outside.png")
+
+    def test_path_rejects_traversal(self):
+        for public_id in ("../outside.png", "a/../../outside.png", "/etc/passwd"):
+            with self.assertRaises(SuspiciousFileOperation):
+                self.storage.path(public_id)
+
+    def test_parse_url(self):
+        self.assertEqual(self.storage.parse_url("/media/a/b%20c.png"), ("a/b c.png", "image"))
+        self.assertIsNone(self.storage.parse_url("/media/"))
+        self.assertIsNone(self.storage.parse_url("/static/a.png"))
+        # A relative MEDIA_STORAGE_URL only claims relative URLs
+        self.assertIsNone(self.storage.parse_url("https://elsewhere.example/media/a.png"))
+
+        cdn = LocalStorage(root=self.root, base_url="https://cdn.example/media/")
+        self.assertEqual(cdn.parse_url("https://cdn.example/media/a.png"), ("a.png", "image"))
+        self.assertEqual(cdn.parse_url("/media/a.png"), ("a.png", "image"))
+        self.assertIsNone(cdn.parse_url("https://elsewhere.example/media/a.png"))
+        self.assertIsNone(cdn.parse_url(None))
+
+
+class UrlImportTests(SimpleTestCase):
+    """LocalStorage.upload_from_url only fetches public hosts and only keeps images."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = LocalStorage(root=self.root, base_url="/media/")
+        self.hosts = {"images.example": "93.184.216.34", "internal.example": "10.0.0.5"}
+        patcher = mock.patch.object(storage.socket, "getaddrinfo", side_effect=self.resolve)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.responses = []
+        self.requested = []
+        patcher = mock.patch.object(storage, "HTTPSConnection", side_effect=self.connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def resolve(self, host, port, *args, **kwargs):
+        address = self.hosts.get(host, host)
+        family = socket.AF_INET6 if ":" in address else socket.AF_INET
+        return [(family, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    def connect(self, host, port, timeout=None):
+        status, headers, body = self.responses.pop(0)
+        response = mock.Mock(status=status)
+        response.getheader.side_effect = headers.get
+        response.headers.get_content_type.return_value = headers.get("Content-Type", "text/plain")
+        response.read.side_effect = io.BytesIO(body).read
+        connection = mock.Mock()
+        connection.getresponse.return_value = response
+        connection.request.side_effect = lambda method, path, headers: self.requested.append((host, path))
+        return connection
+
+    def test_private_and_local_addresses_are_refused(self):
+        for url in ("https://127.0.0.1/a.png", "https://169.254.169.254/latest/meta-data", "https://[::1]/a.png",
+                    "https://internal.example/a.png", "https://[::ffff:10.0.0.1]/a.png", "file:///etc/passwd"):
+            with self.assertRaises(ValueError, msg=url):
+                self.storage.upload_from_url(url)
+        self.assertEqual(self.requested, [])
+
+    def test_redirects_to_private_addresses_are_refused(self):
+        self.responses.append((302, {"Location": "https://internal.example/secret"}, b""))
+        with self.assertRaises(ValueError):
+            self.storage.upload_from_url("https://images.example/a.png")
+        self.assertEqual(self.requested, [("images.example", "/a.png")])
+
+    def test_only_images_are_stored(self):
+        self.responses.append((200, {"Content-Type": "text/html"}, b"<script>alert(1)</script>"))
+        with self.assertRaises(ValueError):
+            self.storage.upload_from_url("https://images.example/a.png")
+        self.assertEqual(os.listdir(self.root), [])
+
+        # The extension comes from the checked Content-Type, not the URL
+        self.responses.append((301, {"Location": "/cdn/b.html?size=2"}, b""))
+        self.responses.append((200, {"Content-Type": "image/gif"}, b"GIF89a"))
+        result = self.storage.upload_from_url("https://images.example/b")
+        self.assertTrue(result["public_id"].endswith(".gif"))
+        self.assertEqual(self.requested[-1], ("images.example", "/cdn/b.html?size=2"))
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings = override_settings(
+            MEDIA_STORAGE_BACKEND="n_backend.app.storage.LocalStorage", MEDIA_STORAGE_ROOT=self.root,
+            MEDIA_STORAGE_URL="/media/", MEDIA_STORAGE_INTERNAL_URL="/protected-media/",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for name, body in (("a/photo.png", b"\x89PNG"), ("a/cv.pdf", b"%PDF"), ("a/page.html", b"<html>")):
+            os.makedirs(os.path.join(self.root, "a"), exist_ok=True)
+            with open(os.path.join(self.root, name), "wb") as out:
+                out.write(body)
+
+    def serve(self, path, header=""):
+        with override_settings(MEDIA_STORAGE_SENDFILE_HEADER=header):
+            return storage.serve_media(RequestFactory().get(f"/media/{path}"), path)
+
+    def test_streams_without_a_sendfile_header(self):
+        response = self.serve("a/photo.png")
+        self.assertEqual(b"".join(response.streaming_content), b"\x89PNG")
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertTrue(response["Content-Disposition"].startswith("inline"))
+
+    def test_sendfile_headers(self):
+        response = self.serve("a/photo.png", "X-Accel-Redirect")
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/a/photo.png")
+        self.assertEqual(response.content, b"")
+        response = self.serve("a/photo.png", "X-Sendfile")
+        self.assertEqual(response["X-Sendfile"], os.path.join(self.root, "a", "photo.png"))
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+    def test_non_images_are_downloads(self):
+        response = self.serve("a/cv.pdf", "X-Accel-Redirect")
+        self.assertEqual((response["Content-Type"], response["Content-Disposition"]), ("application/pdf", "attachment"))
+        response = self.serve("a/page.html")
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response["Content-Disposition"], "attachment")
+        response.close()
+
+    def test_missing_and_outside_paths_are_not_found(self):
+        for path in ("a/missing.png", "../outside.png", "a/../../outside.png"):
+            with self.assertRaises(Http404):
+                self.serve(path)
+
+
+class GetStorageTests(SimpleTestCase):
+    def test_backend_follows_settings(self):
+        self.assertIsInstance(storage.get_storage(), CloudinaryStorage)
+        with override_settings(MEDIA_STORAGE_BACKEND="n_backend.app.storage.LocalStorage"):
+            backend = storage.get_storage()
+            self.assertIsInstance(backend, LocalStorage)
+            self.assertIs(storage.get_storage(), backend)
+        self.assertIsInstance(storage.get_storage(), CloudinaryStorage)
+
+    def test_reset_storage(self):
+        backend = storage.get_storage()
+        storage.reset_storage()
+        self.assertIsNot(storage.get_storage(), backend)
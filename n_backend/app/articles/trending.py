@@ -0,0 +1,119 @@
+"""
+Time-decayed trending ranking for published articles.
+
+Scores live in the trending_articles table and are refreshed incrementally by
+the refresh_trending management command: each run decays every stored score
+by the time elapsed since the previous run, then adds the likes, saves and
+comments recorded since that run, each weighted by how long ago it happened.
+Reads only ever touch the precomputed table.
+
+A like or save is counted once, at the liked_at/saved_at stamp written when
+the flag goes from unset to set; other writes to the row do not count it
+again, and unliking does not subtract from a score; the decay takes it away.
+
+Events are stamped before their transaction commits, so each run only
+processes up to TRENDING_COMMIT_LAG_SECONDS ago; a write that commits late
+still lands in a window that has not been processed yet.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cache as response_cache
+from .models import Articles, ArticleComment, ArticleInteraction, TrendingArticle, TrendingRefresh
+
+# Score contributed by one event of each kind, before decay
+WEIGHTS = {"like": 1.0, "save": 2.0, "comment": 3.0}
+
+# Scores below this are dropped from the table
+MIN_SCORE = 0.01
+
+# On the first run, look back this many half-lives; anything older would score almost nothing
+INITIAL_HALF_LIVES = 10
+
+
+def half_life():
+    return timedelta(hours=getattr(settings, "TRENDING_HALF_LIFE_HOURS", 24))
+
+
+def commit_lag():
+    return timedelta(seconds=getattr(settings, "TRENDING_COMMIT_LAG_SECONDS", 60))
+
+
+def decay(age, half_life_seconds):
+    """Fraction of its weight an event keeps after `age`."""
+    return math.pow(0.5, max(age.total_seconds(), 0) / half_life_seconds)
+
+
+def published_articles():
+    return Articles.objects.filter(status="published", published=True)
+
+
+def collect_events(since, until):
+    """Yield (article_id, weight, happened_at) for every event in (since, until]."""
+    article_filter = {"article__status": "published", "article__published": True}
+    for field, kind in (("liked", "like"), ("saved", "save")):
+        set_at = ArticleInteraction.SET_AT_FIELDS[field]
+        window = {field: True, f"{set_at}__gt": since, f"{set_at}__lte": until}
+        rows = ArticleInteraction.objects.filter(**window, **article_filter).values_list("article_id", set_at)
+        for article_id, happened_at in rows.iterator():
+            yield article_id, WEIGHTS[kind], happened_at
+
+    rows = ArticleComment.objects.filter(
+        created_at__gt=since, created_at__lte=until, **article_filter
+    ).values_list("article_id", "created_at")
+    for article_id, happened_at in rows.iterator():
+        yield article_id, WEIGHTS["comment"], happened_at
+
+
+def refresh(now=None):
+    """
+    Bring the ranking up to `now` minus the commit lag. Returns the number
+    of articles whose score received new events.
+    """
+    until = (now or timezone.now()) - commit_lag()
+    half_life_seconds = half_life().total_seconds()
+
+    with transaction.atomic():
+        state, _ = TrendingRefresh.objects.select_for_update().get_or_create(
+            pk=1, defaults={"processed_until": until - half_life() * INITIAL_HALF_LIVES}
+        )
+        since = state.processed_until
+        if until <= since:
+            return 0
+
+        # Age every stored score to `until`
+        TrendingArticle.objects.update(score=F("score") * decay(until - since, half_life_seconds))
+
+        added = defaultdict(float)
+        for article_id, weight, happened_at in collect_events(since, until):
+            added[article_id] += weight * decay(until - happened_at, half_life_seconds)
+
+        if added:
+            current = dict(
+                TrendingArticle.objects.filter(article_id__in=list(added)).values_list("article_id", "score")
+            )
+            TrendingArticle.objects.bulk_create(
+                [
+                    TrendingArticle(article_id=article_id, score=current.get(article_id, 0.0) + score)
+                    for article_id, score in added.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["article"],
+                update_fields=["score"],
+            )
+
+        # Drop faded scores and articles that are no longer published
+        TrendingArticle.objects.filter(score__lt=MIN_SCORE).delete()
+        TrendingArticle.objects.exclude(article__in=published_articles().values("id")).delete()
+
+        state.processed_until = until
+        state.save(update_fields=["processed_until", "updated_at"])
+
+    response_cache.bump(response_cache.TRENDING)
+    return len(added)
@@ -10,7 +10,12 @@ urlpatterns =[
     path('get-by-id/', views.get_article_by_id, name='get_article_by_id'),
     path('get-by-category/', views.get_articles_by_category, name='get_article_by_category'),
     path('get-by-author/', views.get_articles_by_author, name='get_article_by_author'),
+    path('search/', views.search_articles, name='search_articles'),
+    path('trending/', views.get_trending_articles, name='get_trending_articles'),
+    path('for-you/', views.get_for_you_articles, name='get_for_you_articles'),
+    path('categories/', views.get_category_counts, name='get_category_counts'),
     path('aggregate-counts/', views.article_comments_likes, name='article_counts'),
+    path('aggregate-counts/batch/', views.article_counts_batch, name='article_counts_batch'),
     # Interaction endpoints
     path('add-like/', views.add_like, name='add_like'),
     path('add-comment/', views.add_comment, name='add_comment'),
@@ -18,6 +23,7 @@ urlpatterns =[
     path('toggle-save-article/', views.toggle_save_article, name='toggle_save_article'),
     path('get-saved-articles/', views.get_saved_articles, name='get_saved_articles'),
     path('user-interaction/', views.get_user_interaction, name='user_interaction'),
+    path('user-interaction/batch/', views.get_user_interactions_batch, name='user_interactions_batch'),
     path('comments-likes/', views.article_comments_likes, name='article_comments_likes'),
 
     # Cloudinary image upload endpoint
@@ -26,6 +32,7 @@ urlpatterns =[
     # Admin endpoints
     path('admin/pending/', views.get_pending_articles, name='get_pending_articles'),
     path('admin/approved/', views.get_approved_articles, name='get_approved_articles'),
+    path('admin/dashboard-stats/', views.admin_dashboard_stats, name='admin_dashboard_stats'),
     path('admin/approve/', views.approve_article, name='approve_article'),
     path('admin/reject/', views.reject_article, name='reject_article'),
     path('admin/delete/', views.delete_article_admin, name='delete_article_admin'),
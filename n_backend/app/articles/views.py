@@ -1,73 +1,263 @@
 # views.py (articles)
+import hashlib
 import json
-from django.http import JsonResponse
+import uuid
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case, Count, DateTimeField, Exists, F, Max, OuterRef, Q, Subquery, Sum, Value, When,
+)
 from django.utils import timezone
-
-from .models import Articles, ArticleInteraction
+from django.utils.http import http_date
+
+from .models import Articles, ArticleInteraction, ArticleComment, TrendingArticle, PENDING_ARTICLES
+from . import buffer as interaction_buffer
+from . import cache as response_cache
+from . import media
+from . import recommendations
+from . import search
+from . import trending
 from n_backend.app.users.models import Users
 
 # Adjust these imports to match where you keep them
 from n_backend.app.users.views import verify_simple_token
-from n_backend.app.utils import require_admin
-
-try:
-    from n_backend.app.cloudinary import upload_image, upload_image_from_url, delete_image
-except Exception:
-    def upload_image(file_obj, folder=None, resource_type='image', overwrite=False):
-        raise Exception("upload_image not implemented or import path wrong")
+from n_backend.app.utils import (
+    require_admin, get_page_params, paginate_keyset, keyset_queryset, cursor_for, parse_timestamp,
+    STREAM_MAX_PAGE_SIZE
+)
+from n_backend.app.storage import get_storage, upload_image, upload_image_from_url, delete_image
 
 
-    def upload_image_from_url(image_url, folder=None, resource_type='image'):
-        raise Exception("upload_image_from_url not implemented")
+def _article_content(article):
+    try:
+        return json.loads(article.content) if article.content else []
+    except Exception:
+        return article.content or ""
 
 
-    def delete_image(public_id, resource_type='image'):
-        raise Exception("delete_image not implemented")
+def _article_author(article):
+    if not article.author:
+        return {}
+    return {
+        "id": str(article.author.id),
+        "username": getattr(article.author, "username", ""),
+        "email": getattr(article.author, "email", "")
+    }
 
 
-def article_to_dict(article: Articles):
+# Serializers for every field article_to_dict can emit, in output order
+ARTICLE_FIELDS = {
+    "id": lambda a: str(a.id),
+    "title": lambda a: a.title,
+    "content": _article_content,
+    "author": _article_author,
+    "media": lambda a: a.media or [],
+    "category": lambda a: a.category or "",
+    "published": lambda a: bool(a.published),
+    "status": lambda a: a.status or "",
+    "likes_count": lambda a: a.likes_count,
+    "comments_count": lambda a: a.comments_count,
+    "summary": lambda a: a.summary,
+    "word_count": lambda a: a.word_count,
+    "reading_time": lambda a: a.reading_time,
+    "lead_image": lambda a: a.lead_image,
+    "created_at": lambda a: a.created_at.isoformat() if a.created_at else None,
+    "updated_at": lambda a: a.updated_at.isoformat() if a.updated_at else None,
+}
+
+ARTICLE_VIEWS = {
+    "full": tuple(ARTICLE_FIELDS),
+    # Feed cards: never loads or decodes the article body
+    "summary": (
+        "id", "title", "author", "category", "published", "status", "likes_count",
+        "comments_count", "summary", "reading_time", "lead_image", "created_at", "updated_at",
+    ),
+}
+
+
+def get_article_fields(request):
+    """
+    Resolve the article projection from ?fields=a,b,c or ?view=summary|full (default full).
+    Raises ValueError on unknown fields or views.
+    """
+    fields_raw = request.GET.get("fields")
+    if fields_raw:
+        requested = [f.strip() for f in fields_raw.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in ARTICLE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        # Keep output order stable and always identify the article
+        return tuple(f for f in ARTICLE_FIELDS if f == "id" or f in requested)
+
+    view = request.GET.get("view") or "full"
+    if view not in ARTICLE_VIEWS:
+        raise ValueError("view must be one of: " + ", ".join(ARTICLE_VIEWS))
+    return ARTICLE_VIEWS[view]
+
+
+def project_articles(qs, fields, prefix=""):
+    """Restrict an articles queryset to the columns needed to serialize `fields`."""
+    if "author" in fields:
+        qs = qs.select_related(f"{prefix}author")
+    deferred = [f"{prefix}{name}" for name in ("content", "media") if name not in fields]
+    if deferred:
+        qs = qs.defer(*deferred)
+    return qs
+
+
+def article_to_dict(article: Articles, fields=None):
     """
     Convert Articles instance to JSON-serializable dict.
-    Now includes likes_count and comments_count from ArticleInteraction model.
+    `fields` limits the output to a projection (see get_article_fields); default is every field.
+    likes_count and comments_count come from the stored counters on Articles.
+    """
+    fields = ARTICLE_VIEWS["full"] if fields is None else fields
+    return {name: ARTICLE_FIELDS[name](article) for name in fields}
+
+
+def embedded_authors(articles, fields):
+    """Author ids a serialized page embeds, for response_cache.set_response."""
+    return {article.author_id for article in articles} if "author" in fields else ()
+
+
+def _etag(*parts):
+    """Strong ETag over the given version parts."""
+    raw = json.dumps([str(p) for p in parts])
+    return '"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def article_etag(request):
+    """
+    ETag for get_article_by_id, built from version columns only so that a
+    matching If-None-Match is answered without loading or serializing the article.
     """
+    article_id = request.GET.get("id")
+    if not article_id:
+        return None
     try:
-        content = json.loads(article.content) if article.content else []
-    except Exception:
-        content = article.content or ""
+        version = Articles.objects.filter(id=article_id).values_list(
+            "updated_at", "likes_count", "comments_count", "author__updated_at"
+        ).first()
+    except ValidationError:
+        return None
+    if version is None:
+        return None
+    return _etag(article_id, sorted(request.GET.lists()), *version)
 
-    author_data = {}
-    if article.author:
-        author_data = {
-            "id": str(article.author.id),
-            "username": getattr(article.author, "username", ""),
-            "email": getattr(article.author, "email", "")
-        }
 
-    # Calculate counts using ArticleInteraction model
-    likes_count = ArticleInteraction.objects.filter(article=article, liked=True).count()
-    comments_count = ArticleInteraction.objects.filter(
-        article=article
-    ).exclude(comment__isnull=True).exclude(comment='').count()
+def comments_etag(request):
+    """
+    ETag for get_comments: the comment counter, the newest comment, and the
+    newest write to the article's interactions and to any commenter, since
+    each comment carries its author's profile and like/save state.
+    """
+    article_id = request.GET.get("article_id")
+    if not article_id:
+        return None
+    newest = partial(Subquery, output_field=DateTimeField())
+    try:
+        version = Articles.objects.filter(id=article_id).annotate(
+            last_comment_at=Max("comments__created_at"),
+            last_interaction_at=newest(ArticleInteraction.objects.filter(article=OuterRef("pk")).order_by(
+                "-updated_at"
+            ).values("updated_at")[:1]),
+            last_commenter_at=newest(Users.objects.filter(article_comments__article=OuterRef("pk")).order_by(
+                "-updated_at"
+            ).values("updated_at")[:1]),
+        ).values_list("comments_count", "last_comment_at", "last_interaction_at", "last_commenter_at").first()
+    except ValidationError:
+        return None
+    if version is None:
+        return None
+    return _etag(article_id, sorted(request.GET.lists()), *version)
+
+
+def set_last_modified(response, articles):
+    """Set Last-Modified to the newest updated_at among serialized articles."""
+    stamps = [a["updated_at"] for a in articles if a.get("updated_at")]
+    if stamps:
+        newest = max(datetime.fromisoformat(stamp) for stamp in stamps)
+        response["Last-Modified"] = http_date(newest.timestamp())
+    return response
+
+
+# Rows fetched per database round trip, and serialized per chunk, when streaming
+STREAM_CHUNK_SIZE = 200
 
-    return {
-        "id": str(article.id),
-        "title": article.title,
-        "content": content,
-        "author": author_data,
-        "media": article.media or [],
-        "category": article.category or "",
-        "published": bool(article.published),
-        "status": article.status or "",
-        "likes_count": likes_count,
-        "comments_count": comments_count,
-        "created_at": article.created_at.isoformat() if article.created_at else None,
-        "updated_at": article.updated_at.isoformat() if article.updated_at else None
-    }
+
+def wants_stream(request):
+    return request.GET.get("stream", "").lower() in ("1", "true", "yes")
+
+
+def stream_articles(qs, fields, limit, position):
+    """
+    Stream one page of articles with the same envelope as the buffered list
+    endpoints. Rows are read with .iterator() and written out chunk by chunk,
+    so memory stays flat however large the page is.
+
+    The first chunk is read before the response starts, so a failing query
+    still surfaces as an error status. A failure after that closes the JSON
+    normally and adds an "error" key, with next_cursor pointing just past
+    the last article sent so the client can resume.
+    """
+    qs = keyset_queryset(project_articles(qs, fields), position)
+    rows = qs[:limit + 1].iterator(chunk_size=STREAM_CHUNK_SIZE)
+    first = list(islice(rows, min(limit + 1, STREAM_CHUNK_SIZE)))
+    first_chunk = [json.dumps(article_to_dict(article, fields), cls=DjangoJSONEncoder) for article in first[:limit]]
+
+    def generate():
+        yield '{"success": true, "data": {"articles": ['
+        sent = 0
+        last_sent = first[len(first_chunk) - 1] if first_chunk else None
+        has_more = len(first) > limit
+        if first_chunk:
+            sent = len(first_chunk)
+            yield ",".join(first_chunk)
+
+        error = None
+        if len(first) == STREAM_CHUNK_SIZE and not has_more:
+            chunk = []
+            last = last_sent
+            try:
+                for article in rows:
+                    if sent + len(chunk) == limit:
+                        has_more = True
+                        break
+                    chunk.append(json.dumps(article_to_dict(article, fields), cls=DjangoJSONEncoder))
+                    last = article
+                    if len(chunk) == STREAM_CHUNK_SIZE:
+                        yield "," + ",".join(chunk)
+                        sent += len(chunk)
+                        last_sent = last
+                        chunk = []
+            except Exception as e:
+                print("stream_articles exception:", str(e))
+                # Rows of the unfinished chunk are dropped; next_cursor resumes after the last one sent
+                error = "Stream interrupted"
+                chunk = []
+            if chunk:
+                yield "," + ",".join(chunk)
+                sent += len(chunk)
+                last_sent = last
+
+        if error is None:
+            next_cursor = cursor_for(last_sent) if has_more else None
+            yield '], "total": %d, "next_cursor": %s}}' % (sent, json.dumps(next_cursor))
+        else:
+            next_cursor = cursor_for(last_sent) if last_sent is not None else None
+            yield '], "total": %d, "next_cursor": %s}, "error": %s}' % (
+                sent, json.dumps(next_cursor), json.dumps(error)
+            )
+
+    return StreamingHttpResponse(generate(), content_type="application/json")
 
 
 @csrf_exempt
@@ -91,22 +281,16 @@ def article_comments_likes(request):
             return JsonResponse({"success": False, "message": "article_id required"}, status=400)
 
         try:
-            article = Articles.objects.get(id=article_id)
+            article = Articles.objects.only("id", "likes_count", "comments_count").get(id=article_id)
         except Articles.DoesNotExist:
             return JsonResponse({"success": False, "message": "Article not found"}, status=404)
 
-        # Calculate counts using ArticleInteraction model
-        likes_count = ArticleInteraction.objects.filter(article=article, liked=True).count()
-        comments_count = ArticleInteraction.objects.filter(
-            article=article
-        ).exclude(comment__isnull=True).exclude(comment='').count()
-
         return JsonResponse({
             "success": True,
             "data": {
                 "article_id": str(article.id),
-                "likes_count": likes_count,
-                "comments_count": comments_count
+                "likes_count": article.likes_count,
+                "comments_count": article.comments_count
             }
         }, status=200)
 
@@ -115,6 +299,139 @@ def article_comments_likes(request):
         return JsonResponse({"success": False, "message": f"Failed to get counts: {str(e)}"}, status=500)
 
 
+# Upper bound on ids accepted by the batch endpoints
+MAX_BATCH_IDS = 500
+
+
+def parse_article_ids(values):
+    """
+    Normalize a list of article ids to unique UUIDs, keeping order.
+    Values that are not valid UUIDs are skipped.
+    """
+    ids = []
+    seen = set()
+    for value in values:
+        try:
+            article_id = uuid.UUID(str(value))
+        except ValueError:
+            continue
+        if article_id not in seen:
+            seen.add(article_id)
+            ids.append(article_id)
+    return ids
+
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def article_counts_batch(request):
+    """
+    Get likes and comments counts for many articles in one query
+    Expects JSON: {"article_ids": ["uuid1", "uuid2", ...]} (at most MAX_BATCH_IDS)
+    Ids that are malformed or do not exist are left out of the result
+    """
+    if request.method == "OPTIONS":
+        return JsonResponse({}, status=200)
+
+    try:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"success": False, "message": "Invalid JSON body"}, status=400)
+
+        article_ids = data.get('article_ids')
+        if not isinstance(article_ids, list) or not article_ids:
+            return JsonResponse({"success": False, "message": "article_ids must be a non-empty list"}, status=400)
+        if len(article_ids) > MAX_BATCH_IDS:
+            return JsonResponse({"success": False, "message": f"At most {MAX_BATCH_IDS} article_ids allowed"},
+                                status=400)
+
+        rows = Articles.objects.filter(id__in=parse_article_ids(article_ids)).values_list(
+            "id", "likes_count", "comments_count"
+        )
+        counts = {
+            str(article_id): {"likes_count": likes_count, "comments_count": comments_count}
+            for article_id, likes_count, comments_count in rows
+        }
+
+        return JsonResponse({"success": True, "data": {"counts": counts}}, status=200)
+
+    except Exception as e:
+        print("article_counts_batch exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to get counts: {str(e)}"}, status=500)
+
+
+def resolve_interaction_target(article_id, user_id):
+    """
+    Check by primary key that the article and user exist, in one query,
+    without loading either row. Returns the article's id, counters and cache
+    scopes plus the normalized user_id, or None when either is missing.
+    """
+    try:
+        target = Articles.objects.filter(pk=article_id).annotate(
+            user_exists=Exists(Users.objects.filter(pk=user_id))
+        ).values("id", "author_id", "category", "likes_count", "saves_count", "user_exists").first()
+    except ValidationError:
+        return None
+    if target is None or not target["user_exists"]:
+        return None
+    target["user_id"] = uuid.UUID(str(user_id))
+    return target
+
+
+def parse_flag(data, name):
+    """Read an optional boolean from a JSON body; raises ValueError for other types."""
+    value = data.get(name)
+    if value is not None and not isinstance(value, bool):
+        raise ValueError(f"{name} must be true or false")
+    return value
+
+
+def set_interaction_flag(article_id, user_id, field, value=None):
+    """
+    Flip a like/save flag with one conditional UPDATE, or set it to `value`
+    when given, inserting the interaction row if there is none yet. The
+    article counter moves in the same transaction. Returns the new value.
+    """
+    counter = ArticleInteraction.COUNTER_FIELDS[field]
+    set_at = ArticleInteraction.SET_AT_FIELDS[field]
+    interaction = ArticleInteraction.objects.filter(article_id=article_id, user_id=user_id)
+    now = timezone.now()
+    # Stamped only when the flag goes from unset to set
+    stamp = Case(When(**{field: True}, then=F(set_at)), default=Value(now), output_field=DateTimeField())
+
+    with transaction.atomic():
+        for _ in range(2):
+            if value is None:
+                if interaction.update(**{field: ~F(field), set_at: stamp, "updated_at": now}):
+                    # The UPDATE holds the row lock, so this reads our own write
+                    new_value = interaction.values_list(field, flat=True).get()
+                    break
+            else:
+                if interaction.exclude(**{field: value}).update(**{field: value, set_at: stamp, "updated_at": now}):
+                    new_value = value
+                    break
+                if not value:
+                    # Already unset, or no row at all
+                    return False
+
+            try:
+                with transaction.atomic():
+                    ArticleInteraction.objects.create(article_id=article_id, user_id=user_id,
+                                                      **{field: True, set_at: now})
+                new_value = True
+                break
+            except IntegrityError:
+                if value is not None:
+                    # The row exists and already holds `value`
+                    return value
+                # A concurrent request inserted the row first; flip that one instead
+        else:
+            raise IntegrityError("Could not toggle interaction")
+
+        Articles.objects.filter(pk=article_id).update(**{counter: F(counter) + (1 if new_value else -1)})
+    return new_value
+
+
 # Update the add_like function
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
@@ -122,6 +439,7 @@ def add_like(request):
     """
     Add/remove a like to an article using ArticleInteraction model
     Expects JSON: {"article_id": "uuid", "user_id": "uuid"} (or "userid")
+    Optional "liked": true/false sets the like instead of toggling it
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
@@ -140,34 +458,32 @@ def add_like(request):
             return JsonResponse({"success": False, "message": "article_id and user_id required"}, status=400)
 
         try:
-            article = Articles.objects.get(id=article_id)
-            user = Users.objects.get(id=user_id)
-        except (Articles.DoesNotExist, Users.DoesNotExist):
-            return JsonResponse({"success": False, "message": "Article or User not found"}, status=404)
-
-        # Get or create interaction for this user and article
-        interaction, created = ArticleInteraction.objects.get_or_create(
-            article=article,
-            user=user,
-            defaults={'liked': True}
-        )
+            liked = parse_flag(data, 'liked')
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
 
-        if not created:
-            # Toggle like status if interaction already exists
-            interaction.liked = not interaction.liked
-            interaction.save()
+        article = resolve_interaction_target(article_id, user_id)
+        if article is None:
+            return JsonResponse({"success": False, "message": "Article or User not found"}, status=404)
 
-        action = "liked" if interaction.liked else "unliked"
+        if interaction_buffer.write_behind_enabled():
+            # Recorded in memory and written with the next flush; the count includes unflushed toggles
+            buffered = interaction_buffer.get_buffer()
+            liked = buffered.toggle(article["id"], article["user_id"], 'liked', liked)
+            likes_count = article["likes_count"] + buffered.pending_delta(article["id"], 'liked')
+        else:
+            liked = set_interaction_flag(article["id"], article["user_id"], 'liked', liked)
+            response_cache.bump_article(article["id"], article["author_id"], article["category"])
+            likes_count = Articles.objects.filter(pk=article["id"]).values_list('likes_count', flat=True).get()
 
-        # Get updated likes count
-        likes_count = ArticleInteraction.objects.filter(article=article, liked=True).count()
+        action = "liked" if liked else "unliked"
 
         return JsonResponse({
             "success": True,
             "message": f"Article {action} successfully",
             "data": {
-                "article_id": str(article.id),
-                "liked": interaction.liked,
+                "article_id": str(article["id"]),
+                "liked": liked,
                 "likes_count": likes_count
             }
         }, status=200)
@@ -181,7 +497,7 @@ def add_like(request):
 @require_http_methods(["POST", "OPTIONS"])
 def add_comment(request):
     """
-    Add a comment to an article using ArticleInteraction model
+    Add a comment to an article. Each call appends a new ArticleComment
     Expects JSON: {"article_id": "uuid", "user_id": "uuid", "comment": "comment text"}
     """
     if request.method == "OPTIONS":
@@ -204,39 +520,28 @@ def add_comment(request):
         if not comment_text:
             return JsonResponse({"success": False, "message": "Comment text is required"}, status=400)
 
-        try:
-            article = Articles.objects.get(id=article_id)
-            user = Users.objects.get(id=user_id)
-        except (Articles.DoesNotExist, Users.DoesNotExist):
+        article = resolve_interaction_target(article_id, user_id)
+        if article is None:
             return JsonResponse({"success": False, "message": "Article or User not found"}, status=404)
 
-        # Get or create interaction for this user and article
-        # Use update_or_create to handle existing interactions
-        interaction, created = ArticleInteraction.objects.update_or_create(
-            article=article,
-            user=user,
-            defaults={
-                'comment': comment_text,
-                # Don't change like/save status when adding comment
-            }
-        )
-
-        # If the interaction already existed, update the comment
-        if not created:
-            interaction.comment = comment_text
-            interaction.save()
+        with transaction.atomic():
+            comment = ArticleComment.objects.create(
+                article_id=article["id"],
+                user_id=article["user_id"],
+                body=comment_text
+            )
+            Articles.objects.filter(pk=article["id"]).update(comments_count=F('comments_count') + 1)
+        response_cache.bump_article(article["id"], article["author_id"], article["category"])
 
         # Get updated comments count
-        comments_count = ArticleInteraction.objects.filter(
-            article=article
-        ).exclude(comment__isnull=True).exclude(comment='').count()
+        comments_count = Articles.objects.filter(pk=article["id"]).values_list('comments_count', flat=True).get()
 
         return JsonResponse({
             "success": True,
             "message": "Comment added successfully",
             "data": {
-                "article_id": str(article.id),
-                "comment_id": str(interaction.id),
+                "article_id": str(article["id"]),
+                "comment_id": str(comment.id),
                 "comment": comment_text,
                 "comments_count": comments_count
             }
@@ -248,10 +553,12 @@ def add_comment(request):
 
 
 @require_http_methods(["GET"])
+@condition(etag_func=comments_etag)
 def get_comments(request):
     """
-    Get all comments for an article using ArticleInteraction model
-    Query param: article_id
+    Get comments for an article, newest first
+    Query params: article_id, limit (optional), cursor (optional),
+    since (optional ISO timestamp: only comments created after it)
     """
     try:
         article_id = request.GET.get("article_id")
@@ -259,28 +566,48 @@ def get_comments(request):
             return JsonResponse({"success": False, "message": "article_id required"}, status=400)
 
         try:
-            article = Articles.objects.get(id=article_id)
-        except Articles.DoesNotExist:
+            limit, position = get_page_params(request)
+            since = request.GET.get("since")
+            if since:
+                since = parse_timestamp(since)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+        try:
+            article = Articles.objects.only("id", "comments_count").get(id=article_id)
+        except (Articles.DoesNotExist, ValidationError):
             return JsonResponse({"success": False, "message": "Article not found"}, status=404)
 
-        # Get only interactions that have comments
-        comments = ArticleInteraction.objects.filter(
-            article=article
-        ).exclude(comment__isnull=True).exclude(comment='').order_by("-created_at")
+        # Load the commenter in the same query
+        qs = ArticleComment.objects.filter(article=article).select_related("user").only(
+            "id", "body", "created_at", "user__id", "user__username", "user__email"
+        )
+        if since:
+            qs = qs.filter(created_at__gt=since)
+        comments, next_cursor = paginate_keyset(qs, limit, position)
+
+        # The commenters' like/save state, in one query for the whole page
+        states = {
+            user_id: (liked, saved)
+            for user_id, liked, saved in ArticleInteraction.objects.filter(
+                article=article, user_id__in={comment.user_id for comment in comments}
+            ).values_list("user_id", "liked", "saved")
+        } if comments else {}
 
         comments_data = []
-        for interaction in comments:
+        for comment in comments:
+            liked, saved = states.get(comment.user_id, (False, False))
             comments_data.append({
-                "id": str(interaction.id),
-                "comment": interaction.comment,
-                "liked": interaction.liked,
-                "saved": interaction.saved,
+                "id": str(comment.id),
+                "comment": comment.body,
+                "liked": liked,
+                "saved": saved,
                 "author": {
-                    "id": str(interaction.user.id),
-                    "username": getattr(interaction.user, "username", ""),
-                    "email": getattr(interaction.user, "email", "")
-                } if interaction.user else {},
-                "created_at": interaction.created_at.isoformat() if interaction.created_at else None
+                    "id": str(comment.user.id),
+                    "username": getattr(comment.user, "username", ""),
+                    "email": getattr(comment.user, "email", "")
+                } if comment.user else {},
+                "created_at": comment.created_at.isoformat() if comment.created_at else None
             })
 
         return JsonResponse({
@@ -288,7 +615,8 @@ def get_comments(request):
             "data": {
                 "article_id": str(article.id),
                 "comments": comments_data,
-                "comments_count": len(comments_data)
+                "comments_count": article.comments_count,
+                "next_cursor": next_cursor
             }
         }, status=200)
 
@@ -303,6 +631,7 @@ def toggle_save_article(request):
     """
     Toggle save status for an article
     Expects JSON: {"article_id": "uuid", "user_id": "uuid"} (or "userid")
+    Optional "saved": true/false sets the status instead of toggling it
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
@@ -321,31 +650,27 @@ def toggle_save_article(request):
             return JsonResponse({"success": False, "message": "article_id and user_id required"}, status=400)
 
         try:
-            article = Articles.objects.get(id=article_id)
-            user = Users.objects.get(id=user_id)
-        except (Articles.DoesNotExist, Users.DoesNotExist):
-            return JsonResponse({"success": False, "message": "Article or User not found"}, status=404)
+            saved = parse_flag(data, 'saved')
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
 
-        # Get or create interaction for this user and article
-        interaction, created = ArticleInteraction.objects.get_or_create(
-            article=article,
-            user=user,
-            defaults={'saved': True}
-        )
+        article = resolve_interaction_target(article_id, user_id)
+        if article is None:
+            return JsonResponse({"success": False, "message": "Article or User not found"}, status=404)
 
-        if not created:
-            # Toggle save status if interaction already exists
-            interaction.saved = not interaction.saved
-            interaction.save()
+        if interaction_buffer.write_behind_enabled():
+            saved = interaction_buffer.get_buffer().toggle(article["id"], article["user_id"], 'saved', saved)
+        else:
+            saved = set_interaction_flag(article["id"], article["user_id"], 'saved', saved)
 
-        action = "saved" if interaction.saved else "unsaved"
+        action = "saved" if saved else "unsaved"
 
         return JsonResponse({
             "success": True,
             "message": f"Article {action} successfully",
             "data": {
-                "article_id": str(article.id),
-                "saved": interaction.saved
+                "article_id": str(article["id"]),
+                "saved": saved
             }
         }, status=200)
 
@@ -354,6 +679,27 @@ def toggle_save_article(request):
         return JsonResponse({"success": False, "message": f"Failed to toggle save: {str(e)}"}, status=500)
 
 
+def interaction_states(user_id, article_ids):
+    """
+    Map each existing article id to the user's {"liked", "saved", "has_comment"}
+    state, in one query whatever the number of articles. With write-behind on,
+    toggles still waiting in the buffer override the stored flags.
+    """
+    rows = Articles.objects.filter(id__in=article_ids).annotate(
+        liked=Exists(ArticleInteraction.objects.filter(article=OuterRef("pk"), user_id=user_id, liked=True)),
+        saved=Exists(ArticleInteraction.objects.filter(article=OuterRef("pk"), user_id=user_id, saved=True)),
+        has_comment=Exists(ArticleComment.objects.filter(article=OuterRef("pk"), user_id=user_id)),
+    ).values_list("id", "liked", "saved", "has_comment")
+    states = {
+        article_id: {"liked": liked, "saved": saved, "has_comment": has_comment}
+        for article_id, liked, saved, has_comment in rows
+    }
+    if interaction_buffer.write_behind_enabled() and states:
+        for article_id, pending in interaction_buffer.get_buffer().pending_states(user_id, list(states)).items():
+            states[article_id].update(pending)
+    return states
+
+
 @require_http_methods(["GET"])
 def get_user_interaction(request):
     """
@@ -368,13 +714,13 @@ def get_user_interaction(request):
             return JsonResponse({"success": False, "message": "article_id and user_id required"}, status=400)
 
         try:
-            interaction = ArticleInteraction.objects.get(article_id=article_id, user_id=user_id)
-            interaction_data = {
-                "liked": interaction.liked,
-                "saved": interaction.saved,
-                "has_comment": bool(interaction.comment and interaction.comment.strip())
-            }
-        except ArticleInteraction.DoesNotExist:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            return JsonResponse({"success": False, "message": "Invalid user_id"}, status=400)
+
+        ids = parse_article_ids([article_id])
+        interaction_data = interaction_states(user_id, ids).get(ids[0]) if ids else None
+        if interaction_data is None:
             interaction_data = {
                 "liked": False,
                 "saved": False,
@@ -390,7 +736,69 @@ def get_user_interaction(request):
         return JsonResponse({"success": False, "message": f"Failed to fetch user interaction: {str(e)}"}, status=500)
 
 
-# Create article function with better Cloudinary handling
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def get_user_interactions_batch(request):
+    """
+    Get a user's interaction state (like, save, comment) for many articles in one query
+    Expects JSON: {"user_id": "uuid", "article_ids": ["uuid1", ...]} (at most MAX_BATCH_IDS)
+    Returns a map keyed by article id; malformed ids are skipped
+    """
+    if request.method == "OPTIONS":
+        return JsonResponse({}, status=200)
+
+    try:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"success": False, "message": "Invalid JSON body"}, status=400)
+
+        user_id = data.get('user_id') or data.get('userid')
+        article_ids = data.get('article_ids')
+        if not user_id:
+            return JsonResponse({"success": False, "message": "user_id required"}, status=400)
+        if not isinstance(article_ids, list) or not article_ids:
+            return JsonResponse({"success": False, "message": "article_ids must be a non-empty list"}, status=400)
+        if len(article_ids) > MAX_BATCH_IDS:
+            return JsonResponse({"success": False, "message": f"At most {MAX_BATCH_IDS} article_ids allowed"},
+                                status=400)
+        try:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            return JsonResponse({"success": False, "message": "Invalid user_id"}, status=400)
+
+        ids = parse_article_ids(article_ids)
+        interactions = interaction_states(user_id, ids)
+        default = {"liked": False, "saved": False, "has_comment": False}
+
+        return JsonResponse({
+            "success": True,
+            "data": {"interactions": {str(i): interactions.get(i, default) for i in ids}}
+        }, status=200)
+
+    except Exception as e:
+        print("get_user_interactions_batch exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to fetch user interactions: {str(e)}"},
+                            status=500)
+
+
+def discard_upload(upload_result):
+    """Delete an upload that finished after its request gave up waiting for it."""
+    try:
+        delete_image(upload_result.get("public_id"))
+    except Exception as e:
+        print("Failed to delete late upload:", str(e))
+
+
+def discard_uploads(public_ids):
+    """Queue uploads made by a request that failed for the deletion worker."""
+    try:
+        media.queue_deletions(public_ids)
+    except Exception as e:
+        print("Failed to queue uploads for deletion:", str(e))
+
+
+# Create article function with better media storage handling
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
 def create_article(request):
@@ -403,6 +811,11 @@ def create_article(request):
         return JsonResponse({}, status=200)
 
     try:
+        try:
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
         # Try to authenticate with token if present
         auth_header = request.headers.get("Authorization") or request.META.get("HTTP_AUTHORIZATION")
         author_user = None
@@ -482,6 +895,8 @@ def create_article(request):
                 media_urls = []
 
         uploaded_files = []  # Track uploaded files for cleanup in case of failure
+        folder_path = f"articles/{author_user.id}"
+        uploads = []  # (block to fill in, (registry key, upload callable, source URL)), run together below
 
         for idx, block in enumerate(content_list):
             if not isinstance(block, dict):
@@ -495,64 +910,44 @@ def create_article(request):
                 caption = block.get("caption", "")
                 # If value refers to a file key
                 if isinstance(val, str) and val.startswith("file_") and val in request.FILES:
-                    file_obj = request.FILES.get(val)
-                    try:
-                        # Upload to Cloudinary with user-specific folder
-                        folder_path = f"articles/{author_user.id}"
-                        upload_result = upload_image(
-                            file_obj,
-                            folder=folder_path,
-                            resource_type="image",
-                            overwrite=True
-                        )
-                        uploaded_url = upload_result.get("secure_url")
-                        if uploaded_url:
-                            media_urls.append(uploaded_url)
-                            processed_content.append({
-                                "type": "image",
-                                "value": uploaded_url,
-                                "caption": caption,
-                                "public_id": upload_result.get("public_id")  # Store public ID for future management
-                            })
-                            uploaded_files.append(upload_result.get("public_id"))
-                        else:
-                            processed_content.append({"type": "image", "value": "", "caption": caption})
-                    except Exception as ue:
-                        print("Cloudinary upload error:", ue)
-                        processed_content.append({"type": "image", "value": "", "caption": caption})
+                    # Upload to storage with user-specific folder
+                    image_file = request.FILES.get(val)
+                    image_block = {"type": "image", "value": "", "caption": caption}
+                    uploads.append((image_block, (media.content_key(image_file), partial(
+                        upload_image, image_file, folder=folder_path, resource_type="image",
+                        overwrite=True
+                    ), "")))
+                # If it's an external URL, copy it into storage; the original URL is kept if that fails
+                elif (isinstance(val, str) and val.startswith(('http://', 'https://'))
+                      and get_storage().parse_url(val) is None):
+                    image_block = {"type": "image", "value": val, "caption": caption}
+                    uploads.append((image_block, (
+                        media.source_key(val), partial(upload_image_from_url, val, folder=folder_path), val
+                    )))
                 else:
                     # direct URL or empty
-                    if isinstance(val, str) and val:
-                        # If it's a non-Cloudinary URL, you might want to upload it to Cloudinary
-                        if 'cloudinary.com' not in val and val.startswith(('http://', 'https://')):
-                            try:
-                                folder_path = f"articles/{author_user.id}"
-                                upload_result = upload_image_from_url(val, folder=folder_path)
-                                uploaded_url = upload_result.get("secure_url")
-                                if uploaded_url:
-                                    media_urls.append(uploaded_url)
-                                    processed_content.append({
-                                        "type": "image",
-                                        "value": uploaded_url,
-                                        "caption": caption,
-                                        "public_id": upload_result.get("public_id")
-                                    })
-                                    uploaded_files.append(upload_result.get("public_id"))
-                                else:
-                                    media_urls.append(val)
-                                    processed_content.append({"type": "image", "value": val, "caption": caption})
-                            except Exception:
-                                media_urls.append(val)
-                                processed_content.append({"type": "image", "value": val, "caption": caption})
-                        else:
-                            media_urls.append(val)
-                            processed_content.append({"type": "image", "value": val, "caption": caption})
-                    else:
-                        processed_content.append({"type": "image", "value": val or "", "caption": caption})
+                    image_block = {"type": "image", "value": val or "", "caption": caption}
+                processed_content.append(image_block)
                 continue
             # unknown types are preserved
             processed_content.append(block)
 
+        results = media.run_deduplicated_uploads([job for _, job in uploads], on_late_result=discard_upload)
+        for (image_block, _), upload_result in zip(uploads, results):
+            if isinstance(upload_result, Exception):
+                print("Media upload error:", upload_result)
+                continue
+            uploaded_url = upload_result.get("secure_url")
+            if uploaded_url:
+                image_block["value"] = uploaded_url
+                image_block["public_id"] = upload_result.get("public_id")  # Store public ID for future management
+                if not upload_result.get("reused"):
+                    uploaded_files.append(upload_result.get("public_id"))
+
+        # Media lists every image in block order
+        media_urls.extend(block["value"] for block in processed_content
+                          if block.get("type") == "image" and block.get("value"))
+
         # Save article
         article = Articles(
             title=title,
@@ -568,31 +963,19 @@ def create_article(request):
         article.save()
 
         return JsonResponse(
-            {"success": True, "message": "Article created", "data": {"article": article_to_dict(article)}}, status=201)
+            {"success": True, "message": "Article created", "data": {"article": article_to_dict(article, fields)}}, status=201)
 
     except ValidationError as e:
         # Clean up uploaded files if validation fails
-        for public_id in uploaded_files:
-            try:
-                delete_image(public_id)
-            except Exception:
-                pass
+        discard_uploads(uploaded_files)
         return JsonResponse({"success": False, "message": str(e)}, status=400)
     except IntegrityError:
         # Clean up uploaded files if integrity error occurs
-        for public_id in uploaded_files:
-            try:
-                delete_image(public_id)
-            except Exception:
-                pass
+        discard_uploads(uploaded_files)
         return JsonResponse({"success": False, "message": "Integrity error while creating article"}, status=400)
     except Exception as e:
         # Clean up uploaded files if any other error occurs
-        for public_id in uploaded_files:
-            try:
-                delete_image(public_id)
-            except Exception:
-                pass
+        discard_uploads(uploaded_files)
         print("create_article exception:", str(e))
         return JsonResponse({"success": False, "message": f"Failed to create article: {str(e)}"}, status=500)
 
@@ -602,8 +985,8 @@ def create_article(request):
 @require_http_methods(["POST", "OPTIONS"])
 def upload_article_image(request):
     """
-    Upload an image for an article directly to Cloudinary
-    Returns the Cloudinary URL for use in article content
+    Upload an image for an article directly to media storage
+    Returns the media URL for use in article content
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
@@ -634,14 +1017,17 @@ def upload_article_image(request):
         if image_file.content_type not in allowed_types:
             return JsonResponse({"success": False, "message": "Invalid image format"}, status=400)
 
-        # Upload to Cloudinary
+        # Upload to storage, or reuse the asset already uploaded for the same content
         folder_path = f"articles/{user.id}"
-        upload_result = upload_image(
+        upload_result = media.run_deduplicated_uploads([(media.content_key(image_file), partial(
+            upload_image,
             image_file,
             folder=folder_path,
             resource_type="image",
             overwrite=True
-        )
+        ), "")])[0]
+        if isinstance(upload_result, Exception):
+            raise upload_result
 
         return JsonResponse({
             "success": True,
@@ -662,16 +1048,225 @@ def upload_article_image(request):
 @require_http_methods(["GET"])
 def get_articles(request):
     """
-    Get all articles
+    Get articles, newest first
+    Query params: limit (optional), cursor (optional), view/fields (optional), stream (optional)
     """
     try:
-        qs = Articles.objects.all().order_by("-created_at")
-        data = [article_to_dict(a) for a in qs]
-        return JsonResponse({"success": True, "data": {"articles": data, "total": len(data)}}, status=200)
+        stream = wants_stream(request)
+        try:
+            limit, position = get_page_params(request, STREAM_MAX_PAGE_SIZE if stream else None)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+        if stream:
+            return stream_articles(Articles.objects.all(), fields, limit, position)
+        cache_key = response_cache.response_key("get_articles", request, [response_cache.ALL_ARTICLES])
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            rows, next_cursor = paginate_keyset(project_articles(Articles.objects.all(), fields), limit, position)
+            data = [article_to_dict(a, fields) for a in rows]
+            payload = {"success": True, "data": {"articles": data, "total": len(data), "next_cursor": next_cursor}}
+            response_cache.set_response(cache_key, payload, authors=embedded_authors(rows, fields))
+        return set_last_modified(JsonResponse(payload, status=200), payload["data"]["articles"])
     except Exception as e:
         return JsonResponse({"success": False, "message": f"Failed to fetch articles: {str(e)}"}, status=500)
 
 
+def get_offset(request):
+    offset = int(request.GET.get("offset") or 0)
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    return offset
+
+
+def trending_rows(fields, offset, limit):
+    """
+    One page (plus one row, to detect a next page) of the trending ranking,
+    or of the newest published articles while the ranking is empty.
+    Returns (rows, source).
+    """
+    # Walk trending_score_idx from the top, checking each article on the join
+    ranked = TrendingArticle.objects.select_related("article").filter(
+        article__status="published", article__published=True
+    ).order_by("-score", "-article__created_at")
+    rows = [entry.article for entry in project_articles(ranked, fields, prefix="article__")[offset:offset + limit + 1]]
+    if rows or offset:
+        return rows, "trending"
+    recent = trending.published_articles().order_by("-created_at", "-id")
+    return list(project_articles(recent, fields)[:limit + 1]), "recent"
+
+
+@require_http_methods(["GET"])
+def get_trending_articles(request):
+    """
+    Get published articles ranked by time-decayed likes, saves and comments.
+    Served from the table kept by the refresh_trending command; falls back to
+    the newest published articles while it is empty.
+    Query params: limit (optional), offset (optional), view/fields (optional)
+    """
+    try:
+        try:
+            limit, _ = get_page_params(request)
+            offset = get_offset(request)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+        cache_key = response_cache.response_key(
+            "get_trending_articles", request, [response_cache.TRENDING]
+        )
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            rows, source = trending_rows(fields, offset, limit)
+            next_offset = offset + limit if len(rows) > limit else None
+            data = [article_to_dict(a, fields) for a in rows[:limit]]
+            payload = {"success": True, "data": {
+                "articles": data, "total": len(data), "next_offset": next_offset, "source": source
+            }}
+            response_cache.set_response(cache_key, payload, authors=embedded_authors(rows[:limit], fields))
+        return JsonResponse(payload, status=200)
+    except Exception as e:
+        print("get_trending_articles exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to fetch trending articles: {str(e)}"}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_for_you_articles(request):
+    """
+    Get a user's personalized feed, built from the categories and authors of
+    the articles they liked or saved (see the compute_user_affinities command).
+    Users without affinities get the trending feed, or the newest articles.
+    Query params: user_id (required), limit (optional), view/fields (optional)
+    """
+    try:
+        user_id = request.GET.get("user_id")
+        if not user_id:
+            return JsonResponse({"success": False, "message": "user_id required"}, status=400)
+
+        try:
+            user_id = uuid.UUID(str(user_id))
+            limit, _ = get_page_params(request)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e) or "Invalid user_id"}, status=400)
+
+        ids = recommendations.for_you_article_ids(user_id, limit)
+        if ids:
+            source = "for_you"
+            articles = project_articles(Articles.objects.filter(id__in=ids), fields).in_bulk()
+            rows = [articles[i] for i in ids if i in articles]
+        else:
+            rows, source = trending_rows(fields, 0, limit)
+            rows = rows[:limit]
+
+        data = [article_to_dict(a, fields) for a in rows]
+        return JsonResponse({
+            "success": True,
+            "data": {"articles": data, "total": len(data), "source": source}
+        }, status=200)
+    except Exception as e:
+        print("get_for_you_articles exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to fetch feed: {str(e)}"}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_category_counts(request):
+    """
+    Get the number of published articles in each category, largest first
+    Query params: author (optional, only count this author's articles)
+    """
+    try:
+        author_id = request.GET.get("author")
+        if author_id:
+            try:
+                author_id = uuid.UUID(author_id)
+            except ValueError:
+                return JsonResponse({"success": False, "message": "Invalid author"}, status=400)
+
+        cache_key = response_cache.response_key("get_category_counts", request, [response_cache.FACETS])
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            qs = trending.published_articles().exclude(category__isnull=True).exclude(category="")
+            if author_id:
+                qs = qs.filter(author_id=author_id)
+            counts = [
+                {"category": row["category"], "count": row["count"]}
+                for row in qs.values("category").annotate(count=Count("id")).order_by("-count", "category")
+            ]
+            payload = {"success": True, "data": {
+                "categories": counts, "total": sum(row["count"] for row in counts)
+            }}
+            response_cache.set_response(cache_key, payload)
+        return JsonResponse(payload, status=200)
+    except Exception as e:
+        print("get_category_counts exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to fetch category counts: {str(e)}"}, status=500)
+
+
+@require_http_methods(["GET"])
+def search_articles(request):
+    """
+    Full-text search over published article titles and paragraph text, best match first
+    Query params: q (required), category (optional),
+                  limit (optional), offset (optional), view/fields (optional),
+                  status (optional, admin only: draft, published, deleted or all;
+                  searches every article with that status, published or not)
+    """
+    try:
+        query = (request.GET.get("q") or "").strip()
+        if not query:
+            return JsonResponse({"success": False, "message": "q required"}, status=400)
+
+        try:
+            limit, _ = get_page_params(request)
+            fields = get_article_fields(request)
+            offset = get_offset(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+        filters = {}
+        status = request.GET.get("status")
+        if status:
+            statuses = [choice for choice, _ in Articles._meta.get_field("status").choices]
+            if status != "all" and status not in statuses:
+                return JsonResponse({"success": False, "message": "status must be one of: " + ", ".join(
+                    statuses + ["all"]
+                )}, status=400)
+
+            # Only admins may search beyond published articles
+            auth_header = request.headers.get("Authorization") or request.META.get("HTTP_AUTHORIZATION")
+            user = None
+            if auth_header and auth_header.startswith("Bearer "):
+                payload = verify_simple_token(auth_header.split(" ", 1)[1].strip())
+                if payload and payload.get("user_id"):
+                    user = Users.objects.filter(id=payload["user_id"]).first()
+            if not user:
+                return JsonResponse({"success": False, "message": "Authentication required"}, status=401)
+            if user.role != "admin":
+                return JsonResponse({"success": False, "message": "Admin access required"}, status=403)
+            filters = {"status": None if status == "all" else status, "published": None}
+
+        ids = search.search_article_ids(
+            query,
+            category=request.GET.get("category"),
+            limit=limit + 1,
+            offset=offset,
+            **filters
+        )
+        next_offset = offset + limit if len(ids) > limit else None
+        ids = ids[:limit]
+
+        articles = project_articles(Articles.objects.filter(id__in=ids), fields).in_bulk()
+        data = [article_to_dict(articles[i], fields) for i in ids if i in articles]
+        return JsonResponse({
+            "success": True,
+            "data": {"articles": data, "total": len(data), "next_offset": next_offset}
+        }, status=200)
+    except Exception as e:
+        print("search_articles exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to search articles: {str(e)}"}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["PUT", "POST"])
 @csrf_exempt
@@ -686,6 +1281,11 @@ def update_article(request):
         return JsonResponse({}, status=200)
 
     try:
+        try:
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
         # Authenticate user
         auth_header = request.headers.get("Authorization") or request.META.get("HTTP_AUTHORIZATION")
         user = None
@@ -764,6 +1364,7 @@ def update_article(request):
 
                 # Process image blocks
                 processed_content = []
+                uploads = []  # (block to fill in, (registry key, upload callable, source URL)), run together below
                 for idx, block in enumerate(content_list):
                     if not isinstance(block, dict):
                         processed_content.append(block)
@@ -780,34 +1381,15 @@ def update_article(request):
 
                         # Handle new image uploads
                         if isinstance(val, str) and val.startswith("file_") and val in request.FILES:
-                            file_obj = request.FILES.get(val)
-                            try:
-                                folder_path = f"articles/{user.id}"
-                                upload_result = upload_image(
-                                    file_obj,
-                                    folder=folder_path,
-                                    resource_type="image",
-                                    overwrite=True
-                                )
-                                uploaded_url = upload_result.get("secure_url")
-                                if uploaded_url:
-                                    new_media.append(uploaded_url)
-                                    processed_content.append({
-                                        "type": "image",
-                                        "value": uploaded_url,
-                                        "caption": caption,
-                                        "public_id": upload_result.get("public_id")
-                                    })
-                                    uploaded_files.append(upload_result.get("public_id"))
-                                else:
-                                    processed_content.append({"type": "image", "value": "", "caption": caption})
-                            except Exception as ue:
-                                print("Cloudinary upload error:", ue)
-                                processed_content.append({"type": "image", "value": "", "caption": caption})
+                            image_file = request.FILES.get(val)
+                            image_block = {"type": "image", "value": "", "caption": caption}
+                            uploads.append((image_block, (media.content_key(image_file), partial(
+                                upload_image, image_file, folder=f"articles/{user.id}",
+                                resource_type="image", overwrite=True
+                            ), "")))
+                            processed_content.append(image_block)
                         else:
                             # Existing image URL
-                            if val and val not in new_media:
-                                new_media.append(val)
                             processed_content.append(block)
                         continue
 
@@ -817,6 +1399,23 @@ def update_article(request):
             except Exception as e:
                 return JsonResponse({"success": False, "message": f"Invalid content JSON: {str(e)}"}, status=400)
 
+            results = media.run_deduplicated_uploads([job for _, job in uploads], on_late_result=discard_upload)
+            for (image_block, _), upload_result in zip(uploads, results):
+                if isinstance(upload_result, Exception):
+                    print("Media upload error:", upload_result)
+                    continue
+                uploaded_url = upload_result.get("secure_url")
+                if uploaded_url:
+                    image_block["value"] = uploaded_url
+                    image_block["public_id"] = upload_result.get("public_id")
+                    if not upload_result.get("reused"):
+                        uploaded_files.append(upload_result.get("public_id"))
+
+            for block in processed_content:
+                val = block.get("value") if isinstance(block, dict) and block.get("type") == "image" else None
+                if val and val not in new_media:
+                    new_media.append(val)
+
         # Update media list
         if media_raw is not None:
             if isinstance(media_raw, list):
@@ -865,44 +1464,26 @@ def update_article(request):
             article.full_clean()
             article.save(update_fields=update_fields)
 
-            # Clean up old media that's no longer used
-            old_media_to_delete = set(old_media) - set(new_media)
-            for media_url in old_media_to_delete:
-                if 'cloudinary.com' in media_url:
-                    try:
-                        # Extract public ID from URL
-                        parts = media_url.split('/')
-                        if 'image/upload' in parts:
-                            upload_index = parts.index('image/upload')
-                            if len(parts) > upload_index + 1:
-                                public_id_with_format = parts[upload_index + 1]
-                                public_id = public_id_with_format.split('.')[0]
-                                delete_image(public_id)
-                    except Exception as e:
-                        print(f"Failed to delete old media {media_url}: {str(e)}")
+            # Queue old media that's no longer used for the deletion worker
+            try:
+                media.queue_deletions(urls=set(old_media) - set(new_media))
+            except Exception as e:
+                print("Failed to queue old media for deletion:", str(e))
 
             return JsonResponse({
                 "success": True,
                 "message": "Article updated successfully",
-                "data": {"article": article_to_dict(article)}
+                "data": {"article": article_to_dict(article, fields)}
             }, status=200)
 
         except ValidationError as e:
             # Clean up uploaded files if validation fails
-            for public_id in uploaded_files:
-                try:
-                    delete_image(public_id)
-                except Exception:
-                    pass
+            discard_uploads(uploaded_files)
             return JsonResponse({"success": False, "message": str(e)}, status=400)
 
     except Exception as e:
         # Clean up uploaded files if any error occurs
-        for public_id in uploaded_files:
-            try:
-                delete_image(public_id)
-            except Exception:
-                pass
+        discard_uploads(uploaded_files)
         print("update_article exception:", str(e))
         return JsonResponse({"success": False, "message": f"Failed to update article: {str(e)}"}, status=500)
 
@@ -928,7 +1509,9 @@ def delete_article(request):
         except Articles.DoesNotExist:
             return JsonResponse({"success": False, "message": "Article not found"}, status=404)
 
-        article.delete()
+        with transaction.atomic():
+            article.delete()
+            media.queue_deletions(urls=article.media or [])
         return JsonResponse({"success": True, "message": "Article deleted"}, status=200)
 
     except Exception as e:
@@ -937,16 +1520,28 @@ def delete_article(request):
 
 
 @require_http_methods(["GET"])
+@condition(etag_func=article_etag)
 def get_article_by_id(request):
     try:
         article_id = request.GET.get("id")
         if not article_id:
             return JsonResponse({"success": False, "message": "Article id required"}, status=400)
         try:
-            article = Articles.objects.get(id=article_id)
-        except Articles.DoesNotExist:
-            return JsonResponse({"success": False, "message": "Article not found"}, status=404)
-        return JsonResponse({"success": True, "data": {"article": article_to_dict(article)}}, status=200)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+        cache_key = response_cache.response_key(
+            "get_article_by_id", request, [response_cache.article_scope(article_id)]
+        )
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            try:
+                article = project_articles(Articles.objects.all(), fields).get(id=article_id)
+            except Articles.DoesNotExist:
+                return JsonResponse({"success": False, "message": "Article not found"}, status=404)
+            payload = {"success": True, "data": {"article": article_to_dict(article, fields)}}
+            response_cache.set_response(cache_key, payload, authors=embedded_authors([article], fields))
+        return JsonResponse(payload, status=200)
     except Exception as e:
         return JsonResponse({"success": False, "message": f"Failed to fetch article: {str(e)}"}, status=500)
 
@@ -954,15 +1549,33 @@ def get_article_by_id(request):
 @require_http_methods(["GET"])
 def get_articles_by_category(request):
     """
-    Get articles by category
+    Get articles by category, newest first
+    Query params: category, limit (optional), cursor (optional), view/fields (optional), stream (optional)
     """
     try:
         category = request.GET.get("category")
         if category is None:
             return JsonResponse({"success": False, "message": "Category required"}, status=400)
-        qs = Articles.objects.filter(category=category).order_by("-created_at")
-        data = [article_to_dict(a) for a in qs]
-        return JsonResponse({"success": True, "data": {"articles": data, "total": len(data)}}, status=200)
+        stream = wants_stream(request)
+        try:
+            limit, position = get_page_params(request, STREAM_MAX_PAGE_SIZE if stream else None)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+        if stream:
+            return stream_articles(Articles.objects.filter(category=category), fields, limit, position)
+        cache_key = response_cache.response_key(
+            "get_articles_by_category", request, [response_cache.category_scope(category)]
+        )
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            rows, next_cursor = paginate_keyset(
+                project_articles(Articles.objects.filter(category=category), fields), limit, position
+            )
+            data = [article_to_dict(a, fields) for a in rows]
+            payload = {"success": True, "data": {"articles": data, "total": len(data), "next_cursor": next_cursor}}
+            response_cache.set_response(cache_key, payload, authors=embedded_authors(rows, fields))
+        return set_last_modified(JsonResponse(payload, status=200), payload["data"]["articles"])
     except Exception as e:
         return JsonResponse({"success": False, "message": f"Failed to fetch articles: {str(e)}"}, status=500)
 
@@ -970,23 +1583,44 @@ def get_articles_by_category(request):
 @require_http_methods(["GET"])
 def get_articles_by_author(request):
     """
-    Get articles by author
+    Get articles by author, newest first
+    Query params: author, limit (optional), cursor (optional), view/fields (optional), stream (optional)
     """
     try:
         author_id = request.GET.get("author")
         if not author_id:
             return JsonResponse({"success": False, "message": "Author id required"}, status=400)
-        
-        # Validate that author exists
+
+        stream = wants_stream(request)
         try:
-            author = Users.objects.get(id=author_id)
-        except Users.DoesNotExist:
-            return JsonResponse({"success": False, "message": "Author not found"}, status=404)
-        
-        # Filter articles by author
-        qs = Articles.objects.filter(author=author_id).order_by("-created_at")
-        data = [article_to_dict(a) for a in qs]
-        return JsonResponse({"success": True, "data": {"articles": data, "total": len(data)}}, status=200)
+            limit, position = get_page_params(request, STREAM_MAX_PAGE_SIZE if stream else None)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+        if stream:
+            if not Users.objects.filter(id=author_id).exists():
+                return JsonResponse({"success": False, "message": "Author not found"}, status=404)
+            return stream_articles(Articles.objects.filter(author=author_id), fields, limit, position)
+
+        cache_key = response_cache.response_key(
+            "get_articles_by_author", request, [response_cache.author_scope(author_id)]
+        )
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            # Validate that author exists
+            try:
+                author = Users.objects.get(id=author_id)
+            except Users.DoesNotExist:
+                return JsonResponse({"success": False, "message": "Author not found"}, status=404)
+
+            # Filter articles by author
+            rows, next_cursor = paginate_keyset(
+                project_articles(Articles.objects.filter(author=author_id), fields), limit, position
+            )
+            data = [article_to_dict(a, fields) for a in rows]
+            payload = {"success": True, "data": {"articles": data, "total": len(data), "next_cursor": next_cursor}}
+            response_cache.set_response(cache_key, payload)
+        return set_last_modified(JsonResponse(payload, status=200), payload["data"]["articles"])
     except Exception as e:
         print(f"get_articles_by_author exception: {str(e)}")
         import traceback
@@ -997,41 +1631,50 @@ def get_articles_by_author(request):
 @require_http_methods(["GET"])
 def get_saved_articles(request):
     """
-    Get all saved articles for a user
-    Query params: user_id (required)
+    Get saved articles for a user, most recently saved first
+    Query params: user_id (required), limit (optional), cursor (optional)
     """
     try:
         user_id = request.GET.get("user_id")
         if not user_id:
             return JsonResponse({"success": False, "message": "user_id required"}, status=400)
+
+        try:
+            limit, position = get_page_params(request)
+            fields = get_article_fields(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
         
         try:
             user = Users.objects.get(id=user_id)
         except Users.DoesNotExist:
             return JsonResponse({"success": False, "message": "User not found"}, status=404)
         
-        # Get all interactions where saved=True for this user
-        saved_interactions = ArticleInteraction.objects.filter(
-            user=user,
-            saved=True
-        ).select_related('article', 'article__author').order_by("-created_at")
+        # Get all interactions where saved=True for this user, paged on when each was saved
+        saved = ArticleInteraction.objects.filter(user=user, saved=True)
+        saved_interactions, next_cursor = paginate_keyset(
+            project_articles(saved.select_related('article'), fields, prefix="article__"),
+            limit, position, created_field="saved_at"
+        )
         
         saved_articles_data = []
         for interaction in saved_interactions:
             article = interaction.article
             saved_articles_data.append({
-                "article": article_to_dict(article),
-                "saved_at": interaction.created_at.isoformat() if interaction.created_at else None,
+                "article": article_to_dict(article, fields),
+                "saved_at": interaction.saved_at.isoformat() if interaction.saved_at else None,
                 "saved_interaction_id": str(interaction.id)
             })
         
-        return JsonResponse({
+        response = JsonResponse({
             "success": True,
             "data": {
                 "saved_articles": saved_articles_data,
-                "total": len(saved_articles_data)
+                "total": saved.count(),
+                "next_cursor": next_cursor
             }
         }, status=200)
+        return set_last_modified(response, [item["article"] for item in saved_articles_data])
         
     except Exception as e:
         print(f"get_saved_articles exception: {str(e)}")
@@ -1046,20 +1689,8 @@ def article_to_dict_for_admin(article: Articles):
     """
     Convert Articles instance to JSON-serializable dict for admin dashboard.
     Includes summary and author name for admin panel display.
+    The summary is the stored column, so content can be deferred.
     """
-    try:
-        content = json.loads(article.content) if article.content else []
-        # Extract summary from first paragraph if available
-        summary = ""
-        if isinstance(content, list):
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "paragraph":
-                    summary = block.get("value", "")[:200]  # First 200 chars
-                    break
-    except Exception:
-        content = article.content or ""
-        summary = str(content)[:200] if content else ""
-
     author_name = ""
     if article.author:
         author_name = getattr(article.author, "username", "")
@@ -1067,7 +1698,7 @@ def article_to_dict_for_admin(article: Articles):
     return {
         "id": str(article.id),
         "title": article.title,
-        "summary": summary,
+        "summary": article.summary,
         "authorName": author_name,
         "createdAt": article.created_at.isoformat() if article.created_at else None,
         "status": article.status or "",
@@ -1076,22 +1707,87 @@ def article_to_dict_for_admin(article: Articles):
     }
 
 
+@csrf_exempt
+@require_admin
+@require_http_methods(["GET", "OPTIONS"])
+def admin_dashboard_stats(request):
+    """
+    Get the admin dashboard numbers: users by role, articles by status and
+    moderation state, and interaction totals. One aggregate query per table,
+    cached for ADMIN_STATS_CACHE_TIMEOUT seconds and dropped on moderation
+    Admin endpoint - requires admin authentication
+    """
+    if request.method == "OPTIONS":
+        return JsonResponse({}, status=200)
+
+    try:
+        cache_key = response_cache.response_key("admin_dashboard_stats", request, [response_cache.FACETS])
+        payload = response_cache.get_response(cache_key)
+        if payload is None:
+            roles = [role for role, _ in Users._meta.get_field("role").choices]
+            users = Users.objects.aggregate(
+                total=Count("id"),
+                **{role: Count("id", filter=Q(role=role)) for role in roles}
+            )
+            statuses = [status for status, _ in Articles._meta.get_field("status").choices]
+            articles = Articles.objects.aggregate(
+                total=Count("id"),
+                pending=Count("id", filter=PENDING_ARTICLES),
+                approved=Count("id", filter=Q(status='published', published=True)),
+                likes=Sum("likes_count"),
+                comments=Sum("comments_count"),
+                saves=Sum("saves_count"),
+                **{f"status_{status}": Count("id", filter=Q(status=status)) for status in statuses}
+            )
+
+            payload = {"success": True, "data": {
+                "users": {
+                    "total": users["total"],
+                    "by_role": {role: users[role] for role in roles},
+                },
+                "articles": {
+                    "total": articles["total"],
+                    "pending": articles["pending"],
+                    "approved": articles["approved"],
+                    "by_status": {status: articles[f"status_{status}"] for status in statuses},
+                },
+                "interactions": {
+                    "likes": articles["likes"] or 0,
+                    "comments": articles["comments"] or 0,
+                    "saves": articles["saves"] or 0,
+                },
+            }}
+            response_cache.set_response(cache_key, payload, timeout=settings.ADMIN_STATS_CACHE_TIMEOUT)
+        return JsonResponse(payload, status=200)
+
+    except Exception as e:
+        print("admin_dashboard_stats exception:", str(e))
+        return JsonResponse({"success": False, "message": f"Failed to fetch dashboard stats: {str(e)}"}, status=500)
+
+
 @csrf_exempt
 @require_admin
 @require_http_methods(["GET", "OPTIONS"])
 def get_pending_articles(request):
     """
-    Get all pending articles (draft status or unpublished)
+    Get pending articles (draft status or unpublished), newest first
+    Query params: limit (optional), cursor (optional)
     Admin endpoint - requires admin authentication
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
 
     try:
+        try:
+            limit, position = get_page_params(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
         # Get articles with status='draft' OR published=False
-        pending_articles = Articles.objects.filter(
-            Q(status='draft') | Q(published=False)
-        ).exclude(status='deleted').order_by("-created_at")
+        pending_articles, next_cursor = paginate_keyset(
+            Articles.objects.select_related("author").defer("content", "media").filter(PENDING_ARTICLES),
+            limit, position
+        )
 
         articles_data = [article_to_dict_for_admin(article) for article in pending_articles]
 
@@ -1099,7 +1795,8 @@ def get_pending_articles(request):
             "success": True,
             "data": {
                 "articles": articles_data,
-                "total": len(articles_data)
+                "total": len(articles_data),
+                "next_cursor": next_cursor
             }
         }, status=200)
 
@@ -1113,18 +1810,27 @@ def get_pending_articles(request):
 @require_http_methods(["GET", "OPTIONS"])
 def get_approved_articles(request):
     """
-    Get all approved/published articles
+    Get approved/published articles, newest first
+    Query params: limit (optional), cursor (optional)
     Admin endpoint - requires admin authentication
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
 
     try:
+        try:
+            limit, position = get_page_params(request)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
         # Get articles with status='published' AND published=True
-        approved_articles = Articles.objects.filter(
-            status='published',
-            published=True
-        ).exclude(status='deleted').order_by("-created_at")
+        approved_articles, next_cursor = paginate_keyset(
+            Articles.objects.select_related("author").defer("content", "media").filter(
+                status='published',
+                published=True
+            ),
+            limit, position
+        )
 
         articles_data = [article_to_dict_for_admin(article) for article in approved_articles]
 
@@ -1132,7 +1838,8 @@ def get_approved_articles(request):
             "success": True,
             "data": {
                 "articles": articles_data,
-                "total": len(articles_data)
+                "total": len(articles_data),
+                "next_cursor": next_cursor
             }
         }, status=200)
 
@@ -1141,15 +1848,79 @@ def get_approved_articles(request):
         return JsonResponse({"success": False, "message": f"Failed to fetch approved articles: {str(e)}"}, status=500)
 
 
+# Ids per UPDATE/DELETE statement in the bulk moderation endpoints
+MODERATION_CHUNK_SIZE = 500
+
+
+def moderation_ids(data, single_keys=("article_id",)):
+    """
+    Collect the ids of a moderation request from "article_ids" plus any of
+    the single-id keys. Returns (requested, ids): the requested values as
+    strings, de-duplicated in order, and the subset that are valid UUIDs.
+    """
+    values = data.get("article_ids") or []
+    if not isinstance(values, list):
+        raise ValueError("article_ids must be a list")
+    for key in single_keys:
+        if data.get(key):
+            values = values + [data[key]]
+    requested = list(dict.fromkeys(str(value) for value in values))
+    return requested, parse_article_ids(requested)
+
+
+def moderate_articles(ids, delete=False, **changes):
+    """
+    Apply `changes` to (or delete) the given articles with one statement per
+    MODERATION_CHUNK_SIZE ids, all in one transaction, and bump their caches.
+    Deleted articles' media is queued for the deletion worker.
+    Returns the ids that were found.
+    """
+    found = []
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(ids), MODERATION_CHUNK_SIZE):
+            chunk = Articles.objects.filter(id__in=ids[start:start + MODERATION_CHUNK_SIZE])
+            rows = list(chunk.values_list("id", "author_id", "category"))
+            if not rows:
+                continue
+            if delete:
+                media.queue_deletions(urls=[
+                    url for urls in chunk.values_list("media", flat=True) for url in urls or []
+                ])
+                chunk.delete()
+            else:
+                chunk.update(updated_at=now, **changes)
+            found.extend(rows)
+    response_cache.bump_articles(found, facets=True)
+    # Unpublished and deleted articles leave the trending feed
+    response_cache.bump(response_cache.TRENDING)
+    return {article_id for article_id, _, _ in found}
+
+
+def split_found(requested, found):
+    """Split requested id strings into (found, missing), keeping request order."""
+    found = {str(article_id) for article_id in found}
+    done = []
+    missing = []
+    for value in requested:
+        try:
+            key = str(uuid.UUID(value))
+        except ValueError:
+            key = None
+        (done if key in found else missing).append(key or value)
+    return done, missing
+
+
 @csrf_exempt
 @require_admin
 @require_http_methods(["POST", "PUT", "OPTIONS"])
 def approve_article(request):
     """
     Approve article(s) - sets status to 'published' and published=True
-    Supports both single and bulk approval
+    Supports both single and bulk approval, with any number of ids
     Admin endpoint - requires admin authentication
     Expects JSON: {"article_id": "uuid"} or {"article_ids": ["uuid1", "uuid2", ...]}
+    Ids that do not exist (or are malformed) are reported under "failed" with status 207
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
@@ -1160,36 +1931,17 @@ def approve_article(request):
         except json.JSONDecodeError:
             return JsonResponse({"success": False, "message": "Invalid JSON body"}, status=400)
 
-        # Support both single and bulk approval
-        article_id = data.get('article_id')
-        article_ids = data.get('article_ids', [])
-
-        # If single article_id provided, convert to list
-        if article_id and not article_ids:
-            article_ids = [article_id]
-        elif article_id and article_ids:
-            # Both provided, combine them
-            article_ids = list(set(article_ids + [article_id]))
+        try:
+            requested, ids = moderation_ids(data)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
 
-        if not article_ids:
+        if not requested:
             return JsonResponse({"success": False, "message": "article_id or article_ids required"}, status=400)
 
-        approved_articles = []
-        failed_articles = []
-
-        for art_id in article_ids:
-            try:
-                article = Articles.objects.get(id=art_id)
-                article.status = 'published'
-                article.published = True
-                article.updated_at = timezone.now()
-                article.save()
-                approved_articles.append(str(article.id))
-            except Articles.DoesNotExist:
-                failed_articles.append(str(art_id))
-            except Exception as e:
-                print(f"Failed to approve article {art_id}: {str(e)}")
-                failed_articles.append(str(art_id))
+        approved_articles, failed_articles = split_found(
+            requested, moderate_articles(ids, status='published', published=True)
+        )
 
         if failed_articles:
             return JsonResponse({
@@ -1220,9 +1972,10 @@ def approve_article(request):
 @require_http_methods(["POST", "PUT", "OPTIONS"])
 def reject_article(request):
     """
-    Reject article - sets status to 'deleted' (or keeps as 'draft' with a note)
+    Reject article(s) - sets status to 'deleted'
     Admin endpoint - requires admin authentication
-    Expects JSON: {"article_id": "uuid"}
+    Expects JSON: {"article_id": "uuid"} or {"article_ids": ["uuid1", "uuid2", ...]}
+    With article_ids, ids that do not exist are reported in "missing_ids" with status 207
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
@@ -1233,29 +1986,38 @@ def reject_article(request):
         except json.JSONDecodeError:
             return JsonResponse({"success": False, "message": "Invalid JSON body"}, status=400)
 
-        article_id = data.get('article_id')
-        if not article_id:
+        try:
+            requested, ids = moderation_ids(data)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+        if not requested:
             return JsonResponse({"success": False, "message": "article_id required"}, status=400)
 
-        try:
-            article = Articles.objects.get(id=article_id)
-            # Set status to deleted for rejected articles
-            article.status = 'deleted'
-            article.published = False
-            article.updated_at = timezone.now()
-            article.save()
+        # Set status to deleted for rejected articles
+        rejected, missing = split_found(requested, moderate_articles(ids, status='deleted', published=False))
 
+        if 'article_ids' not in data:
+            if missing:
+                return JsonResponse({"success": False, "message": "Article not found"}, status=404)
             return JsonResponse({
                 "success": True,
                 "message": "Article rejected successfully",
                 "data": {
-                    "article_id": str(article.id),
-                    "status": article.status
+                    "article_id": rejected[0],
+                    "status": 'deleted'
                 }
             }, status=200)
 
-        except Articles.DoesNotExist:
-            return JsonResponse({"success": False, "message": "Article not found"}, status=404)
+        return JsonResponse({
+            "success": not missing,
+            "message": f"Rejected {len(rejected)} article(s)",
+            "data": {
+                "rejected_article_ids": rejected,
+                "missing_ids": missing,
+                "count": len(rejected)
+            }
+        }, status=207 if missing else 200)
 
     except Exception as e:
         print("reject_article exception:", str(e))
@@ -1267,35 +2029,54 @@ def reject_article(request):
 @require_http_methods(["DELETE", "POST", "OPTIONS"])
 def delete_article_admin(request):
     """
-    Delete article (admin version with authorization check)
+    Delete article(s) (admin version with authorization check)
     Admin endpoint - requires admin authentication
-    Expects article_id in query param or JSON body
+    Expects article_id in query param or JSON body, or JSON {"article_ids": ["uuid1", ...]}
+    With article_ids, ids that do not exist are reported in "missing_ids" with status 207
     """
     if request.method == "OPTIONS":
         return JsonResponse({}, status=200)
 
     try:
         # Get article_id from query param or JSON body
+        data = {}
         article_id = request.GET.get("id") or request.GET.get("article_id")
         if not article_id:
             try:
                 body_text = request.body.decode("utf-8") if request.body else ""
                 data = json.loads(body_text) if body_text else {}
-                article_id = data.get("id") or data.get("article_id")
             except Exception:
-                article_id = None
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+        else:
+            data = {"id": article_id}
 
-        if not article_id:
+        try:
+            requested, ids = moderation_ids(data, single_keys=("id", "article_id"))
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+        if not requested:
             return JsonResponse({"success": False, "message": "Article id required"}, status=400)
 
-        try:
-            article = Articles.objects.get(id=article_id)
-            article.delete()
+        deleted, missing = split_found(requested, moderate_articles(ids, delete=True))
+
+        if 'article_ids' not in data:
+            if missing:
+                return JsonResponse({"success": False, "message": "Article not found"}, status=404)
             return JsonResponse({"success": True, "message": "Article deleted successfully"}, status=200)
 
-        except Articles.DoesNotExist:
-            return JsonResponse({"success": False, "message": "Article not found"}, status=404)
+        return JsonResponse({
+            "success": not missing,
+            "message": f"Deleted {len(deleted)} article(s)",
+            "data": {
+                "deleted_article_ids": deleted,
+                "missing_ids": missing,
+                "count": len(deleted)
+            }
+        }, status=207 if missing else 200)
 
     except Exception as e:
         print("delete_article_admin exception:", str(e))
-        return JsonResponse({"success": False, "message": f"Failed to delete article: {str(e)}"}, status=500)
\ No newline at end of file
+        return JsonResponse({"success": False, "message": f"Failed to delete article: {str(e)}"}, status=500)
@@ -0,0 +1,452 @@
+# n_backend/app/storage.py
+"""
+Pluggable media storage.
+
+Views upload, import, delete and link media through the module-level helpers
+at the bottom of this file, which delegate to the backend named by
+settings.MEDIA_STORAGE_BACKEND:
+
+- CloudinaryStorage (default) keeps assets on Cloudinary. The SDK is imported
+  and configured on first use rather than at import time.
+- LocalStorage writes assets under MEDIA_STORAGE_ROOT. serve_media hands them
+  to the front web server with an X-Accel-Redirect or X-Sendfile header, or
+  streams them itself when no header is configured (development). It only
+  stores the image and PDF types in ALLOWED_TYPES, and only imports URLs
+  that resolve to public addresses.
+
+Every backend returns upload results shaped like Cloudinary's, with at least
+secure_url, public_id and resource_type.
+"""
+import ipaddress
+import os
+import re
+import socket
+import tempfile
+import threading
+import uuid
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import quote, unquote, urljoin, urlparse
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_http_methods
+
+# Cloudinary delivery URL path: /<cloud>/<resource_type>/<type>/[transformations/][v<version>/]<public_id>.<ext>
+VERSION_SEGMENT = re.compile(r"^v\d+$")
+TRANSFORMATION_SEGMENT = re.compile(r"^[a-z]{1,3}_[^/]*$")
+
+# Largest remote file LocalStorage will import
+MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024
+
+# Redirects LocalStorage follows when importing a URL; each hop is checked like the first
+MAX_REDIRECTS = 5
+
+# File types LocalStorage stores, by extension. Anything a browser could run
+# as a page or script (HTML, SVG, ...) is refused.
+ALLOWED_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".pdf": "application/pdf",
+}
+EXTENSIONS_BY_TYPE = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp",
+                      "application/pdf": ".pdf"}
+
+
+class MediaStorage:
+    """Interface every storage backend implements."""
+
+    # Most public ids delete_many() accepts in one call
+    bulk_delete_limit = 100
+
+    def upload(self, file_obj, folder=None, resource_type='image', overwrite=False):
+        """Store an uploaded file and return the upload result."""
+        raise NotImplementedError
+
+    def upload_from_url(self, url, folder=None, resource_type='image'):
+        """Copy a remote file into storage and return the upload result."""
+        raise NotImplementedError
+
+    def delete(self, public_id, resource_type='image'):
+        """Delete one asset; returns {'result': 'ok' | 'not found'}."""
+        raise NotImplementedError
+
+    def delete_many(self, public_ids, resource_type='image'):
+        """Delete up to bulk_delete_limit assets; returns {'deleted': {public_id: status}}."""
+        raise NotImplementedError
+
+    def url(self, public_id, transformation=None, format=None):
+        """Delivery URL of an asset."""
+        raise NotImplementedError
+
+    def parse_url(self, url):
+        """(public_id, resource_type) for a delivery URL of this storage, else None."""
+        raise NotImplementedError
+
+
+class CloudinaryStorage(MediaStorage):
+    def __init__(self):
+        self._sdk = None
+        self._lock = threading.Lock()
+
+    def sdk(self):
+        """Import and configure the Cloudinary SDK on first use."""
+        with self._lock:
+            if self._sdk is None:
+                import cloudinary
+                import cloudinary.api
+                import cloudinary.uploader
+
+                cloudinary.config(
+                    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+                    api_key=settings.CLOUDINARY_API_KEY,
+                    api_secret=settings.CLOUDINARY_API_SECRET,
+                    secure=True
+                )
+                self._sdk = cloudinary
+            return self._sdk
+
+    def upload(self, file_obj, folder=None, resource_type='image', overwrite=False):
+        try:
+            upload_options = {
+                'resource_type': resource_type,
+                'overwrite': overwrite,
+            }
+            if folder:
+                upload_options['folder'] = folder
+            return self.sdk().uploader.upload(file_obj, **upload_options)
+        except Exception as e:
+            print(f"Cloudinary upload error: {str(e)}")
+            raise e
+
+    def upload_from_url(self, url, folder=None, resource_type='image'):
+        try:
+            upload_options = {
+                'resource_type': resource_type,
+            }
+            if folder:
+                upload_options['folder'] = folder
+            return self.sdk().uploader.upload(url, **upload_options)
+        except Exception as e:
+            print(f"Cloudinary upload from URL error: {str(e)}")
+            raise e
+
+    def delete(self, public_id, resource_type='image'):
+        try:
+            return self.sdk().uploader.destroy(public_id, resource_type=resource_type)
+        except Exception as e:
+            print(f"Cloudinary delete error: {str(e)}")
+            raise e
+
+    def delete_many(self, public_ids, resource_type='image'):
+        try:
+            return self.sdk().api.delete_resources(list(public_ids), resource_type=resource_type)
+        except Exception as e:
+            print(f"Cloudinary bulk delete error: {str(e)}")
+            raise e
+
+    def url(self, public_id, transformation=None, format=None):
+        try:
+            url_options = {}
+            if transformation:
+                url_options['transformation'] = transformation
+            if format:
+                url_options['format'] = format
+            return self.sdk().CloudinaryImage(public_id).build_url(**url_options)
+        except Exception as e:
+            print(f"Cloudinary URL generation error: {str(e)}")
+            raise e
+
+    def parse_url(self, url):
+        """
+        Folders are kept in the public id; the version, transformations and
+        file extension are dropped.
+        """
+        if not isinstance(url, str) or "cloudinary.com" not in url:
+            return None
+        parts = [part for part in urlparse(url).path.split("/") if part]
+        if "upload" not in parts:
+            return None
+        upload_index = parts.index("upload")
+        if upload_index < 1:
+            return None
+        resource_type = parts[upload_index - 1]
+        rest = parts[upload_index + 1:]
+
+        versions = [i for i, part in enumerate(rest) if VERSION_SEGMENT.match(part)]
+        if versions:
+            rest = rest[versions[0] + 1:]
+        else:
+            # Without a version, leading transformation segments look like "w_300,c_fill"
+            while len(rest) > 1 and TRANSFORMATION_SEGMENT.match(rest[0]):
+                rest = rest[1:]
+        if not rest:
+            return None
+
+        if resource_type != "raw":
+            rest[-1] = rest[-1].rsplit(".", 1)[0]
+        return "/".join(rest), resource_type
+
+
+class LocalStorage(MediaStorage):
+    """
+    Assets are files under `root`; the public id is the path below it,
+    extension included. Transformations are not supported.
+    """
+    bulk_delete_limit = 1000
+
+    def __init__(self, root=None, base_url=None):
+        self.root = str(root or settings.MEDIA_STORAGE_ROOT)
+        self.base_url = base_url or settings.MEDIA_STORAGE_URL
+
+    def path(self, public_id):
+        """Filesystem path of an asset; raises SuspiciousFileOperation outside the root."""
+        return safe_join(self.root, public_id)
+
+    def upload(self, file_obj, folder=None, resource_type='image', overwrite=False):
+        extension = os.path.splitext(getattr(file_obj, "name", "") or "")[1].lower()
+        if not extension:
+            extension = EXTENSIONS_BY_TYPE.get(getattr(file_obj, "content_type", "") or "", "")
+        if extension not in ALLOWED_TYPES:
+            raise ValueError(f"File type not allowed: {extension or 'unknown'}")
+        chunks = file_obj.chunks() if hasattr(file_obj, "chunks") else iter(lambda: file_obj.read(64 * 1024), b"")
+        return self._store(chunks, folder, resource_type, extension)
+
+    def upload_from_url(self, url, folder=None, resource_type='image'):
+        connection, response = self._fetch(url)
+        try:
+            content_type = response.headers.get_content_type()
+            if not content_type.startswith("image/") or content_type not in EXTENSIONS_BY_TYPE:
+                raise ValueError(f"Remote file is not an allowed image: {content_type}")
+            return self._store(self._download(response), folder, resource_type, EXTENSIONS_BY_TYPE[content_type])
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _fetch(url):
+        """
+        GET `url`, connecting only to public addresses and checking every
+        redirect the same way. Returns (connection, response) for a 200.
+        """
+        timeout = getattr(settings, "MEDIA_UPLOAD_TIMEOUT", 60)
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urlparse(url)
+            if parsed.scheme not in ("http", "https") or not parsed.hostname:
+                raise ValueError(f"Only http and https URLs can be imported: {url}")
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            address = public_address(parsed.hostname, port)
+
+            connection_class = HTTPSConnection if parsed.scheme == "https" else HTTPConnection
+            connection = connection_class(parsed.hostname, port, timeout=timeout)
+            # Connect to the address that was checked, not whatever the name resolves to next
+            connection._create_connection = (
+                lambda _, *args, **kwargs: socket.create_connection((address, port), *args, **kwargs)
+            )
+            path = parsed.path or "/"
+            if parsed.query:
+                path = f"{path}?{parsed.query}"
+            try:
+                connection.request("GET", path, headers={"User-Agent": "n_backend"})
+                response = connection.getresponse()
+            except Exception:
+                connection.close()
+                raise
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                url = urljoin(url, response.getheader("Location"))
+                connection.close()
+                continue
+            if response.status != 200:
+                connection.close()
+                raise ValueError(f"Remote file returned HTTP {response.status}")
+            return connection, response
+        raise ValueError(f"More than {MAX_REDIRECTS} redirects")
+
+    @staticmethod
+    def _download(response):
+        size = 0
+        while True:
+            chunk = response.read(64 * 1024)
+            if not chunk:
+                return
+            size += len(chunk)
+            if size > MAX_DOWNLOAD_BYTES:
+                raise ValueError(f"Remote file is larger than {MAX_DOWNLOAD_BYTES} bytes")
+            yield chunk
+
+    def _store(self, chunks, folder, resource_type, extension):
+        public_id = "/".join(filter(None, [(folder or "").strip("/"), f"{uuid.uuid4().hex}{extension}"]))
+        path = self.path(public_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write beside the target and rename, so a file is never served half-written
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        url = self.url(public_id)
+        return {
+            "public_id": public_id,
+            "resource_type": resource_type,
+            "secure_url": url,
+            "url": url,
+            "format": extension.lstrip("."),
+            "bytes": size,
+            "created_at": timezone.now().isoformat(),
+        }
+
+    def delete(self, public_id, resource_type='image'):
+        status = self.delete_many([public_id], resource_type)["deleted"][public_id]
+        if status not in ("deleted", "not_found"):
+            raise OSError(status)
+        return {"result": "ok" if status == "deleted" else "not found"}
+
+    def delete_many(self, public_ids, resource_type='image'):
+        statuses = {}
+        for public_id in public_ids:
+            try:
+                os.remove(self.path(public_id))
+                statuses[public_id] = "deleted"
+            except FileNotFoundError:
+                statuses[public_id] = "not_found"
+            except (OSError, SuspiciousFileOperation) as e:
+                statuses[public_id] = f"error: {e}"
+        return {"deleted": statuses}
+
+    def url(self, public_id, transformation=None, format=None):
+        return f"{self.base_url}{quote(public_id)}"
+
+    def parse_url(self, url):
+        if not isinstance(url, str):
+            return None
+        prefix = urlparse(self.base_url).path
+        path = urlparse(url).path
+        if not path.startswith(prefix) or path == prefix:
+            return None
+        # With a relative MEDIA_STORAGE_URL only relative URLs are ours
+        host = urlparse(url).netloc
+        if host and host != urlparse(self.base_url).netloc:
+            return None
+        return unquote(path[len(prefix):]), "image"
+
+
+@require_http_methods(["GET", "HEAD"])
+def serve_media(request, path):
+    """
+    Serve a LocalStorage asset. With MEDIA_STORAGE_SENDFILE_HEADER set, the
+    response only carries the header and the web server sends the file.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise Http404("Media is not stored locally")
+    try:
+        file_path = storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404("Media not found")
+    if not os.path.isfile(file_path):
+        raise Http404("Media not found")
+
+    content_type = ALLOWED_TYPES.get(os.path.splitext(file_path)[1].lower(), "application/octet-stream")
+    header = getattr(settings, "MEDIA_STORAGE_SENDFILE_HEADER", "")
+    if header == "X-Accel-Redirect":
+        # nginx maps this internal location onto MEDIA_STORAGE_ROOT
+        response = HttpResponse(content_type=content_type)
+        response[header] = f"{settings.MEDIA_STORAGE_INTERNAL_URL}{quote(path)}"
+    elif header:
+        # Apache mod_xsendfile / lighttpd take the filesystem path
+        response = HttpResponse(content_type=content_type)
+        response[header] = file_path
+    else:
+        response = FileResponse(open(file_path, "rb"), content_type=content_type)
+
+    # Public ids are unique per upload, so an asset never changes
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    # Browsers must not guess a type that renders as a page, nor open non-images inline
+    response["X-Content-Type-Options"] = "nosniff"
+    if not content_type.startswith("image/"):
+        response["Content-Disposition"] = "attachment"
+    return response
+
+
+def public_address(host, port):
+    """
+    Resolve `host` and return one of its addresses, refusing hosts that
+    resolve to any private, loopback, link-local or otherwise non-public address.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ValueError(f"Cannot resolve {host}: {e}")
+    addresses = [info[4][0] for info in infos]
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"{host} resolves to a non-public address")
+    if not addresses:
+        raise ValueError(f"Cannot resolve {host}")
+    return addresses[0]
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Return the process-wide storage backend, creating it from settings on first use."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = import_string(getattr(
+                settings, "MEDIA_STORAGE_BACKEND", "n_backend.app.storage.CloudinaryStorage"
+            ))()
+        return _storage
+
+
+def reset_storage():
+    """Forget the backend, so the next get_storage() builds it from the current settings."""
+    global _storage
+    with _storage_lock:
+        _storage = None
+
+
+@receiver(setting_changed)
+def reset_storage_on_setting_change(setting, **kwargs):
+    if setting.startswith("MEDIA_STORAGE_") or setting.startswith("CLOUDINARY_"):
+        reset_storage()
+
+
+def upload_image(file_obj, folder=None, resource_type='image', overwrite=False):
+    return get_storage().upload(file_obj, folder=folder, resource_type=resource_type, overwrite=overwrite)
+
+
+def upload_image_from_url(image_url, folder=None, resource_type='image'):
+    return get_storage().upload_from_url(image_url, folder=folder, resource_type=resource_type)
+
+
+def delete_image(public_id, resource_type='image'):
+    return get_storage().delete(public_id, resource_type=resource_type)
+
+
+def delete_images(public_ids, resource_type='image'):
+    return get_storage().delete_many(public_ids, resource_type=resource_type)
+
+
+def get_image_url(public_id, transformation=None, format=None):
+    return get_storage().url(public_id, transformation=transformation, format=format)
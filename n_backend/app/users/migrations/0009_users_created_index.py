@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_alter_users_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='users',
+            index=models.Index(fields=['created_at', 'id'], name='users_created_idx'),
+        ),
+    ]
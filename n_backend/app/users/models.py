@@ -23,6 +23,9 @@ class Users(BaseModel):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='users_created_idx'),
+        ]
 
 
     def __str__(self):
@@ -4,14 +4,15 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from django.db.models import Count, Q
 import json
 from datetime import datetime
 from .models import Users
 import base64
 
 from n_backend.app.articles.models import Articles
-from ..cloudinary import upload_image
-from n_backend.app.utils import require_admin
+from ..storage import upload_image
+from n_backend.app.utils import require_admin, get_page_params, paginate_keyset
 
 def generate_simple_token(user):
     """Generate simple token for user"""
@@ -118,7 +119,7 @@ def register(request):
                     }, status=400)
                 
                 # Upload to Cloudinary
-                from ..cloudinary import upload_image
+                from ..storage import upload_image
                 upload_result = upload_image(
                     pdf_file,
                     folder=f'users/{user.id}/pdfs',
@@ -501,7 +502,7 @@ def delete_account(request):
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_users(request):
-    """List all users (admin only)"""
+    """List users newest first, paginated with limit/cursor (admin only)"""
     try:
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
@@ -526,7 +527,15 @@ def list_users(request):
         #         'message': 'Admin access required'
         #     }, status=403)
         
-        users = Users.objects.all()
+        try:
+            limit, position = get_page_params(request)
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+
+        users, next_cursor = paginate_keyset(Users.objects.all(), limit, position)
         users_data = []
         
         for user in users:
@@ -548,7 +557,8 @@ def list_users(request):
             'success': True,
             'data': {
                 'users': users_data,
-                'total': len(users_data)
+                'total': len(users_data),
+                'next_cursor': next_cursor
             }
         })
         
@@ -571,14 +581,16 @@ def get_user_counts(request):
         return JsonResponse({}, status=200)
 
     try:
-        readers_count = Users.objects.filter(role='reader').count()
-        journalists_count = Users.objects.filter(role='journalist').count()
+        counts = Users.objects.aggregate(
+            readers=Count('id', filter=Q(role='reader')),
+            journalists=Count('id', filter=Q(role='journalist')),
+        )
 
         return JsonResponse({
             'success': True,
             'data': {
-                'readersCount': readers_count,
-                'journalistsCount': journalists_count
+                'readersCount': counts['readers'],
+                'journalistsCount': counts['journalists']
             }
         }, status=200)
 
@@ -1,7 +1,12 @@
 """
-Utility functions and decorators for admin authorization
+Utility functions and decorators for admin authorization and pagination
 """
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
 from functools import wraps
+from django.db.models import Q
 from django.http import JsonResponse
 from n_backend.app.users.models import Users
 
@@ -54,3 +59,113 @@ def require_admin(view_func):
     
     return wrapper
 
+
+
+# ==================== PAGINATION ====================
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Streamed responses never hold a page in memory, so they may ask for much more
+STREAM_MAX_PAGE_SIZE = 5000
+
+
+def encode_cursor(created_at, pk):
+    """
+    Build an opaque cursor pointing just past the row (created_at, pk).
+    """
+    raw = json.dumps({"t": created_at.isoformat(), "id": str(pk)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        created_at = datetime.fromisoformat(data["t"])
+        pk = uuid.UUID(data["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, pk
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp from a query parameter; naive values are
+    taken as UTC. Raises ValueError if it cannot be parsed.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        raise ValueError("Invalid timestamp, expected ISO 8601")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def get_page_params(request, max_limit=None):
+    """
+    Read `limit` and `cursor` from the query string.
+    Returns (limit, cursor_position) where cursor_position is None for the first page.
+    `limit` is capped at max_limit (MAX_PAGE_SIZE by default).
+    Raises ValueError on bad input.
+    """
+    max_limit = max_limit or MAX_PAGE_SIZE
+    limit_raw = request.GET.get("limit")
+    if limit_raw in (None, ""):
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(limit_raw)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        limit = min(limit, max_limit)
+
+    cursor = request.GET.get("cursor")
+    position = decode_cursor(cursor) if cursor else None
+    return limit, position
+
+
+def keyset_queryset(qs, position, created_field="created_at", id_field="id"):
+    """
+    Order qs newest first on (created_field, id_field) and seek past `position`.
+    """
+    qs = qs.order_by(f"-{created_field}", f"-{id_field}")
+    if position is not None:
+        created_at, pk = position
+        qs = qs.filter(
+            Q(**{f"{created_field}__lt": created_at}) |
+            Q(**{created_field: created_at, f"{id_field}__lt": pk})
+        )
+    return qs
+
+
+def paginate_keyset(qs, limit, position, created_field="created_at", id_field="id"):
+    """
+    Return (rows, next_cursor) for one page of qs ordered newest first on
+    (created_field, id_field). Seeks directly to `position`, so every page
+    costs the same regardless of depth.
+    """
+    qs = keyset_queryset(qs, position, created_field, id_field)
+    rows = list(qs[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = cursor_for(rows[-1], created_field, id_field)
+    return rows, next_cursor
+
+
+def cursor_for(row, created_field="created_at", id_field="id"):
+    """Cursor that resumes right after `row`."""
+    return encode_cursor(_resolve(row, created_field), _resolve(row, id_field))
+
+
+def _resolve(obj, path):
+    for attr in path.split("__"):
+        obj = getattr(obj, attr)
+    return obj
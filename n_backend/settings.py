@@ -133,6 +133,42 @@ STATIC_ROOT = BASE_DIR / 'static'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache Configuration
+# Local memory by default; set REDIS_URL to share the cache between workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'n-backend',
+    }
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Seconds a cached article response may be served for
+ARTICLE_CACHE_TIMEOUT = int(os.getenv('ARTICLE_CACHE_TIMEOUT', '300'))
+
+# Seconds the admin dashboard counts may be served for; moderation actions drop them sooner
+ADMIN_STATS_CACHE_TIMEOUT = int(os.getenv('ADMIN_STATS_CACHE_TIMEOUT', '30'))
+
+# Buffer like/save toggles in memory and write them in batches (see articles/buffer.py)
+INTERACTION_WRITE_BEHIND = os.getenv('INTERACTION_WRITE_BEHIND', 'False') == 'True'
+INTERACTION_FLUSH_INTERVAL_MS = int(os.getenv('INTERACTION_FLUSH_INTERVAL_MS', '250'))
+INTERACTION_FLUSH_MAX_EVENTS = int(os.getenv('INTERACTION_FLUSH_MAX_EVENTS', '500'))
+INTERACTION_BUFFER_CLASS = os.getenv('INTERACTION_BUFFER_CLASS', 'n_backend.app.articles.buffer.InteractionBuffer')
+
+# Image uploads run in parallel per article request, at most this many at once, all within the timeout (seconds)
+MEDIA_UPLOAD_CONCURRENCY = int(os.getenv('MEDIA_UPLOAD_CONCURRENCY', '4'))
+MEDIA_UPLOAD_TIMEOUT = int(os.getenv('MEDIA_UPLOAD_TIMEOUT', '60'))
+
+# Hours for a like/save/comment to lose half its weight in the trending ranking
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', '24'))
+
+# refresh_trending stays this many seconds behind now, so writes still committing are counted by a later run
+TRENDING_COMMIT_LAG_SECONDS = int(os.getenv('TRENDING_COMMIT_LAG_SECONDS', '60'))
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -171,3 +207,14 @@ CORS_ALLOW_HEADERS = [
 CLOUDINARY_CLOUD_NAME = os.getenv('CLOUDINARY_CLOUD_NAME')
 CLOUDINARY_API_KEY = os.getenv('CLOUDINARY_API_KEY')
 CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET')
+
+# Media storage backend: n_backend.app.storage.CloudinaryStorage or n_backend.app.storage.LocalStorage
+MEDIA_STORAGE_BACKEND = os.getenv('MEDIA_STORAGE_BACKEND', 'n_backend.app.storage.CloudinaryStorage')
+
+# LocalStorage: directory assets are written to and the URL prefix they are served under
+MEDIA_STORAGE_ROOT = os.getenv('MEDIA_STORAGE_ROOT', str(BASE_DIR / 'media'))
+MEDIA_STORAGE_URL = os.getenv('MEDIA_STORAGE_URL', '/media/')
+
+# LocalStorage: "X-Accel-Redirect" (nginx, internal location below) or "X-Sendfile"; empty streams from Django
+MEDIA_STORAGE_SENDFILE_HEADER = os.getenv('MEDIA_STORAGE_SENDFILE_HEADER', '')
+MEDIA_STORAGE_INTERNAL_URL = os.getenv('MEDIA_STORAGE_INTERNAL_URL', '/protected-media/')
@@ -1,9 +1,16 @@
 
+from urllib.parse import urlparse
+
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from n_backend.app.storage import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('n_backend.app.users.urls')),
     path('api/articles/', include('n_backend.app.articles.urls')),
+    # LocalStorage assets
+    path(urlparse(settings.MEDIA_STORAGE_URL).path.lstrip('/') + '<path:path>', serve_media, name='serve_media'),
 ]